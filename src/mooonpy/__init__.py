@@ -11,6 +11,7 @@ from .molspace import doc_examples as DocExamples
 
 from .thermospace.thermospace import Thermospace as Thermospace ## TDM
 from .tools.file_utils import Path as Path ## TDM
+from .xrdspace.xrdspace import Xrdspace as Xrdspace
 
 
 from .rcsetup import rcParams
@@ -19,6 +20,7 @@ __all__ = ['Molspace',
            'DocExamples',
            'Thermospace',
            'Path',
+           'Xrdspace',
 ]
 
 
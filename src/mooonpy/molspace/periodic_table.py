@@ -6,6 +6,8 @@ Created on Fri Jun 27 10:40:21 2025
 
 https://ptable.com/?lang=en#Properties
 """
+import numpy as np
+
 
 class Element:
     def __init__(self):
@@ -22,6 +24,10 @@ class Element:
         
         # Might not really care about this info
         self.elevels: str = ''
+
+        # Cromer-Mann X-ray form factor coefficients as [a1, a2, a3, a4, b1, b2, b3, b4, c]
+        # from the International Tables for Crystallography Vol. C, Table 6.1.1.4
+        self.xray: list[float] = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
         
 
 class Elements:
@@ -34,6 +40,7 @@ class Elements:
                         'empirical':  0.70,
                         'covalent':   0.77,
                         'vdw':        1.70}
+        carbon.xray = [2.31000, 1.02000, 1.58860, 0.865000, 20.8439, 10.2075, 0.568700, 51.6512, 0.215600]
         self.elements['C'] = carbon
         
         
@@ -43,7 +50,28 @@ class Elements:
                           'empirical':  0.25,
                           'covalent':   0.37,
                           'vdw':        1.20}
+        hydrogen.xray = [0.489918, 0.262003, 0.196767, 0.049879, 20.6593, 7.74039, 49.5519, 2.20159, 0.001305]
         self.elements['H'] = hydrogen
+
+
+        nitrogen = Element()
+        nitrogen.masses = [14.007]
+        nitrogen.radii = {'calculated': 0.56,
+                          'empirical':  0.65,
+                          'covalent':   0.75,
+                          'vdw':        1.55}
+        nitrogen.xray = [12.2126, 3.13220, 2.01250, 1.16630, 0.005700, 9.89330, 28.9975, 0.582600, -11.5290]
+        self.elements['N'] = nitrogen
+
+
+        oxygen = Element()
+        oxygen.masses = [15.999]
+        oxygen.radii = {'calculated': 0.48,
+                        'empirical':  0.60,
+                        'covalent':   0.73,
+                        'vdw':        1.52}
+        oxygen.xray = [3.04850, 2.28680, 1.54630, 0.867000, 13.2771, 5.70110, 0.323900, 32.9089, 0.250800]
+        self.elements['O'] = oxygen
         
     def mass2element(self, mass):
         mass_diffs = {} # {'element':minimum-difference in masses}
@@ -58,12 +86,33 @@ class Elements:
     
     def element2radii(self, element, method='vdw'):
         return self.elements[element].radii[method]
-    
-pt = Elements()
-carbon = pt.elements['C']
-print(carbon.masses, carbon.radii)
-
-print('\n\nMapping mass to element')
-print(pt.mass2element(12))
-print(pt.element2mass('H'))
-print(pt.element2radii('C'))
\ No newline at end of file
+
+    def element2form_factor(self, element, q):
+        """
+        X-ray atomic form factor from the Cromer-Mann coefficients.
+
+        >>> f(q) = sum(a_i * exp(-b_i * (q / 4pi)^2)) + c
+
+        :param element: Element symbol
+        :type element: str
+        :param q: Scattering vector magnitude in 1/angstrom, scalar or numpy array
+        :type q: float or np.ndarray
+        :return: Form factor in electrons, same shape as q
+        :rtype: float or np.ndarray
+        """
+        a1, a2, a3, a4, b1, b2, b3, b4, c = self.elements[element].xray
+        s2 = (np.asarray(q) / (4 * np.pi)) ** 2
+        return (a1 * np.exp(-b1 * s2) + a2 * np.exp(-b2 * s2) +
+                a3 * np.exp(-b3 * s2) + a4 * np.exp(-b4 * s2) + c)
+
+
+if __name__ == "__main__":
+    pt = Elements()
+    carbon = pt.elements['C']
+    print(carbon.masses, carbon.radii)
+
+    print('\n\nMapping mass to element')
+    print(pt.mass2element(12))
+    print(pt.element2mass('H'))
+    print(pt.element2radii('C'))
+    print(pt.element2form_factor('C', 0.0))
\ No newline at end of file
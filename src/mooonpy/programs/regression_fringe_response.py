@@ -3,8 +3,12 @@ from ..tools.math_utils import compute_fringe_slope, compute_derivative, find_pe
 from ..tools.signals import butter_lowpass, compute_PSD
 from .program import ProgramResults
 
+from ..tools.tables import ColTable
+
+import os
+from concurrent.futures import ProcessPoolExecutor
 from numbers import Number
-from typing import Union, Optional, List
+from typing import Union, Optional, List, Dict, Sequence
 import numpy as np
 from numpy.polynomial.polynomial import polyfit
 import matplotlib.pyplot as plt
@@ -87,7 +91,7 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
         # --------------------------------------------
         # Filtering
         if wn == 'off':
-            stress_filt = stress
+            stress_filt = stress.copy()  # shifted separately below
             # results.stress_filt = stress
             results.stress_wn = '1.0'
             results.stress_qm = '1,1'
@@ -121,7 +125,8 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
         results.lox = lo[0]
         results.loy = lo[1]
         results.midx = mid[0]
-        results.mixy = mid[1]
+        results.midy = mid[1]
+        results.mixy = results.midy  # old misspelled name, kept for existing scripts
         results.hix = hi[0]
         results.hiy = hi[1]
 
@@ -200,8 +205,13 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
         # --------------------------------------------
         # Find Poisson's
         redused_strain = strain[lo_index:yield_index + 1]
+        # both transverse strains are filtered in one call
+        trans = [vector for vector in [trans_1, trans_2] if vector is not None]
+        if trans:
+            trans_filts, wns, qms = butter_lowpass(strain, np.stack(trans))
+            trans_filts = list(trans_filts)
         if trans_1 is not None:
-            trans_1_filt, wn, qm = butter_lowpass(strain, trans_1)
+            trans_1_filt = trans_filts.pop(0)
             reduced_trans_1 = trans_1_filt[lo_index:yield_index + 1]
             trans_1_coeff = polyfit(redused_strain, reduced_trans_1, 1)
             if axies['plt_trans'] is not None:
@@ -213,10 +223,10 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
                                         label='Transverse 1 Fit: nu = {:2.3f}'.format(-trans_1_coeff[1]))
         else:
             trans_1_coeff = [None, None]
-        results.trans_1_poi = -trans_1_coeff[1]
+        results.trans_1_poi = None if trans_1_coeff[1] is None else -trans_1_coeff[1]
 
         if trans_2 is not None:
-            trans_2_filt, wn, qm = butter_lowpass(strain, trans_2)
+            trans_2_filt = trans_filts.pop(0)
             reduced_trans_2 = trans_2_filt[lo_index:yield_index + 1]
             trans_2_coeff = polyfit(redused_strain, reduced_trans_2, 1)
             if axies['plt_trans'] is not None:
@@ -228,7 +238,7 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
                                         label='Transverse 2 Fit: nu = {:2.3f}'.format(-trans_2_coeff[1]))
         else:
             trans_2_coeff = [None, None]
-        results.trans_2_poi = -trans_2_coeff[1]
+        results.trans_2_poi = None if trans_2_coeff[1] is None else -trans_2_coeff[1]
 
         # --------------------------------------------
         # Cleanup
@@ -236,7 +246,8 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
         results.log = log
         results.figs = figs
         results.axies = axies
-        plt.show()
+        if any(fig is not None for fig in figs.values()):
+            plt.show()
         return results
 
     except:
@@ -244,6 +255,90 @@ def RFR_tensile_analysis(strain: np.ndarray, stress: np.ndarray, trans_1: Option
         raise Exception('ERROR: RFR_tensile_analysis failed, log printed above')
 
 
+RFR_COLUMNS = ['youngs_modulus', 'y_intercept', 'x_yield', 'y_yield', 'trans_1_poi', 'trans_2_poi',
+               'lox', 'loy', 'midx', 'midy', 'hix', 'hiy', 'offset', 'stress_wn']
+RFR_INDEX_COLUMNS = ['lo_index', 'hi_index', 'yield_index']
+
+
+def RFR_tensile_analysis_many(curves: Union[Sequence, Dict], workers: Optional[int] = None,
+                              plots: Union[str, List, None] = None, **kwargs) -> ColTable:
+    """
+    Run :func:`RFR_tensile_analysis` on many stress-strain curves in parallel processes, such as
+    replicates or a strain rate sweep, and collect the scalar results in one table.
+
+    Each curve is a tuple of (strain, stress), (strain, stress, trans_1, trans_2) or a dict of
+    RFR_tensile_analysis arguments. Curves are copied, the inputs are never shifted in place.
+    Curves that fail give a row of np.nan and -1 indexes with the message in the 'error' column.
+
+    :param curves: List of curves, or a dict of {label: curve} to label the rows
+    :type curves: Union[Sequence, Dict]
+    :param workers: Number of processes, defaults to None for os.cpu_count(). 1 runs in this process.
+    :type workers: int
+    :param plots: Plots of each curve as in RFR_tensile_analysis, only with workers=1. default None for no plots
+    :type plots: str | list
+    :param kwargs: Settings used for every curve, such as wn, order, qm, min_xhi or max_xhi
+    :returns: One row per curve with the columns in RFR_COLUMNS, RFR_INDEX_COLUMNS, 'stress_qm' and 'error'
+    :rtype: ColTable
+
+    :Example:
+        >>> import mooonpy
+        >>> logs = mooonpy.Thermospace.read_many('replicates/*/log.lammps')
+        >>> curves = {file: (log['v_strain'], log['v_stress']) for file, log in logs.items()}
+        >>> table = RFR_tensile_analysis_many(curves, workers=8, wn='PSD')
+        >>> table['youngs_modulus'].mean()
+    """
+    if isinstance(curves, dict):
+        labels, curves = list(curves.keys()), list(curves.values())
+    else:
+        labels, curves = None, list(curves)
+    calls = []
+    for curve in curves:
+        call = dict(kwargs)
+        if isinstance(curve, dict):
+            call.update(curve)
+        else:
+            call.update(zip(['strain', 'stress', 'trans_1', 'trans_2'], curve))
+        call['plots'] = plots
+        calls.append(call)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(calls)))
+    if plots not in [None, 'off'] and workers > 1:
+        raise Exception('ERROR: RFR_tensile_analysis_many can only plot with workers=1')
+    if workers == 1:
+        rows = list(map(_rfr_row, calls))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(_rfr_row, calls, chunksize=max(1, len(calls) // (4 * workers))))
+
+    out = ColTable(rows=labels, cornerlabel='curve' if labels is not None else None)
+    for name in RFR_COLUMNS:
+        out[name] = np.array([np.nan if row[name] is None else row[name] for row in rows], dtype=float)
+    for name in RFR_INDEX_COLUMNS:
+        out[name] = np.array([-1 if row[name] is None else row[name] for row in rows], dtype=np.int64)
+    out['stress_qm'] = [row['stress_qm'] for row in rows]
+    out['error'] = [row['error'] for row in rows]
+    return out
+
+
+def _rfr_row(call: dict) -> dict:
+    """Process pool worker, one curve to a dict of scalar results"""
+    row = dict.fromkeys(RFR_COLUMNS + RFR_INDEX_COLUMNS + ['stress_qm'])
+    row['error'] = ''
+    call = {key: np.array(value, dtype=float) if key in ['strain', 'stress', 'trans_1', 'trans_2'] and
+            value is not None else value for key, value in call.items()}
+    try:
+        results = RFR_tensile_analysis(**call)
+    except Exception as error:
+        row['error'] = str(error.__context__ or error)
+        return row
+    for name in RFR_COLUMNS + RFR_INDEX_COLUMNS:
+        row[name] = getattr(results, name)
+    row['stress_qm'] = results.stress_qm
+    return row
+
+
 def rfr_plotter(plots='all'):
     all_plots = ['plt_stress', 'plt_fbf', 'plt_peaks', 'plt_trans']
     axies = {}
@@ -314,8 +409,8 @@ def _forward_backward_forward(strain, stress, min_xhi=None, max_xhi=None, min_xl
     # Compute the forward-backwards-forwards fringe response
     # --------------------------------------------------------
     # Step1: First forward response (fr1 - applying minxhi and maxxhi accordingly)
-    min_strain_fr1 = min(strain)
-    max_strain_fr1 = max(strain)
+    min_strain_fr1 = np.min(strain)
+    max_strain_fr1 = np.max(strain)
     if min_xhi is not None: min_strain_fr1 = min_xhi
     if max_xhi is not None: max_strain_fr1 = max_xhi
     fr1_fringe, fr1_slopes = compute_fringe_slope(strain, stress, min_strain=min_strain_fr1,
@@ -329,7 +424,7 @@ def _forward_backward_forward(strain, stress, min_xhi=None, max_xhi=None, min_xl
         _plt_fbf.scatter(fr1_max_fringe, fr1_max_slope)
     
     # Step2: First backwards response (br1 - applying minxhi and maxxhi accordingly)
-    min_strain_br1 = min(strain)
+    min_strain_br1 = np.min(strain)
     max_strain_br1 = fr1_max_fringe  # changed
     fr1_max_index_absolute = np.argmin(np.abs(strain - fr1_max_fringe))  # equivalent to .index
     if min_xlo is not None: min_strain_br1 = min_xlo
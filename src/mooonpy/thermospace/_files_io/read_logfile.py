@@ -1,127 +1,493 @@
 # -*- coding: utf-8 -*-
-#
-# from ..thermospace import Thermospace
-# from ...tools.file_utils import Path
-# from ...tools.string_utils import _col_convert
-#
-#
-# def readlog_basic(file: [Path, str], silence_error_line: bool = False) -> Thermospace:
-#     """
-#     Read a single log file into a Thermospace object.
-#     Only reads thermo table, no timing or variable information.
-#
-#     :param file: path to a log file
-#     :type file: [Path,str]
-#     :param silence_error_line: silences error line and warnings if True (default False)
-#     :type silence_error_line: bool
-#     :return: Thermospace object
-#     :rtype: Thermospace
-#
-#     :Example:
-#         >>> import mooonpy
-#         >>> file = mooonpy.Path('somepath.log.lammps')
-#         >>> MyLog = mooonpy.readlog_basic(file)
-#         >>> MyLog.csv(file.new_ext('.csv'))
-#
-#     .. seealso:: :class:`thermospace.Thermospace`, :class:`tables.ColTable`
-#     .. warning:: Files with no thermo data, or incorrect format, will raise a warning, then return an empty Thermospace object.
-#     .. note:: This function is capable reading logs with pauses for XRD, and changes to
-#         'LAMMMPS thermo_style'_. Columns with missing data from style changes are padded with
-#         np.nan values in a float array. Complete columns that are intergers are converted to int arrays.
-#
-#     .. todo::
-#         - Unit tests for failure modes and column changes
-#
-#     .. _LAMMMPS thermo_style: https://docs.lammps.org/thermo_style.html
-#
-#     """
-#     ## variables to return in thermospace
-#     file = Path(file)
-#     columns = {}
-#     sections = {}
-#     ## Setup for internal variables
-#     has_nan = set()
-#     keywords = []  # dummy
-#     rowindex = 0  # starts at index 0
-#     sectionID = 0
-#     startrow = 0  # dummy
-#     data_flag = False
-#     interrupt_flag = False
-#     header_flag = True
-#
-#     if not file:
-#         raise Exception(f'File {file} not found')
-#     with file.open('r') as f:
-#         for line in f:
-#             line = line.strip()
-#             ## Exit conditions and switch cases
-#             if not line:
-#                 continue
-#             elif not line[0].isdigit():  # single check is cheaper than 5
-#                 # if line.startswith('WARNING'):
-#                 #     continue
-#                 if line.startswith('ERROR'):
-#                     if not silence_error_line:
-#                         print('File {:} contains Error line, exiting read'.format(file))
-#                     break
-#                 elif 'Sending Ctrl-C to processes as requested' in line:
-#                     if not silence_error_line:
-#                         print('File {:} contains Ctrl-C exit, exiting read'.format(file))
-#                     break
-#                 elif line.startswith('Per MPI'):
-#                     data_flag = True
-#                     header_flag = True
-#                     continue
-#                 elif line.startswith('Loop time of'):
-#                     data_flag = False
-#                     sections[sectionID] = range(startrow, rowindex)  ## check these indexes
-#                     for missing in set(columns.keys()).difference(set(keywords)):
-#                         columns[missing] += [None] * (rowindex - startrow)
-#                         has_nan.add(missing)
-#                     continue
-#                 elif line == '-----':  ## for XRD sims, not sure what else
-#                     interrupt_flag = not interrupt_flag  ## Toggle reading
-#                     continue
-#
-#             ## Read thermo section
-#             if data_flag and not interrupt_flag:
-#                 splits = line.split()
-#                 if header_flag:
-#                     header_flag = False
-#                     keywords = splits
-#                     sectionID += 1
-#                     startrow = rowindex
-#                     for key in keywords:
-#                         if key not in columns:
-#                             columns[key] = [None] * (rowindex)  ## init values for new columns, [] if rowcount is -1
-#                             if rowindex != 0:
-#                                 has_nan.add(key)
-#                 else:  # table body
-#                     if len(keywords) != len(splits):
-#                         if not silence_error_line:
-#                             print('File {:} ends unexpectedly skipping last line'.format(file))
-#                         break
-#                     for k, v in zip(keywords, splits):
-#                         columns[k].append(v)  ## no string to float conversion, handled by numpy conversion later
-#                     rowindex += 1  ## after in case anything fails
-#             ## End thermo block
-#         ## End read loop
-#     ## End with statement
-#     sections[sectionID] = range(startrow, rowindex + 1)
-#     # ^ add section for last successful row, and increase final index by 1
-#
-#     for missing in set(columns.keys()).difference(set(keywords)):  # add nan to missing columns
-#         columns[missing] += [None] * (rowindex - startrow)
-#         has_nan.add(missing)
-#
-#     for key, col in columns.items():  # convert string lists to array
-#         nan = bool(key in has_nan)
-#         # print(key, nan)
-#         columns[key] = _col_convert(col, nan)
-#     if len(columns) == 0 and not silence_error_line:
-#         warnings.warn(f'File {file} Contains no thermo data.')
-#     out = Thermospace()  ## may change with init?
-#     out.grid = columns
-#     out.title = file
-#     out.sections = sections
-#     return out
+import numpy as np
+import copy
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Any
+
+from ...tools.tables import ColTable
+from ...tools.string_utils import string2digit
+
+TIMING_COLUMNS = ['min time', 'avg time', 'max time', '%varavg', '%total']
+RUN_COMMANDS = ('run ', 'minimize ', 'rerun ')
+
+
+class LogSection(object):
+    """
+    Row range and run metadata of one thermo section of a LAMMPS log.
+
+    Behaves like the range of rows it covers (start, stop, step, len, iteration and == with range objects),
+    so it can be used wherever Thermospace.sections held ranges, and also holds the information printed
+    around the thermo table of the run:
+
+    - command: the run or minimize command echoed before the section
+    - memory: Per MPI rank memory allocation (min, avg, max) in Mbytes
+    - variables: variables defined before the section {name: 'style args'}
+    - loop_time, procs, steps, atoms: from the 'Loop time of' line
+    - performance: {unit: value} from the 'Performance:' line, e.g. 'ns/day', 'timesteps/s'
+    - cpu_use, mpi_tasks, omp_threads: from the 'CPU use' line
+    - breakdown: {section: (min, avg, max, %varavg, %total)} from the MPI task timing breakdown, see :attr:`timing`
+    - neighbors: {'Nlocal': {'ave', 'max', 'min'}, ...} per processor statistics
+    - stats: 'key = value' lines after the run, such as 'Neighbor list builds' and minimization stats
+
+    Values that are not in the log, for example for a run that was cut off, stay None or empty.
+    """
+
+    def __init__(self, start: int = 0, stop: int = 0):
+        self.start = start
+        self.stop = stop
+        self.step = 1
+
+        self.command: Optional[str] = None
+        self.memory: Optional[Tuple[float, float, float]] = None
+        self.keywords: List[str] = []
+        self.variables: Dict[str, str] = {}
+
+        self.loop_time: Optional[float] = None
+        self.procs: Optional[int] = None
+        self.steps: Optional[int] = None
+        self.atoms: Optional[int] = None
+        self.performance: Dict[str, float] = {}
+        self.cpu_use: Optional[float] = None
+        self.mpi_tasks: Optional[int] = None
+        self.omp_threads: Optional[int] = None
+        self.breakdown: Dict[str, Tuple[float, ...]] = {}
+        self.neighbors: Dict[str, Dict[str, float]] = {}
+        self.stats: Dict[str, Any] = {}
+
+    ## range behaviour
+    def __len__(self) -> int:
+        return max(0, self.stop - self.start)
+
+    def __iter__(self):
+        return iter(range(self.start, self.stop, self.step))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (range, LogSection)):
+            return self.as_range() == range(other.start, other.stop, other.step)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'LogSection({self.start}, {self.stop})'
+
+    def as_range(self) -> range:
+        """Plain range of the rows in this section"""
+        return range(self.start, self.stop, self.step)
+
+    def moved(self, start: int, stop: int) -> 'LogSection':
+        """Copy of this section with new row indexes, for stacking tables"""
+        out = copy.copy(self)
+        out.start, out.stop = start, stop
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Attributes as a JSON compatible dict"""
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LogSection':
+        """Rebuild a section from :meth:`to_dict`, JSON lists are turned back into tuples"""
+        out = cls()
+        out.__dict__.update(data)
+        if out.memory is not None:
+            out.memory = tuple(out.memory)
+        out.breakdown = {key: tuple(row) for key, row in out.breakdown.items()}
+        out.stats = {key: tuple(value) if isinstance(value, list) else value for key, value in out.stats.items()}
+        return out
+
+    @property
+    def timing(self) -> Optional[ColTable]:
+        """
+        MPI task timing breakdown as a ColTable with one row per task section (Pair, Bond, Kspace, ...)
+        and the columns 'min time', 'avg time', 'max time', '%varavg', '%total'. Blank cells are np.nan.
+        """
+        if not self.breakdown:
+            return None
+        rows = list(self.breakdown.keys())
+        values = np.array([self.breakdown[row] for row in rows], dtype=float)
+        out = ColTable(rows=rows, cornerlabel='Section')
+        for ii, key in enumerate(TIMING_COLUMNS):
+            out[key] = values[:, ii]
+        return out
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Flat performance numbers of this section, np.nan for missing values.
+        Timing breakdown percentages are given as '%Pair', '%Bond' ...
+
+        :return: {name: value}
+        :rtype: Dict[str, float]
+        """
+        def _value(value):
+            return np.nan if value is None else value
+
+        out = {'loop time': _value(self.loop_time), 'procs': _value(self.procs),
+               'steps': _value(self.steps), 'atoms': _value(self.atoms)}
+        out.update(self.performance)
+        out['CPU use'] = _value(self.cpu_use)
+        for key, row in self.breakdown.items():
+            out['%' + key] = row[-1]
+        for key in ['Neighbor list builds', 'Dangerous builds']:
+            out[key] = self.stats.get(key, np.nan)
+        return out
+
+
+class LogParser(object):
+    """
+    Block based parser for the thermo tables of LAMMPS log files.
+
+    Lines are only sorted into blocks while reading, each thermo block between 'Per MPI' and 'Loop time of'
+    is converted with one numpy call when it closes, and the blocks are copied into preallocated column
+    arrays by :meth:`columns`. The parser keeps its state between calls to :meth:`feed`, so a log may be
+    passed in pieces, and :meth:`flush` may be called on an open block to convert the rows read so far.
+
+    The same rules as readlog_basic apply: ERROR lines and Ctrl-C exits stop the read, '-----' toggles
+    the pauses in XRD simulations, and a line that does not match the header ends the read.
+    WARNING lines inside thermo blocks are skipped.
+
+    Lines outside thermo blocks are checked for run metadata, which is stored on the :class:`LogSection`
+    of each section: the run command, memory use, variables, loop time, performance, CPU use,
+    MPI task timing breakdown and neighbor statistics. The LAMMPS version and total wall time are kept in .info
+
+    With columns set, only those thermo keywords are converted and kept, so unused keywords cost no memory.
+
+    :Example:
+        >>> parser = LogParser('log.lammps')
+        >>> with open('log.lammps') as f:
+        ...     parser.feed(f)
+        >>> parser.flush()
+        >>> columns, sections = parser.columns(), parser.sections
+    """
+
+    def __init__(self, file=None, silence_error_line: bool = False, columns: Optional[Iterable[str]] = None):
+        self.file = file
+        self.silence_error_line = silence_error_line
+        self.wanted = None if columns is None else set(columns)  # None keeps every keyword
+
+        self.blocks: List[Tuple[int, List[str], np.ndarray, int]] = []  # (sectionID, keywords, rows x cols array, startrow)
+        self.sections: Dict[int, LogSection] = {}
+        self.variables: Dict[str, str] = {}  # all variables defined so far
+        self.info: Dict[str, Any] = {}  # file level metadata, LAMMPS version and wall time
+        self.keywords: List[str] = []
+        self.rowindex = 0
+        self.sectionID = 0
+        self.startrow = 0
+        self.done = False  # set at the end of the run or an exit condition, later lines are ignored
+
+        self._lines: List[str] = []  # raw lines of the open block
+        self._data_flag = False
+        self._header_flag = False
+        self._interrupt_flag = False
+        self._command: Optional[str] = None  # last run command, for the next section
+        self._memory: Optional[Tuple[float, float, float]] = None
+        self._timing_flag = False  # inside MPI task timing breakdown
+        self._stats_flag = False  # between 'Loop time of' and 'Dangerous builds'
+        self._stats_key: Optional[str] = None  # 'key =' with the value on the next line
+
+    def _message(self, message: str):
+        if not self.silence_error_line:
+            print(message.format(self.file))
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """
+        Sort lines into thermo blocks. Blocks are converted as they close.
+
+        :param lines: Lines of a log file, with or without line endings
+        :type lines: Iterable[str]
+        """
+        if self.done:
+            return
+        append = self._lines.append
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            elif not line[0].isdigit():  # single check is cheaper than 5
+                if line.startswith('ERROR'):
+                    self._message('File {:} contains Error line, exiting read')
+                    self._exit()
+                    return
+                elif 'Sending Ctrl-C to processes as requested' in line:
+                    self._message('File {:} contains Ctrl-C exit, exiting read')
+                    self._exit()
+                    return
+                elif line.startswith('Total wall time:'):  # last line of a finished run
+                    self.info['wall time'] = line.split(':', 1)[1].strip()
+                    self._exit()
+                    return
+                elif line.startswith('Per MPI'):
+                    self._data_flag = True
+                    self._header_flag = True
+                    self._memory = _memory(line)
+                    continue
+                elif line.startswith('Loop time of'):
+                    self._data_flag = False
+                    self.flush()
+                    if self.done:
+                        return
+                    self._loop(line)
+                    append = self._lines.append
+                    continue
+                elif line == '-----':  ## for XRD sims
+                    self._interrupt_flag = not self._interrupt_flag
+                    continue
+                elif line.startswith('WARNING'):
+                    continue
+
+            if self._data_flag:
+                if self._interrupt_flag:
+                    continue
+                elif self._header_flag:
+                    self._header_flag = False
+                    self._new_section(line)
+                else:
+                    append(line)
+            else:
+                try:
+                    self._metadata(line)
+                except (IndexError, ValueError):  # unexpected format, metadata is optional
+                    self._timing_flag = False
+        return
+
+    def _new_section(self, line: str):
+        self.keywords = line.split()
+        self.sectionID += 1
+        self.startrow = self.rowindex
+        section = LogSection(self.rowindex, self.rowindex)
+        section.keywords = self.keywords
+        section.command = self._command
+        section.memory = self._memory
+        section.variables = dict(self.variables)
+        self.sections[self.sectionID] = section
+        self._command = None
+        self._memory = None
+
+    def _loop(self, line: str):
+        """'Loop time of 55.2372 on 8 procs for 50000 steps with 1170 atoms'"""
+        section = self.sections.get(self.sectionID)
+        if section is None:
+            return
+        splits = line.split()
+        try:
+            section.loop_time = float(splits[3])
+            section.procs = int(splits[5])
+            section.steps = int(splits[8])
+            section.atoms = int(splits[11])
+        except (IndexError, ValueError):
+            pass
+        self._stats_flag = True
+
+    def _metadata(self, line: str):
+        """Sort a line outside of thermo blocks into the metadata of the last section"""
+        section = self.sections.get(self.sectionID)
+        if self._timing_flag:
+            if '|' in line:
+                if not line.startswith('Section'):
+                    cells = line.split('|')
+                    section.breakdown[cells[0].strip()] = tuple(float(cell) if cell.strip() else np.nan
+                                                                for cell in cells[1:])
+                return
+            elif line[0] == '-':
+                return
+            self._timing_flag = False
+
+        if line.startswith('variable'):
+            splits = line.split('#', 1)[0].split(None, 2)
+            if len(splits) == 3:
+                self.variables[splits[1]] = ' '.join(splits[2].split())
+        elif line.startswith(RUN_COMMANDS):
+            self._command = ' '.join(line.split('#', 1)[0].split())
+        elif line.startswith('LAMMPS ('):
+            self.info['version'] = line[8:].rstrip(')')
+        elif self._stats_flag and section is not None:
+            if self._stats_key is not None:
+                section.stats[self._stats_key] = _values(line)
+                self._stats_key = None
+            elif line.startswith('Performance:'):
+                for item in line[12:].split(','):
+                    splits = item.split()
+                    if len(splits) == 2:
+                        section.performance[splits[1]] = float(splits[0])
+            elif 'CPU use with' in line:
+                # 99.8% CPU use with 8 MPI tasks x no OpenMP threads
+                splits = line.split()
+                section.cpu_use = float(splits[0].rstrip('%'))
+                section.mpi_tasks = int(splits[4])
+                section.omp_threads = int(splits[8]) if splits[8].isdigit() else 0
+            elif line.startswith('MPI task timing breakdown'):
+                self._timing_flag = True
+            elif line.endswith(' min') and ' ave ' in line:
+                # Nlocal:        146.250 ave         252 max          54 min
+                splits = line.split()
+                section.neighbors[splits[0].rstrip(':')] = {'ave': float(splits[1]), 'max': float(splits[3]),
+                                                            'min': float(splits[5])}
+            elif line.startswith('Dangerous builds'):
+                if '=' in line:
+                    section.stats['Dangerous builds'] = _values(line.split('=', 1)[1])
+                self._stats_flag = False
+            elif '=' in line:
+                key, value = line.split('=', 1)
+                if value.strip():
+                    section.stats[key.strip()] = _values(value)
+                else:
+                    self._stats_key = key.strip()
+
+
+    def _exit(self):
+        self.flush()
+        self._data_flag = False
+        self.done = True
+
+    def flush(self) -> None:
+        """
+        Convert the pending lines of the open block into an array and update the section range.
+        Called on 'Loop time of' lines and should be called once more at the end of a file.
+        Calling it before a block closes adds the rows read so far as a chunk of the same section.
+        """
+        if self.sectionID == 0 or not self._lines:
+            return
+        lines = self._lines
+        n_cols = len(self.keywords)
+        keywords, usecols = self.keywords, None
+        if self.wanted is not None:
+            usecols = [ii for ii, key in enumerate(self.keywords) if key in self.wanted]
+            keywords = [self.keywords[ii] for ii in usecols]
+        try:
+            if usecols is None:
+                array = np.loadtxt(lines, dtype=float, ndmin=2, comments=None)
+                if array.shape[1] != n_cols:
+                    raise ValueError('header mismatch')
+            else:
+                ## other columns are not converted, so only the ends are checked for a cut line
+                if len(lines[0].split()) != n_cols or len(lines[-1].split()) != n_cols:
+                    raise ValueError('header mismatch')
+                array = np.loadtxt(lines, dtype=float, ndmin=2, comments=None, usecols=usecols)
+                array = array.reshape(len(lines), len(usecols))
+        except ValueError:
+            array = self._partial(lines, n_cols, usecols)
+
+        if len(array):
+            self.blocks.append((self.sectionID, keywords, array, self.rowindex))
+        self.rowindex += len(array)
+        self.sections[self.sectionID].stop = self.rowindex
+        self._lines = []
+
+    def _partial(self, lines: List[str], n_cols: int, usecols: Optional[List[int]] = None) -> np.ndarray:
+        """Slow path for a block with a bad line, keeps rows up to the bad line and stops reading"""
+        good = 0
+        for line in lines:
+            splits = line.split()
+            if len(splits) != n_cols:
+                break
+            try:
+                [float(value) for value in splits]
+            except ValueError:
+                break
+            good += 1
+        self._message('File {:} ends unexpectedly skipping last line')
+        self.done = True
+        self._data_flag = False
+        if usecols is not None:
+            n_cols = len(usecols)
+        if good == 0:
+            return np.empty((0, n_cols))
+        array = np.loadtxt(lines[:good], dtype=float, ndmin=2, comments=None, usecols=usecols)
+        return array.reshape(good, n_cols)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Assemble all converted blocks into column arrays. Columns missing from any block are padded with
+        np.nan, and complete columns with only integer values are converted to int arrays.
+
+        :return: {keyword: column}
+        :rtype: Dict[str, np.ndarray]
+        """
+        return dict(self.iter_columns())
+
+    def iter_columns(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+        Assemble the converted blocks one column at a time, as :meth:`columns`.
+        Only one assembled column is held at a time, for writing large logs to a column store.
+
+        :return: (keyword, column) pairs in order of first appearance
+        :rtype: Iterator[Tuple[str, np.ndarray]]
+        """
+        n_rows = self.rowindex
+        present: Dict[str, int] = {}  # keyword: number of rows with values, in order of first appearance
+        for sectionID, keywords, array, start in self.blocks:
+            for key in keywords:
+                present[key] = present.get(key, 0) + len(array)
+
+        for key, count in present.items():
+            if count == n_rows:
+                column = np.empty(n_rows)
+            else:
+                column = np.full(n_rows, np.nan)
+            for sectionID, keywords, array, start in self.blocks:
+                if key in keywords:
+                    column[start:start + len(array)] = array[:, keywords.index(key)]
+
+            if count == n_rows:  # cannot convert to int with nan padding
+                with np.errstate(invalid='ignore'):  # inf values do not cast
+                    col_int = column.astype(np.int64)
+                if np.array_equal(column, col_int):
+                    column = col_int
+            yield key, column
+
+
+def _memory(line: str) -> Optional[Tuple[float, float, float]]:
+    """'Per MPI rank memory allocation (min/avg/max) = 44.81 | 44.99 | 45.50 Mbytes'"""
+    try:
+        values = line.split('=', 1)[1].split()
+        return float(values[0]), float(values[2]), float(values[4])
+    except (IndexError, ValueError):
+        return None
+
+
+def _values(string: str):
+    """Number, tuple of numbers or string from the value of a 'key = value' line"""
+    splits = string.split()
+    values = [string2digit(split) for split in splits]
+    if len(values) == 1:
+        return values[0]
+    elif values and all(not isinstance(value, str) for value in values):
+        return tuple(values)
+    return ' '.join(splits)
+
+
+def parse_log(file, silence_error_line: bool = False, columns: Optional[Iterable[str]] = None) -> LogParser:
+    """
+    Feed a whole LAMMPS log file to a :class:`LogParser` and flush it.
+
+    :param file: path to a log file
+    :type file: Path
+    :param silence_error_line: silences error line messages if True (default False)
+    :type silence_error_line: bool
+    :param columns: Thermo keywords to keep, None for all
+    :type columns: Iterable[str]
+    :return: Parser with the converted blocks, sections and info
+    :rtype: LogParser
+    """
+    parser = LogParser(file, silence_error_line=silence_error_line, columns=columns)
+    with file.open('r') as f:
+        parser.feed(f)
+    parser.flush()
+    return parser
+
+
+def read_log_columns(file, silence_error_line: bool = False,
+                     columns: Optional[Iterable[str]] = None) -> Tuple[Dict[str, np.ndarray], Dict[int, LogSection], Dict[str, Any]]:
+    """
+    Parse the thermo tables and run metadata of a LAMMPS log file with :class:`LogParser`.
+
+    :param file: path to a log file
+    :type file: Path
+    :param silence_error_line: silences error line messages if True (default False)
+    :type silence_error_line: bool
+    :param columns: Thermo keywords to keep, None for all
+    :type columns: Iterable[str]
+    :return: columns, sections and file level info
+    :rtype: Tuple[Dict[str, np.ndarray], Dict[int, LogSection], Dict[str, Any]]
+    """
+    parser = parse_log(file, silence_error_line=silence_error_line, columns=columns)
+    return parser.columns(), parser.sections, parser.info
@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 import numpy as np
+import os
+import time
+import asyncio
 import warnings
-from typing import Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union, Iterator, AsyncIterator, Dict, List
 
-from ..tools.tables import ColTable
+from ..tools.tables import ColTable, LazyGrid
+from ..tools._files_io.columnar import write_columns, read_meta
 from ..tools.file_utils import Path
 from ..tools.string_utils import _col_convert
-# from ._files_io.read_logfile import readlog_basic
+from ..tools.math_utils import block_average, statistical_inefficiency
+from ._files_io.read_logfile import read_log_columns, parse_log, LogParser, LogSection
 
 class Thermospace(ColTable):
     """
@@ -18,45 +24,377 @@ class Thermospace(ColTable):
     def __init__(self, **kwargs):
         super(Thermospace, self).__init__(**kwargs)
         self.sections = {}
+        self.info = {}
 
-    def sect(self, sect_string: Union[str,range,list,int]) -> ColTable:
-        if isinstance(sect_string, str):  # TODO
-            if sect_string in self.sections:
-                sections = [sect_string]
+    def error_analysis(self, columns: Optional[List[str]] = None, by_section: bool = False) -> ColTable:
+        """
+        Equilibrium averages with error bars from the statistical inefficiency and from block averaging.
+        Columns of the same length are analysed together with batched FFTs and block levels.
+
+        Output columns:
+            - section: section ID, only if by_section is True
+            - column: analysed column
+            - n, mean, std: number of rows, average and standard deviation (ddof=1)
+            - g, tau: statistical inefficiency and integrated autocorrelation time in rows, tau = (g - 1) / 2
+            - sem: standard error of the mean, std * sqrt(g / n)
+            - sem block, sem block error, block size: Flyvbjerg-Petersen estimate at the optimal block size,
+              np.nan if the series is too short for a plateau
+
+        :param columns: Columns to analyse, defaults to None for every float column
+        :type columns: List[str]
+        :param by_section: Analyse each section separately instead of all rows
+        :type by_section: bool
+        :return: One row per column, or per section and column. Rows are labelled by column without sections.
+        :rtype: ColTable
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> errors = MyLog.error_analysis(['Temp', 'Press'])
+            >>> print(errors.rowcol('Temp', 'mean'), errors.rowcol('Temp', 'sem'))
+            >>> per_run = MyLog.error_analysis(by_section=True)
+
+        .. seealso:: :func:`mooonpy.tools.math_utils.block_average`, :func:`mooonpy.tools.math_utils.statistical_inefficiency`
+        .. note:: Rows with nan values are dropped per column, such as padding after a thermo_style change.
+        """
+        if columns is None:
+            columns = [key for key, col in self.grid.items() if np.asarray(col).dtype.kind == 'f']
+        if by_section:
+            blocks = [(sectionID, slice(section.start, section.stop, section.step))
+                      for sectionID, section in self.sections.items()]
+        else:
+            blocks = [(None, slice(None))]
+
+        records = {'section': [], 'column': []}
+        stats = {}
+        for sectionID, rows in blocks:
+            data = [np.asarray(self.col(key), dtype=float)[rows] for key in columns]
+            clean = [ii for ii, values in enumerate(data) if not np.isnan(values).any()]
+            batches = [clean] + [[ii] for ii in range(len(columns)) if ii not in clean]
+            results = {}
+            for batch in batches:
+                if not batch: continue
+                stack = np.stack([data[ii][np.logical_not(np.isnan(data[ii]))] for ii in batch])
+                for key, values in _error_stats(stack).items():
+                    for ii, value in zip(batch, values):
+                        results.setdefault(ii, {})[key] = value
+            for ii, key in enumerate(columns):
+                records['section'].append(sectionID)
+                records['column'].append(key)
+                for name, value in results[ii].items():
+                    stats.setdefault(name, []).append(value)
+
+        out = ColTable(title=self.title, rows=None if by_section else list(columns))
+        if by_section:
+            out['section'] = np.array(records['section'])
+        out['column'] = np.array(records['column'], dtype=str)
+        for name, values in stats.items():
+            out[name] = np.array(values, dtype=np.int64 if name == 'n' else float)
+        return out
+
+    def _group_key(self, key):
+        """'section' groups rows by section ID unless there is a column with that label"""
+        if key != 'section' or key in self.grid:
+            return super(Thermospace, self)._group_key(key)
+        n_rows = self.shape()[0] or 0
+        ids = list(self.sections.keys())
+        position = np.full(n_rows, -1)
+        for ii, section in enumerate(self.sections.values()):
+            position[section.start:section.stop:section.step] = ii
+        valid = position >= 0
+        if all(isinstance(sectionID, (int, np.integer)) for sectionID in ids):
+            values = np.array(ids + [-1], dtype=np.int64)[position]
+        else:
+            values = np.array(ids + [None], dtype=object)[position]
+        return values, valid
+
+    def _meta(self) -> dict:
+        meta = super(Thermospace, self)._meta()
+        meta['title'] = None if self.title is None else str(self.title)
+        meta['sections'] = [[key, section.to_dict() if isinstance(section, LogSection) else
+                             [section.start, section.stop, section.step]] for key, section in self.sections.items()]
+        meta['info'] = self.info
+        return meta
+
+    def _set_meta(self, meta: dict):
+        super(Thermospace, self)._set_meta(meta)
+        if self.title is not None:
+            self.title = Path(self.title)
+        self.sections = {}
+        for key, section in meta.get('sections', []):
+            if isinstance(section, dict):
+                self.sections[key] = LogSection.from_dict(section)
+            else:
+                self.sections[key] = range(*section)
+        self.info = meta.get('info', {})
+
+    def performance(self) -> ColTable:
+        """
+        Table of run performance with one row per section, from the metadata that :meth:`read` stores
+        in each :class:`LogSection`: loop time, procs, steps, atoms, Performance line units, CPU use,
+        %total of each MPI task timing section and neighbor list builds. Missing values are np.nan.
+
+        :return: Performance table with section IDs as row labels
+        :rtype: ColTable
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> print(MyLog.performance())
+            >>> MyLog.sections[1].timing['%total']
+        """
+        rows, summaries = [], []
+        for sectionID, section in self.sections.items():
+            if isinstance(section, LogSection):
+                rows.append(sectionID)
+                summaries.append(section.summary())
+        keys = {}
+        for summary in summaries:
+            keys.update(dict.fromkeys(summary))
+
+        out = ColTable(rows=rows, title=self.title, cornerlabel='section')
+        for key in keys:
+            out[key] = np.array([summary.get(key, np.nan) for summary in summaries], dtype=float)
+        return out
+
+    def sect(self, sect_string: Union[str, range, list, int, slice]) -> ColTable:
+        """
+        Select the rows of one or more sections without copying when possible.
+
+        A selection that covers one contiguous block of rows, such as a single section or neighboring
+        sections in order, returns numpy views of the columns. Other selections return a ColTable with
+        a :class:`LazyGrid`, which concatenates each column the first time it is accessed.
+        Writing to a view changes this Thermospace, use .copy() on the output to detach it.
+
+        :param sect_string: Sections to select
+
+            - int: section ID, negative values count from the last section (-1 is the last)
+            - str: a section key, or comma separated parts of IDs, inclusive ID ranges 'a-b' and
+              position slices 'a:b', such as '1-3', '1,4', '2:' or '-1'
+            - range, list or tuple: section IDs (or any of the above) in the order given
+            - slice: positions in the ordered sections, like list slicing
+        :type sect_string: Union[str, range, list, int, slice]
+        :return: Table of the selected rows
+        :rtype: ColTable
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> equil = MyLog.sect(1)  # views of section 1
+            >>> last_two = MyLog.sect(slice(-2, None))
+            >>> runs = MyLog.sect('1-3,5')
+        """
+        spans = []  # (start, stop, step) of rows, neighbors are merged
+        for sectionID in self._section_ids(sect_string):
+            section = self.sections[sectionID]
+            span = (section.start, section.stop, section.step)
+            if spans and span[2] == 1 and spans[-1][2] == 1 and spans[-1][1] == span[0]:
+                spans[-1] = (spans[-1][0], span[1], 1)
             else:
-                pass  # Fancy splitting
-        elif isinstance(sect_string, range):  # TODO
-            pass
-        elif isinstance(sect_string, int):
-            sections = [int(sect_string)]
-        else:  # or allow custom ranges? also reverse slicing. look at slice object
-            pass  # error message  # TODO
+                spans.append(span)
 
         out_table = ColTable(title=self.title, cornerlabel=self.cornerlabel)
         out_table.x_column = self.x_column
         if hasattr(self, 'default'):
             out_table.default = self.default
 
-        for key, col in self.grid.items():
-            sect_ranges = [self.sections[section] for section in sections]
-            column = np.concatenate(
-                [self[key][sect_range.start:sect_range.stop:sect_range.step] for sect_range in sect_ranges])
-            out_table[key] = column
-
+        n_rows = self.shape()[0] or 0
+        slices = [slice(*span) for span in spans]
+        grid = self.grid
+        if len(slices) == 1 and not isinstance(grid, LazyGrid):
+            out_table.grid = {key: col[slices[0]] for key, col in grid.items()}
+        elif not slices:
+            out_table.grid = {key: np.asarray(col)[:0] for key, col in grid.items()}
+        else:
+            total = sum(len(range(*slice_.indices(n_rows))) for slice_ in slices)
+            if len(slices) == 1:
+                loader = lambda key: grid[key][slices[0]]
+            else:
+                loader = lambda key: np.concatenate([grid[key][slice_] for slice_ in slices])
+            out_table.grid = LazyGrid(grid.keys(), loader, n_rows=total)
         return out_table
 
-    ## add merging options, and remove repeats method
+    def _section_ids(self, selector) -> list:
+        """Resolve a sect selector to a list of keys of self.sections"""
+        ids = list(self.sections)
+        if isinstance(selector, slice):
+            return ids[selector]
+        elif isinstance(selector, (range, list, tuple)):
+            out = []
+            for item in selector:
+                out.extend(self._section_ids(item))
+            return out
+        elif isinstance(selector, (int, np.integer)):
+            if selector in self.sections:
+                return [selector]
+            elif 0 < -selector <= len(ids):
+                return [ids[selector]]
+        elif isinstance(selector, str):
+            if selector in self.sections:
+                return [selector]
+            out = []
+            for part in selector.split(','):
+                part = part.strip()
+                try:
+                    out.extend(self._section_ids(int(part)))
+                    continue
+                except ValueError:
+                    pass
+                if part in self.sections:
+                    out.append(part)
+                elif ':' in part:
+                    bounds = [int(bound) if bound.strip() else None for bound in part.split(':')]
+                    out.extend(ids[slice(*bounds)])
+                elif '-' in part[1:]:
+                    first, last = part.split('-', 1)
+                    out.extend(self._section_ids(range(int(first), int(last) + 1)))
+                else:
+                    raise Exception(f'ERROR: Section {part} not found, sections are {ids}')
+            return out
+        raise Exception(f'ERROR: Section {selector} not found, sections are {ids}')
+
+    def drop_repeats(self, on: str = 'Step', keep: str = 'last') -> 'Thermospace':
+        """
+        Remove rows with a repeated value in one column, such as the overlapping steps of a restarted run.
+
+        Row order is kept, so a restart that starts before the end of the previous run replaces the
+        overlap with keep='last'. Sections are shifted to the remaining rows and may become empty.
+
+        :param on: Column to find repeats in
+        :type on: str
+        :param keep: 'last' or 'first' row of each repeated value
+        :type keep: str
+        :return: New Thermospace without repeats
+        :rtype: Thermospace
+
+        :Example:
+            >>> import mooonpy
+            >>> log = mooonpy.Thermospace.read('restarted.log.lammps')
+            >>> log = log.drop_repeats('Step')
+        """
+        if keep not in ('first', 'last'):
+            raise Exception(f'ERROR: keep must be "first" or "last", not {keep}')
+        values = np.asarray(self[on])
+        n_rows = len(values)
+        if keep == 'first':
+            _, index = np.unique(values, return_index=True)
+        else:
+            _, index = np.unique(values[::-1], return_index=True)
+            index = n_rows - 1 - index
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[index] = True
+        return self._take(mask)
+
+    def merge(self, others: Union['Thermospace', List['Thermospace']], on: str = 'Step', keep: str = 'last',
+              sort: bool = True, key: Optional[str] = None) -> 'Thermospace':
+        """
+        Stitch this log and others into one table without repeated rows, for example the logs of a restarted run.
+
+        Columns that are missing from some logs are padded with np.nan, and sections are renumbered in order as
+        in concat_thermo. With sort, the logs are ordered by their first value of the on column before stacking,
+        so keep='last' favours the run that started later.
+
+        :param others: Logs to merge with this one
+        :type others: Union[Thermospace, List[Thermospace]]
+        :param on: Column to find repeats in
+        :type on: str
+        :param keep: 'last' or 'first' row of each repeated value
+        :type keep: str
+        :param sort: Order the logs by their first on value, stable for ties
+        :type sort: bool
+        :param key: Name of an int column with the index of the source log in .files, None to skip
+        :type key: str
+        :return: Merged table
+        :rtype: Thermospace
+
+        :Example:
+            >>> import mooonpy
+            >>> logs = mooonpy.Thermospace.read_many('production/log.*.lammps')
+            >>> logs = list(logs.values())
+            >>> run = logs[0].merge(logs[1:], on='Step')
+        """
+        if isinstance(others, Thermospace):
+            others = [others]
+        thermos = [self] + list(others)
+        if sort:
+            firsts = [np.asarray(thermo[on])[0] if len(thermo.grid) and thermo.shape()[0] else np.inf
+                      for thermo in thermos]
+            thermos = [thermos[ii] for ii in np.argsort(firsts, kind='stable')]
+        out = concat_thermo(thermos, key=key).drop_repeats(on=on, keep=keep)
+        out.info = dict(self.info)
+        return out
+
+    def _take(self, mask: np.ndarray) -> 'Thermospace':
+        """New Thermospace with the rows in a bool mask and sections moved to match"""
+        before = np.concatenate(([0], np.cumsum(mask)))  # kept rows before each position
+        out = Thermospace()
+        out.grid = {name: np.asarray(column)[mask] for name, column in self.grid.items()}
+        if self.rows is not None:
+            out.rows = [label for label, kept in zip(self.rows, mask) if kept]
+        for sectionID, section in self.sections.items():
+            start = int(before[min(section.start, len(mask))])
+            stop = int(before[min(section.stop, len(mask))])
+            if isinstance(section, LogSection):
+                out.sections[sectionID] = section.moved(start, stop)
+            else:
+                out.sections[sectionID] = range(start, stop)
+        out.title = self.title
+        out.cornerlabel = self.cornerlabel
+        out.x_column = self.x_column
+        out.info = self.info
+        if hasattr(self, 'files'):
+            out.files = self.files
+        return out
 
     def __len__(self) -> Optional[int]:
         return self.shape()[0]
 
     @classmethod
+    def read(cls, file: Union[Path, str], silence_error_line: bool = False, columns: Optional[List[str]] = None,
+             lazy: Union[bool, Path, str] = False) -> 'Thermospace':
+        return readlog(file, silence_error_line=silence_error_line, columns=columns, lazy=lazy)
+    @classmethod
+    def follow(cls, file: Union[Path, str], silence_error_line: bool = False) -> 'ThermoFollower':
+        return ThermoFollower(file, silence_error_line=silence_error_line)
+    @classmethod
+    def read_many(cls, files: Union[Path, str, List[Union[Path, str]]], workers: Optional[int] = None,
+                  concat: bool = False, silence_error_line: bool = False,
+                  columns: Optional[List[str]] = None) -> Union[Dict[Path, 'Thermospace'], 'Thermospace']:
+        return readlog_many(files, workers=workers, concat=concat, silence_error_line=silence_error_line,
+                            columns=columns)
+    @classmethod
     def basic_read(cls, file: Union[Path, str], silence_error_line: bool = False) -> 'Thermospace':
         return readlog_basic(file, silence_error_line=silence_error_line)
     @classmethod
     def txt_read(cls, file: Union[Path, str], silence_error_line: bool = False) -> 'Thermospace':
         return readtxt_basic(file, silence_error_line=silence_error_line)
 
+def _error_stats(stack: np.ndarray) -> Dict[str, np.ndarray]:
+    """Error analysis of the series in the rows of stack"""
+    n_series, n = stack.shape
+    out = {'n': np.full(n_series, n)}
+    if n < 2:
+        for name in ['mean', 'std', 'g', 'tau', 'sem', 'sem block', 'sem block error', 'block size']:
+            out[name] = np.full(n_series, np.nan)
+        if n == 1:
+            out['mean'] = stack[:, 0]
+        return out
+    out['mean'] = stack.mean(axis=1)
+    out['std'] = stack.std(axis=1, ddof=1)
+    g = statistical_inefficiency(stack)
+    out['g'] = g
+    out['tau'] = (g - 1) / 2
+    out['sem'] = out['std'] * np.sqrt(g / n)
+    sizes, sems, errors, optimal = block_average(stack)
+    found = optimal >= 0
+    index = np.where(found, optimal, 0)
+    rows = np.arange(n_series)
+    out['sem block'] = np.where(found, sems[rows, index], np.nan)
+    out['sem block error'] = np.where(found, errors[rows, index], np.nan)
+    out['block size'] = np.where(found, sizes[index], np.nan)
+    return out
+
+
 def readtxt_basic(file: [Path, str], silence_error_line: bool = False) -> Thermospace:
     """
     Read a txt file as if it were a logfile into a Thermospace object
@@ -131,6 +469,211 @@ def readtxt_basic(file: [Path, str], silence_error_line: bool = False) -> Thermo
     out.sections = sections
     return out
 
+def readlog(file: [Path, str], silence_error_line: bool = False, columns: Optional[List[str]] = None,
+            lazy: Union[bool, Path, str] = False) -> Thermospace:
+    """
+    Read a single log file into a Thermospace object with the block based LogParser.
+    Sections are :class:`LogSection` objects holding the run metadata (timing breakdown, performance,
+    neighbor statistics, variables), and .info holds the LAMMPS version and total wall time.
+
+    Produces the same columns as readlog_basic, but each thermo block is converted to floats
+    with a single numpy call and copied into preallocated columns, so large logs read much faster.
+
+    For very large logs, columns limits the thermo keywords that are converted at all, and lazy writes
+    the columns to a directory of .npy files one at a time and returns a table that memory-maps each column
+    on first use. The store is reused by later reads while it is newer than the log.
+
+    :param file: path to a log file
+    :type file: [Path,str]
+    :param silence_error_line: silences error line and warnings if True (default False)
+    :type silence_error_line: bool
+    :param columns: Thermo keywords to keep, None for all. Metadata of every section is still read.
+    :type columns: List[str]
+    :param lazy: True to store columns in '<name>_<ext>_columns' next to the log, or a directory to store them in
+    :type lazy: Union[bool, Path, str]
+    :return: Thermospace object
+    :rtype: Thermospace
+
+    :Example:
+        >>> import mooonpy
+        >>> file = mooonpy.Path('somepath.log.lammps')
+        >>> MyLog = mooonpy.Thermospace.read(file)
+        >>> MyLog.csv(file.new_ext('.csv'))
+        >>> BigLog = mooonpy.Thermospace.read('big.log.lammps', columns=['Step', 'Temp', 'Press'], lazy=True)
+
+    .. seealso:: :func:`readlog_basic`, :class:`_files_io.read_logfile.LogParser`
+    .. note:: Section ranges end at the last row of each section, where readlog_basic extends the
+        final section by one row. WARNING lines inside thermo blocks are skipped instead of ending the read.
+    """
+    file = Path(file)
+    if not file:
+        raise Exception(f'File {file} not found')
+    if lazy is not False and lazy is not None:  # a store Path is falsy until it exists
+        return _readlog_lazy(file, silence_error_line, columns, lazy)
+    columns, sections, info = read_log_columns(file, silence_error_line=silence_error_line, columns=columns)
+    if len(columns) == 0 and not silence_error_line:
+        warnings.warn(f'File {file} Contains no thermo data.')
+    out = Thermospace()
+    out.grid = columns
+    out.title = file
+    out.sections = sections
+    out.info = info
+    return out
+
+def _readlog_lazy(file: Path, silence_error_line: bool, columns: Optional[List[str]],
+                  store: Union[bool, Path, str]) -> Thermospace:
+    """Parse into a .npy column store unless an up to date one exists, then load it lazily"""
+    if store is True:
+        store = file.dir() / (str(file.basename()).replace('.', '_') + '_columns')
+    store = Path(store)
+    source = {'file': os.path.abspath(file), 'size': os.path.getsize(file),
+              'columns': None if columns is None else sorted(columns)}
+    meta_file = store / 'meta.json'
+    if os.path.isfile(meta_file) and os.path.getmtime(meta_file) >= os.path.getmtime(file):
+        if read_meta(store).get('source') == source:
+            return Thermospace.load(store, mmap=True, lazy=True)
+
+    parser = parse_log(file, silence_error_line=silence_error_line, columns=columns)
+    if parser.rowindex == 0 and not silence_error_line:
+        warnings.warn(f'File {file} Contains no thermo data.')
+    out = Thermospace()
+    out.title = file
+    out.sections = parser.sections
+    out.info = parser.info
+    meta = out._meta()
+    meta['source'] = source
+    write_columns(store, parser.iter_columns(), meta)
+    parser.blocks = []
+    return Thermospace.load(store, mmap=True, lazy=True)
+
+def _read_columns(file: Path, silence_error_line: bool, columns: Optional[List[str]] = None) -> tuple:
+    """Process pool worker, returns arrays and small metadata objects so results pickle compactly"""
+    return read_log_columns(file, silence_error_line=silence_error_line, columns=columns)
+
+
+def readlog_many(files: Union[Path, str, List[Union[Path, str]]], workers: Optional[int] = None,
+                 concat: bool = False, silence_error_line: bool = False,
+                 columns: Optional[List[str]] = None) -> Union[Dict[Path, Thermospace], Thermospace]:
+    """
+    Read many log files in parallel processes, such as the logs of a parameter sweep.
+
+    Each worker parses one log with the block based LogParser and sends back column arrays,
+    which pickle as compact binary buffers instead of lists of Python objects.
+
+    :param files: Wildcard Path or string, or a list of paths and wildcards, expanded with Path.matches
+    :type files: Union[Path, str, List[Union[Path, str]]]
+    :param workers: Number of processes, defaults to None for os.cpu_count(). 1 reads in this process.
+    :type workers: int
+    :param concat: If True, return one Thermospace from :func:`concat_thermo` instead of a dict
+    :type concat: bool
+    :param silence_error_line: silences error line and warnings if True (default False)
+    :type silence_error_line: bool
+    :param columns: Thermo keywords to keep, None for all
+    :type columns: List[str]
+    :return: {file: Thermospace} in sorted file order, or a concatenated Thermospace
+    :rtype: Union[Dict[Path, Thermospace], Thermospace]
+
+    :Example:
+        >>> import mooonpy
+        >>> logs = mooonpy.Thermospace.read_many('sweep/*/log.lammps', workers=8)
+        >>> for file, log in logs.items():
+        ...     print(file, log['Temp'].mean())
+        >>> table = mooonpy.Thermospace.read_many('sweep/*/log.lammps', concat=True)
+    """
+    if isinstance(files, str):
+        files = [files]
+    paths = []
+    for pattern in files:
+        paths.extend(Path(pattern).matches())
+    paths = sorted(set(paths))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    silence = [silence_error_line] * len(paths)
+    keep = [columns] * len(paths)
+    if workers == 1:
+        results = list(map(_read_columns, paths, silence, keep))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_columns, paths, silence, keep))
+
+    out = {}
+    for file, (columns, sections, info) in zip(paths, results):
+        thermo = Thermospace()
+        thermo.grid = columns
+        thermo.title = file
+        thermo.sections = sections
+        thermo.info = info
+        out[file] = thermo
+    if concat:
+        return concat_thermo(list(out.values()))
+    return out
+
+
+def concat_thermo(thermos: List[Thermospace], key: Optional[str] = 'file') -> Thermospace:
+    """
+    Stack Thermospace objects row-wise into one Thermospace.
+
+    Columns are the union of all columns in order of first appearance, missing values are padded with np.nan,
+    and int columns stay int if no padding was needed. Sections are renumbered from 1 in order, and
+    the titles of the inputs are saved in the .files attribute.
+
+    :param thermos: Tables to stack
+    :type thermos: List[Thermospace]
+    :param key: Name of an int column added with the index of the source table in .files, None to skip
+    :type key: str
+    :return: Stacked table
+    :rtype: Thermospace
+    """
+    lengths = [thermo.shape()[0] or 0 for thermo in thermos]  # None for empty tables
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(int)
+    n_rows = int(offsets[-1])
+
+    kinds = {}  # column: dtype kind, 'f' if any table lacks it
+    for thermo in thermos:
+        for name, col in thermo.grid.items():
+            kind = np.asarray(col).dtype.kind
+            if name not in kinds:
+                kinds[name] = kind
+            elif kinds[name] != kind:
+                kinds[name] = 'f'
+    for name in kinds:
+        if any(name not in thermo.grid for thermo, length in zip(thermos, lengths) if length):
+            kinds[name] = 'f'
+
+    columns = {}
+    for name, kind in kinds.items():
+        if kind == 'i':
+            column = np.empty(n_rows, dtype=np.int64)
+        else:
+            column = np.full(n_rows, np.nan)
+        for thermo, start, stop in zip(thermos, offsets[:-1], offsets[1:]):
+            if name in thermo.grid:
+                column[start:stop] = thermo.grid[name]
+        columns[name] = column
+    if key is not None:
+        columns[key] = np.repeat(np.arange(len(thermos)), lengths)
+
+    sections = {}
+    sectionID = 0
+    for thermo, offset, length in zip(thermos, offsets[:-1], lengths):
+        for sect_range in thermo.sections.values():
+            sectionID += 1
+            stop = min(sect_range.stop, length)  # readlog_basic extends the last section by 1
+            if isinstance(sect_range, LogSection):
+                sections[sectionID] = sect_range.moved(sect_range.start + offset, stop + offset)
+            else:
+                sections[sectionID] = range(sect_range.start + offset, stop + offset)
+
+    out = Thermospace()
+    out.grid = columns
+    out.sections = sections
+    out.files = [thermo.title for thermo in thermos]
+    if thermos:
+        out.x_column = thermos[0].x_column
+    return out
+
 ## This should be refactored into _files_io but imports are being weird
 def readlog_basic(file: [Path, str], silence_error_line: bool = False) -> Thermospace:
     """
@@ -253,4 +796,174 @@ def readlog_basic(file: [Path, str], silence_error_line: bool = False) -> Thermo
     out.grid = columns
     out.title = file
     out.sections = sections
-    return out
\ No newline at end of file
+    return out
+
+
+class ThermoFollower(object):
+    """
+    Follow a growing LAMMPS log, such as a running simulation, and keep a Thermospace up to date.
+
+    The byte offset and LogParser state are kept between refreshes, so each :meth:`refresh` only
+    parses lines appended since the last call, and polling cost is proportional to new output.
+    Columns are kept in buffers with spare capacity and extended in place, and .thermo holds
+    views of the filled rows. Incomplete last lines are held back until their newline is written.
+
+    :Example:
+        >>> import mooonpy
+        >>> follower = mooonpy.Thermospace.follow('log.lammps')
+        >>> for new_rows in follower.follow(interval=5.0, timeout=600):
+        ...     print(new_rows['Step'][-1], follower.thermo['Temp'].mean())
+
+    .. seealso:: :class:`_files_io.read_logfile.LogParser`
+    .. note:: If the file shrinks, it is assumed to have been restarted and is read from the beginning.
+    """
+
+    def __init__(self, file: Union[Path, str], silence_error_line: bool = False):
+        self.file = Path(file)
+        self.silence_error_line = silence_error_line
+        self.reset()
+
+    def reset(self):
+        """Forget all parsed data and read from the start of the file on the next refresh"""
+        self.offset = 0  # bytes consumed, always at the start of a line
+        self.parser = LogParser(self.file, silence_error_line=self.silence_error_line)
+        self.thermo = Thermospace()
+        self.thermo.title = self.file
+        self.thermo.sections = self.parser.sections  # shared, updated by the parser
+        self.thermo.info = self.parser.info
+        self.n_rows = 0
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._consumed = 0  # parser blocks copied into buffers
+
+    def refresh(self) -> int:
+        """
+        Parse lines appended since the last refresh and extend the columns.
+
+        :return: Number of new rows
+        :rtype: int
+        """
+        if not self.file:
+            return 0
+        size = os.path.getsize(self.file)
+        if size < self.offset:  # truncated or replaced
+            self.reset()
+        if size == self.offset or self.parser.done:
+            return 0
+
+        with open(self.file, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b'\n') + 1  # hold back an incomplete line
+        if end == 0:
+            return 0
+        self.offset += end
+        self.parser.feed(data[:end].decode('utf-8', errors='replace').splitlines())
+        self.parser.flush()  # convert rows of the open block
+
+        old_rows = self.n_rows
+        for sectionID, keywords, array, start in self.parser.blocks[self._consumed:]:
+            self._extend(keywords, array, start)
+        self._consumed = len(self.parser.blocks)
+        for key, buffer in self._buffers.items():
+            self.thermo.grid[key] = buffer[:self.n_rows]
+        self.thermo.invalidate()
+        return self.n_rows - old_rows
+
+    def _extend(self, keywords, array, start):
+        stop = start + len(array)
+        if stop > self._capacity():
+            capacity = max(2 * self._capacity(), stop, 1024)
+            for key, buffer in self._buffers.items():
+                self._buffers[key] = _grow(buffer, capacity)
+        capacity = self._capacity() if self._buffers else max(stop, 1024)
+
+        for key in keywords:
+            if key not in self._buffers:
+                if start == 0:
+                    self._buffers[key] = np.empty(capacity, dtype=np.int64)
+                else:  # column appears after a thermo_style change, pad with nan
+                    self._buffers[key] = np.full(capacity, np.nan)
+        for key, buffer in self._buffers.items():
+            if key in keywords:
+                values = array[:, keywords.index(key)]
+                if buffer.dtype.kind == 'i':
+                    with np.errstate(invalid='ignore'):
+                        values_int = values.astype(np.int64)
+                    if np.array_equal(values, values_int):
+                        buffer[start:stop] = values_int
+                        continue
+                    buffer = self._buffers[key] = buffer.astype(float)
+                buffer[start:stop] = values
+            else:
+                if buffer.dtype.kind == 'i':
+                    buffer = self._buffers[key] = buffer.astype(float)
+                buffer[start:stop] = np.nan
+        self.n_rows = stop
+
+    def _capacity(self) -> int:
+        for buffer in self._buffers.values():
+            return len(buffer)
+        return 0
+
+    def new_rows(self, start: int) -> ColTable:
+        """
+        ColTable of views of the rows from index start to the current end.
+
+        :param start: First row index
+        :type start: int
+        :return: Table of new rows
+        :rtype: ColTable
+        """
+        out = ColTable(title=self.file)
+        out.x_column = self.thermo.x_column
+        for key, col in self.thermo.grid.items():
+            out[key] = col[start:]
+        return out
+
+    def follow(self, interval: float = 1.0, timeout: Optional[float] = None) -> Iterator[ColTable]:
+        """
+        Poll the file and yield a ColTable of new rows whenever the log grows.
+
+        :param interval: Seconds between polls
+        :type interval: float
+        :param timeout: Stop after this many seconds without new rows, defaults to None to follow until
+            the run ends ('Total wall time' line) or the parser finds an exit condition (ERROR or Ctrl-C lines)
+        :type timeout: float
+        :return: Generator of new row tables
+        :rtype: Iterator[ColTable]
+        """
+        last = time.monotonic()
+        while not self.parser.done:
+            start = self.n_rows
+            if self.refresh():
+                last = time.monotonic()
+                yield self.new_rows(start)
+            elif timeout is not None and time.monotonic() - last > timeout:
+                return
+            else:
+                time.sleep(interval)
+
+    async def afollow(self, interval: float = 1.0, timeout: Optional[float] = None) -> AsyncIterator[ColTable]:
+        """
+        Async generator version of :meth:`follow` for dashboards and event loops.
+        """
+        last = time.monotonic()
+        while not self.parser.done:
+            start = self.n_rows
+            if self.refresh():
+                last = time.monotonic()
+                yield self.new_rows(start)
+            elif timeout is not None and time.monotonic() - last > timeout:
+                return
+            else:
+                await asyncio.sleep(interval)
+
+
+def _grow(buffer: np.ndarray, capacity: int) -> np.ndarray:
+    """Copy buffer into a larger array of the same dtype"""
+    if buffer.dtype.kind == 'f':
+        out = np.full(capacity, np.nan)
+    else:
+        out = np.empty(capacity, dtype=buffer.dtype)
+    out[:len(buffer)] = buffer
+    return out
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+import importlib
+
+__all__ = ['columnar',
+           'csv_reader',
+           'text_writer',
+]
+
+for name in __all__:
+    module = importlib.import_module(f'.{name}', __package__)
+    globals()[name] = module
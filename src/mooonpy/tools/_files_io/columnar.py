@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Binary column storage for tables. Columns are written as whole numpy arrays, with the table
+attributes (title, x_column, sections ...) kept as JSON next to them.
+
+Formats by file extension:
+
+- '.npz': one numpy zip archive, uncompressed
+- no extension: a directory with one .npy file per column and meta.json, loads memory-mapped
+- '.parquet': Apache Parquet, requires pyarrow
+- '.feather' or '.arrow': Arrow IPC (Feather v2) uncompressed, loads memory-mapped, requires pyarrow
+"""
+import os
+import json
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, Tuple, Any, Iterable, Union
+
+from ..file_utils import Path
+
+META_KEY = '__meta__'
+META_FILE = 'meta.json'
+ARROW_EXTS = ['.parquet', '.feather', '.arrow']
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    elif isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, (range, set)):
+        return list(value)
+    raise TypeError(f'ERROR: {type(value)} is not JSON serializable')
+
+
+def _array(key, column) -> np.ndarray:
+    array = np.asarray(column)
+    if array.dtype.kind == 'O':
+        raise Exception(f'ERROR: Column {key} has object values and cannot be saved as a binary column')
+    return array
+
+
+def _label(key) -> str:
+    if not isinstance(key, str):
+        raise Exception(f'ERROR: Column label {key!r} is {type(key).__name__}, only str labels can be saved as binary columns')
+    return str(key)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        raise Exception('ERROR: pyarrow is required for Parquet and Feather files, pip install pyarrow')
+    return pyarrow
+
+
+def write_columns(file: Path, columns: Union[Dict[str, Any], Iterable[Tuple[str, Any]]], meta: Dict[str, Any]) -> None:
+    """
+    Write columns and table attributes to file, the format is set by the extension.
+
+    :param file: Output file, or directory for the .npy format
+    :type file: Path
+    :param columns: {label: column} or an iterable of (label, column) pairs, converted with np.asarray.
+        Labels must be str, other types would load back as different keys.
+        Pairs are written one at a time to directories, so a generator keeps one column in memory.
+    :type columns: Union[Dict[str, Any], Iterable[Tuple[str, Any]]]
+    :param meta: JSON compatible table attributes
+    :type meta: Dict[str, Any]
+    """
+    file = Path(file)
+    ext = os.path.splitext(file)[1].lower()  # Path('') normalizes to '.'
+    items = columns.items() if isinstance(columns, Mapping) else columns
+    meta = dict(meta)
+
+    if ext == '':
+        os.makedirs(file, exist_ok=True)
+        keys = []
+        for ii, (key, column) in enumerate(items):
+            key = _label(key)
+            array = _array(key, column)
+            np.save(str(file / f'c{ii}.npy'), array)
+            if not keys:
+                meta['n_rows'] = len(array)
+            keys.append(key)
+            del array, column  # release generated columns before the next one
+        meta['columns'] = keys
+        with open(file / META_FILE, 'w') as f:
+            f.write(json.dumps(meta, default=_json_default))
+        return
+
+    arrays = {_label(key): _array(key, column) for key, column in items}
+    meta['columns'] = list(arrays.keys())
+    if arrays:
+        meta['n_rows'] = len(next(iter(arrays.values())))
+    text = json.dumps(meta, default=_json_default)
+    if ext == '.npz':
+        ## stored by index so labels with any characters are safe archive names
+        np.savez(str(file), **{f'c{ii}': array for ii, array in enumerate(arrays.values())},
+                 **{META_KEY: np.array(text)})
+    elif ext in ARROW_EXTS:
+        pa = _pyarrow()
+        table = pa.table(arrays)
+        table = table.replace_schema_metadata({META_KEY: text})
+        if ext == '.parquet':
+            pa.parquet.write_table(table, file)
+        else:
+            pa.feather.write_feather(table, file, compression='uncompressed')
+    else:
+        raise Exception(f'ERROR: {ext} is not a binary table format, use .npz, .parquet, .feather or no extension')
+
+
+def read_columns(file: Path, mmap: bool = False) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Read columns and table attributes written by :func:`write_columns`.
+
+    :param file: Input file or directory
+    :type file: Path
+    :param mmap: Memory-map the columns instead of reading them, for directories and Feather files.
+        Columns are then read-only and load from disk as they are used.
+    :type mmap: bool
+    :return: columns and table attributes
+    :rtype: Tuple[Dict[str, np.ndarray], Dict[str, Any]]
+    """
+    file = Path(file)
+    ext = os.path.splitext(file)[1].lower()  # Path('') normalizes to '.'
+    if not os.path.exists(file):
+        raise Exception(f'ERROR: File {file} not found')
+
+    if ext == '.npz':
+        with np.load(str(file)) as archive:
+            meta = json.loads(str(archive[META_KEY]))
+            columns = {key: archive[f'c{ii}'] for ii, key in enumerate(meta['columns'])}
+    elif ext in ARROW_EXTS:
+        pa = _pyarrow()
+        if ext == '.parquet':
+            table = pa.parquet.read_table(file, memory_map=mmap)
+        else:
+            table = pa.feather.read_table(file, memory_map=mmap)
+        meta = json.loads(table.schema.metadata[META_KEY.encode()])
+        columns = {key: table.column(key).to_numpy() for key in meta['columns']}
+    elif os.path.isdir(file):
+        with open(file / META_FILE) as f:
+            meta = json.load(f)
+        mode = 'r' if mmap else None
+        ## str paths, np.memmap expects pathlib for other PathLike objects
+        columns = {key: np.load(str(file / f'c{ii}.npy'), mmap_mode=mode) for ii, key in enumerate(meta['columns'])}
+    else:
+        raise Exception(f'ERROR: {ext} is not a binary table format, use .npz, .parquet, .feather or no extension')
+    return columns, meta
+
+
+def read_meta(file: Path) -> Dict[str, Any]:
+    """
+    Read only the table attributes written by :func:`write_columns`, with the column labels in meta['columns'].
+
+    :param file: Input file or directory
+    :type file: Path
+    :return: table attributes
+    :rtype: Dict[str, Any]
+    """
+    file = Path(file)
+    ext = os.path.splitext(file)[1].lower()
+    if not os.path.exists(file):
+        raise Exception(f'ERROR: File {file} not found')
+
+    if ext == '.npz':
+        with np.load(str(file)) as archive:
+            return json.loads(str(archive[META_KEY]))
+    elif ext in ARROW_EXTS:
+        pa = _pyarrow()
+        if ext == '.parquet':
+            schema = pa.parquet.read_schema(file)
+        else:
+            with pa.memory_map(str(file)) as source:
+                schema = pa.ipc.open_file(source).schema
+        return json.loads(schema.metadata[META_KEY.encode()])
+    elif os.path.isdir(file):
+        with open(file / META_FILE) as f:
+            return json.load(f)
+    raise Exception(f'ERROR: {ext} is not a binary table format, use .npz, .parquet, .feather or no extension')
+
+
+def read_column(file: Path, meta: Dict[str, Any], key: str, mmap: bool = False) -> np.ndarray:
+    """
+    Read one column of a file written by :func:`write_columns`, without reading the others.
+
+    :param file: Input file or directory
+    :type file: Path
+    :param meta: Table attributes from :func:`read_meta`
+    :type meta: Dict[str, Any]
+    :param key: Column label
+    :type key: str
+    :param mmap: Memory-map the column, for directories and Feather files
+    :type mmap: bool
+    :return: column
+    :rtype: np.ndarray
+    """
+    file = Path(file)
+    ext = os.path.splitext(file)[1].lower()
+    index = meta['columns'].index(key)
+    if ext == '.npz':
+        with np.load(str(file)) as archive:  # members are only decompressed when accessed
+            return archive[f'c{index}']
+    elif ext in ARROW_EXTS:
+        pa = _pyarrow()
+        if ext == '.parquet':
+            table = pa.parquet.read_table(file, columns=[key], memory_map=mmap)
+        else:
+            table = pa.feather.read_table(file, columns=[key], memory_map=mmap)
+        return table.column(key).to_numpy()
+    return np.load(str(file / f'c{index}.npy'), mmap_mode='r' if mmap else None)
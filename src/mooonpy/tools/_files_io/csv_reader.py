@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked csv reader for tables. Chunks of lines are split with one str.split call into a flat list of
+cells, or with the csv module when they contain quotes so quoted cells may contain commas.
+Only the requested columns are kept, and each is converted with one numpy call.
+"""
+import csv
+import numpy as np
+from itertools import islice
+from typing import Optional, List, Tuple, Union, Sequence, Iterator
+
+from ..file_utils import Path, smart_open
+
+
+def infer_column(values: Sequence[str]) -> Union[np.ndarray, List[str]]:
+    """
+    Convert a column of strings to an int or float array, or stripped strings if it is not numeric.
+    Empty cells are np.nan in numeric columns, and float columns with only whole numbers become int.
+
+    :param values: Cell strings
+    :type values: Sequence[str]
+    :return: int64 array, float array or list of str
+    :rtype: Union[np.ndarray, List[str]]
+
+    :Example:
+        >>> infer_column(['1', '2'])
+        array([1, 2])
+        >>> infer_column(['1.5', ''])
+        array([1.5, nan])
+        >>> infer_column([' a', 'b'])
+        ['a', 'b']
+    """
+    try:
+        column = np.array(values, dtype=float)
+    except ValueError:
+        stripped = [value.strip() for value in values]
+        try:
+            column = np.array([value if value else 'nan' for value in stripped], dtype=float)
+        except ValueError:
+            return stripped
+    with np.errstate(invalid='ignore'):  # nan and inf do not cast
+        col_int = column.astype(np.int64)
+    if np.array_equal(column, col_int):
+        return col_int
+    return column
+
+
+def read_csv_cells(file, header: bool = True, rowlabels: bool = False, usecols: Optional[list] = None,
+                   nrows: Optional[int] = None, chunk: int = 65536) -> Tuple[list, Optional[str], Optional[list], List[list]]:
+    """
+    Read the cells of a csv file column by column.
+
+    :param file: csv file, compressed files are opened with smart_open
+    :type file: Path
+    :param header: First line has column labels, otherwise columns are labelled 0, 1, ...
+    :type header: bool
+    :param rowlabels: First cell of each row is a row label
+    :type rowlabels: bool
+    :param usecols: Labels or indexes of the columns to keep, in file order. None keeps all columns.
+    :type usecols: list
+    :param nrows: Maximum number of data rows to read
+    :type nrows: int
+    :param chunk: Rows split per step
+    :type chunk: int
+    :return: column labels, corner label, row labels (None if rowlabels is False) and lists of cell strings
+    :rtype: Tuple[list, Optional[str], Optional[list], List[list]]
+    """
+    file = Path(file)
+    with smart_open(file, 'r') as f:
+        blocks = _blocks(f, chunk, file)
+        first = None
+        for cells, n in blocks:
+            if cells:
+                first = cells[:n]
+                blocks = _chain((cells[n:], n), blocks)
+                break
+        if first is None:
+            return [], None, [] if rowlabels else None, []
+
+        offset = 1 if rowlabels else 0
+        corner = None
+        if header:
+            keys = [key.strip() for key in first[offset:]]
+            if rowlabels:
+                corner = first[0].strip()
+        else:
+            keys = list(range(len(first) - offset))
+            blocks = _chain((first, n), blocks)
+        if keys and keys[-1] == '':
+            keys.pop(-1)  # remove trailing comma
+
+        if usecols is None:
+            indexes = list(range(len(keys)))
+        else:
+            indexes = sorted(set(_index(keys, col, file) for col in usecols))
+        labels = [keys[index] for index in indexes]
+        positions = [index + offset for index in indexes]
+
+        rows = [] if rowlabels else None
+        columns = [[] for _ in positions]
+        remaining = nrows
+        for cells, n in blocks:
+            n_lines = len(cells) // n
+            if remaining is not None:
+                n_lines = min(n_lines, remaining)
+                cells = cells[:n_lines * n]
+                remaining -= n_lines
+            if rowlabels:
+                rows.extend([label.strip() for label in cells[0::n]])
+            for column, position in zip(columns, positions):
+                if position < n:
+                    column.extend(cells[position::n])
+                else:  # short rows
+                    column.extend([''] * n_lines)
+            if remaining == 0:
+                break
+    return labels, corner, rows, columns
+
+
+def _blocks(f, chunk: int, file) -> Iterator[Tuple[list, int]]:
+    """
+    Split chunks of lines into one flat list of cells and the number of cells per row.
+    Cells of column j are then cells[j::n], which keeps few Python containers alive.
+    """
+    while True:
+        lines = list(islice(f, chunk))
+        if not lines:
+            return
+        text = ''.join(lines)
+        if not text.endswith('\n'):
+            text += '\n'
+        if '"' not in text and '\r' not in text:
+            n = lines[0].count(',') + 1
+            cells = text.replace('\n', ',').split(',')
+            if len(cells) == len(lines) * n + 1:  # every line has the same number of cells
+                cells.pop(-1)
+                yield cells, n
+                continue
+
+        ## slow path for quotes, blank lines, windows line endings and ragged rows
+        try:
+            block = [line for line in csv.reader(lines) if line and line != ['']]
+        except csv.Error:
+            raise Exception(f'ERROR: CSV file {file} has a quote error')
+        n = max((len(line) for line in block), default=1)
+        cells = []
+        for line in block:
+            cells.extend(line)
+            if len(line) < n:
+                cells.extend([''] * (n - len(line)))
+        yield cells, n
+
+
+def _index(keys: list, col, file) -> int:
+    """Index of a usecols entry, by label first then by position"""
+    if col in keys:
+        return keys.index(col)
+    try:
+        index = int(col)
+    except (TypeError, ValueError):
+        index = -1
+    if not 0 <= index < len(keys):
+        raise Exception(f'ERROR: Column {col} not found in {file}')
+    return index
+
+
+def _chain(first, blocks):
+    yield first
+    yield from blocks
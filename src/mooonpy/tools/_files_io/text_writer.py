@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk text writer for tables. Gives the same lines as Table.yield_line, but each row is formatted
+with one printf style template built from the cell formats, and rows are written in chunks.
+"""
+import re
+import numpy as np
+from typing import Optional, List, Sequence
+
+## only plain '{:spec}' cells are translated, anything else is formatted per cell
+_SPEC = re.compile(r'^\{:(?:(?P<fill>.)?(?P<align>[<>^=]))?(?P<sign>[+ -])?(?P<zero>0)?(?P<width>\d+)?'
+                   r'(?P<precision>\.\d+)?(?P<type>[a-zA-Z%])?\}$')
+_TYPES = {'f': 'eEfFgG', 'i': 'deEfFgGxXo', 'U': 's'}
+
+
+def percent_format(cell: str, kind: str) -> Optional[str]:
+    """
+    Translate a str.format cell such as '{:< 8.3f}' to the equivalent % format '%- 8.3f'.
+
+    :param cell: str.format cell with one replacement field
+    :type cell: str
+    :param kind: numpy dtype kind of the values, 'f' for float, 'i' for int or 'U' for str
+    :type kind: str
+    :return: % format, or None if there is no exact equivalent
+    :rtype: Optional[str]
+
+    :Example:
+        >>> percent_format('{:< 8.3f}', 'f')
+        '%- 8.3f'
+        >>> percent_format('{:^8}', 'f') is None
+        True
+    """
+    match = _SPEC.match(cell)
+    if match is None:
+        return None
+    fill, align, sign, zero, width, precision, type_ = match.groups()
+    if fill not in (None, ' ') or align in ('^', '=') or (zero and align):
+        return None
+
+    if type_ is None:
+        if kind == 'i':
+            type_ = 'd'
+        elif kind == 'U' or precision is None:
+            if sign or zero:
+                return None
+            type_ = 's'  # str(value) is the default format of floats and strings
+        else:
+            return None
+    elif type_ not in _TYPES[kind]:
+        return None
+
+    flags = ''
+    if align == '<' or (align is None and kind == 'U'):  # strings are left aligned by default
+        flags += '-'
+    if sign and sign != '-':
+        flags += sign
+    if zero:
+        flags += '0'
+    return '%' + flags + (width or '') + (precision or '') + type_
+
+
+def _as_array(column):
+    """Lists with only floats or only ints as arrays, other columns unchanged"""
+    if isinstance(column, np.ndarray) or len(column) == 0:
+        return column
+    types = set(map(type, column))
+    try:
+        if types == {float}:
+            return np.array(column, dtype=float)
+        elif types == {int}:
+            return np.array(column, dtype=np.int64)
+    except OverflowError:
+        pass
+    return column
+
+
+def _kind(column) -> Optional[str]:
+    """Kind of a column with an exact % format, None for other columns"""
+    if not isinstance(column, np.ndarray) or column.ndim != 1:
+        return None
+    if column.dtype == np.float64:  # np.float64 is a float, so yield_line uses float_cell
+        return 'f'
+    elif column.dtype.kind in 'iu':
+        return 'i'
+    elif column.dtype.kind == 'U':
+        return 'U'
+    return None
+
+
+def _cells(column, cell: str, float_cell: str) -> List[str]:
+    """Per cell formatting with the same rules as yield_line"""
+    out = []
+    for value in column:
+        if value is None:
+            out.append('')
+        elif isinstance(value, float):
+            out.append(float_cell.format(value))
+        else:
+            out.append(cell.format(value))
+    return out
+
+
+def row_template(columns: Sequence, cell: str, float_cell: str, delim: str, labels: Optional[list] = None):
+    """
+    Build the row template and the per column values that fill it.
+
+    :return: template and list of value lists, row labels first if given
+    :rtype: Tuple[str, List[list]]
+    """
+    delim = delim.replace('%', '%%')
+    template = ''
+    values = []
+    if labels is not None:
+        template += '%s' + delim
+        values.append([cell.format(label) for label in labels])
+    for column in columns:
+        column = _as_array(column)
+        kind = _kind(column)
+        if kind == 'f':
+            piece = percent_format(float_cell, kind)
+        elif kind is not None:
+            piece = percent_format(cell, kind)
+        else:
+            piece = None
+
+        if piece is None:
+            template += '%s' + delim
+            values.append(_cells(column, cell, float_cell))
+        else:
+            template += piece + delim
+            values.append(column.tolist())  # python scalars format faster than numpy scalars
+    return template, values
+
+
+def write_table(table, f, chunk: int = 65536, skip_header: bool = False) -> None:
+    """
+    Write a table to an open text file with the same lines as table.yield_line.
+
+    :param table: ColTable, ArrayTable or ListListTable
+    :type table: Table
+    :param f: Open text file
+    :type f: TextIO
+    :param chunk: Rows formatted and written per write call
+    :type chunk: int
+    :param skip_header: Skip the first line
+    :type skip_header: bool
+    """
+    head, space_line = table._head_lines()
+    if skip_header:
+        head = head[1:]
+    if head:
+        f.write('\n'.join(head) + '\n')
+
+    n_rows = table.shape()[0]
+    if n_rows is None:
+        raise Exception(f'ERROR: Table {table.title} columns have different lengths and cannot be written')
+    columns = table._text_columns()
+    labels = table.rowlabels() or None
+    template, values = row_template(columns, table.cell, table.float_cell, table.delim, labels)
+
+    for start in range(0, n_rows, chunk):
+        stop = min(start + chunk, n_rows)
+        if values:
+            rows = zip(*[column[start:stop] for column in values])
+        else:  # no columns or labels, yield_line gives empty lines
+            rows = [()] * (stop - start)
+        f.write('\n'.join([template % row for row in rows]) + '\n')
+    if space_line:
+        f.write(space_line + '\n')
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import bz2
-import glob
+import fnmatch
 import gzip
 import lzma
 import os
-from typing import List, Optional, Union
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 class Path(str):
     """
@@ -153,7 +155,7 @@ class Path(str):
 
     def __iter__(self) -> iter:
         """
-        Iterates through matching paths with a * (asterisk) wildcard character.
+        Iterates through matching paths with *, ? and [] wildcards, and ** for any subdirectories.
 
         :return: iter object of List of matching Paths
 
@@ -223,10 +225,17 @@ class Path(str):
         """
         return Path(os.path.splitext(self.basename())[1])
 
-    def matches(self) -> List['Path']:
+    def matches(self, ttl: Optional[float] = None) -> List['Path']:
         """
-        Finds matching paths with a * (asterisk) wildcard character.
+        Finds matching paths with *, ? and [] wildcards, and ** for any depth of subdirectories.
 
+        Directories are listed once each with os.scandir, as with glob.glob hidden files only match
+        patterns starting with a '.'. Matches are sorted.
+
+        :param ttl: Reuse directory listings younger than ttl seconds, defaults to None to list again without
+                    caching. Saves repeated scans of large or network trees, new files show up after ttl
+                    or :func:`clear_listing_cache`.
+        :type ttl: float
         :return: List of matching Paths
         :rtype: List[Path]
 
@@ -234,9 +243,11 @@ class Path(str):
             >>> from mooonpy import Path
             >>> MyWildcard = Path('*.mol')
             >>> print(Path.matches(MyWildcard))
-            [Path('DETDA.mol'), Path('DEGBF.mol')]
+            [Path('DEGBF.mol'), Path('DETDA.mol')]
+            >>> print(Path('Project/**/log.lammps').matches(ttl=60))
+            [Path('Project/log.lammps'), Path('Project/Cure/log.lammps')]
         """
-        return [Path(file) for file in glob.glob(self)]
+        return [str.__new__(Path, file) for file, entry in _scan(self, ttl)]  # already normalized
 
     def new_ext(self, ext: Union[str, 'Path']) -> 'Path':
         """
@@ -275,12 +286,15 @@ class Path(str):
         """
         return smart_open(self, mode, encoding)
 
-    def recent(self, oldest: bool = False) -> Optional['Path']:
+    def recent(self, oldest: bool = False, ttl: Optional[float] = None) -> Optional['Path']:
         """
         Find wildcard matches and return the Path of the most recently modified file.
+        Modification times come from the same scan as the matches, ties go to the first sorted match.
 
         :param oldest: Reverses direction and finds least recently modified file.
         :type oldest: bool
+        :param ttl: Reuse directory listings younger than ttl seconds, as in matches
+        :type ttl: float
         :return: Path of most recently modified file
         :rtype: Path
 
@@ -292,17 +306,17 @@ class Path(str):
             >>> print(Path.recent(oldest=True))
             'Template_1.lmpmol'
         """
-        times = {}
-        for file in self:
-            times[os.path.getmtime(file)] = file
-        if times:
-            sorted_time = sorted(list(times.keys()))
-            if oldest:
-                return times[sorted_time[0]]
-            else:
-                return times[sorted_time[-1]]
-        else:
+        newest = None
+        for file, entry in _scan(self, ttl):
+            try:
+                mtime = entry.stat().st_mtime if entry is not None else os.stat(file).st_mtime
+            except OSError:  # removed since listing
+                continue
+            if newest is None or (mtime < newest[0] if oldest else mtime > newest[0]):
+                newest = (mtime, file)
+        if newest is None:
             return None
+        return str.__new__(Path, newest[1])
 
     def root(self) -> 'Path':
         """
@@ -323,6 +337,112 @@ class Path(str):
 
 # End of Path
 
+## Directory listings for Path.matches with a ttl, {abspath: (time listed, [DirEntry])}. DirEntry caches its stat
+_LISTINGS: Dict[str, Tuple[float, List[os.DirEntry]]] = {}
+
+
+def clear_listing_cache() -> None:
+    """
+    Drop the directory listings cached by Path.matches and Path.recent with a ttl,
+    so the next call with a ttl sees files written since.
+
+    :Example:
+        >>> from mooonpy.tools.file_utils import clear_listing_cache
+        >>> logs = Path('runs/**/log.lammps').matches(ttl=600)
+        >>> # ... start new runs ...
+        >>> clear_listing_cache()
+    """
+    _LISTINGS.clear()
+
+
+def _has_magic(part: str) -> bool:
+    return any(char in part for char in '*?[')
+
+
+def _listdir(dirname: str, ttl: Optional[float]) -> List[os.DirEntry]:
+    """Entries of a directory, from the listing cache if younger than ttl seconds. Only cached with a ttl"""
+    if ttl:
+        key = os.path.abspath(dirname or os.curdir)
+        now = time.monotonic()
+        cached = _LISTINGS.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+    try:
+        with os.scandir(dirname or os.curdir) as it:
+            entries = list(it)
+    except OSError:  # missing, not a directory or no permission
+        entries = []
+    if ttl:
+        _LISTINGS[key] = (now, entries)
+    return entries
+
+
+def _prefix(path: str) -> str:
+    """Path with a trailing separator to prepend to names, cheaper than os.path.join per file"""
+    return path if not path or path.endswith(os.sep) else path + os.sep
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _scan(pattern: str, ttl: Optional[float]) -> List[Tuple[str, Optional[os.DirEntry]]]:
+    """
+    Sorted (path, DirEntry) matches of a wildcard pattern, walking the pattern one directory level
+    at a time. The entry is None for the literal parts that are checked without a listing.
+    """
+    drive, rest = os.path.splitdrive(pattern)
+    base = drive
+    if rest.startswith(os.sep):
+        base += os.sep
+    parts = [part for part in rest.split(os.sep) if part]
+    if not _has_magic(rest):
+        return [(pattern, None)] if os.path.lexists(pattern) else []
+
+    ## candidates are (path, entry) pairs, directories until the last part
+    candidates: List[Tuple[str, Optional[os.DirEntry]]] = [(base, None)]
+    recursive = False
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        found = []
+        if part == '**':
+            stack = list(candidates)  # like glob, the starting directories match too
+            while stack:
+                path, entry = stack.pop()
+                if path or not last:  # the current directory of a relative pattern is not a match
+                    found.append((path, entry))
+                prefix = _prefix(path)
+                for child in _listdir(path, ttl):
+                    if child.name.startswith('.'):
+                        continue
+                    if _is_dir(child):
+                        stack.append((prefix + child.name, child))
+                    elif last:
+                        found.append((prefix + child.name, child))
+        elif not _has_magic(part):
+            for path, entry in candidates:
+                joined = os.path.join(path, part)
+                if os.path.lexists(joined):
+                    found.append((joined, None))
+        else:
+            match = re.compile(fnmatch.translate(part), re.IGNORECASE if os.path.normcase('A') == 'a' else 0).match
+            hidden = part.startswith('.')
+            for path, entry in candidates:
+                prefix = _prefix(path)
+                for child in _listdir(path, ttl):
+                    name = child.name
+                    if match(name) and (hidden or not name.startswith('.')) and (last or _is_dir(child)):
+                        found.append((prefix + name, child))
+        if part == '**':
+            if recursive:  # nested starting directories reach the same paths again
+                found = list(dict(found).items())
+            recursive = True
+        candidates = found
+    return sorted(candidates)
+
 #%% Misc file tools
 def smart_open(filename, mode='r', encoding='utf-8'):
     """
@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
-from itertools import product
+import os
+import json
+from itertools import product, accumulate
 from collections import defaultdict
-from typing import Dict, List, Tuple, Union, Any, Optional, Iterator, Iterable
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from numbers import Number
+from typing import Dict, List, Tuple, Union, Any, Optional, Iterator, Iterable, Callable
 from dataclasses import dataclass
 
+import numpy as np
+
 from . file_utils import Path
+from .tables import ColTable
 
 
 @dataclass
@@ -174,6 +182,52 @@ class Cartesian:
             self.dimensions[dimension] = dim_info
             self.dimension_sizes[dimension] = len(base_entry.iterable)
 
+        self._build_index_tables()
+
+    def _build_index_tables(self) -> None:
+        """
+        Precompute the lookup tables used for counting and random access.
+
+        Triggered conditionals of one dimension are alternatives that add up, and
+        triggered dimensions multiply, so the number of results of a combination is the
+        product of one weight per dimension. Cumulative weights per dimension then
+        decode a global index like a mixed-radix number without generating the product.
+        """
+        self._dim_names: List[str] = list(self.dimensions.keys())
+        self._triggers: List[List[List[DimensionEntry]]] = []
+        self._cumulative: List[List[int]] = []
+        self._value_index: List[Dict[Any, int]] = []
+        self._combo_strides: Dict[Tuple[str, ...], List[Tuple[str, int]]] = {}
+
+        for dim_name in self._dim_names:
+            dim_info = self.dimensions[dim_name]
+            for cond_entry in dim_info.conditionals:
+                if len(cond_entry.iterable) == 0:
+                    raise ValueError(f"Conditional entry '{cond_entry.cart_key}' must not be empty")
+
+            triggers = [[cond_entry for cond_entry in dim_info.conditionals if cond_entry.condition == str(dim_idx)]
+                        for dim_idx in range(dim_info.size)]
+            weights = [sum(len(cond_entry.iterable) for cond_entry in triggered) or 1 for triggered in triggers]
+            self._triggers.append(triggers)
+            self._cumulative.append([0] + list(accumulate(weights)))
+
+            value_index: Dict[Any, int] = {}
+            for dim_idx, value in enumerate(dim_info.base.iterable):
+                try:
+                    value_index.setdefault(value, dim_idx)
+                except TypeError:  # unhashable values fall back to a search
+                    value_index = {}
+                    break
+            self._value_index.append(value_index)
+
+        # Number of results spanned by all later dimensions, for each dimension
+        self._spans: List[int] = [1] * len(self._dim_names)
+        span = 1
+        for position in reversed(range(len(self._dim_names))):
+            self._spans[position] = span
+            span *= self._cumulative[position][-1]
+        self._length = span
+
     def __iter__(self, return_combined_indices: Optional[List[Tuple[str, ...]]] = None) -> Iterator[CartesianResult]:
         """Call generator function. """
         return self.generate(return_combined_indices)
@@ -190,17 +244,12 @@ class Cartesian:
         Yields:
             CartesianResult containing {name: value} pairs with index attributes populated
         """
-        # Get dimension names in sorted order
-        dim_names = sorted(self.dimensions.keys(), key=str)
-
-        # Validate combined index requests
-        if return_combined_indices:
-            for dim_combo in return_combined_indices:
-                if not all(dim in self.dimensions for dim in dim_combo):
-                    raise ValueError(f"Unknown dimensions in combination: {dim_combo}")
+        self._check_combined_indices(return_combined_indices)
+        dim_names = self._dim_names
+        dim_infos = [self.dimensions[dim] for dim in dim_names]
 
         # Generate all combinations of dimension indices
-        dim_ranges = [range(self.dimensions[dim].size) for dim in dim_names]
+        dim_ranges = [range(dim_info.size) for dim_info in dim_infos]
 
         global_idx = 0
         for dim_indices in product(*dim_ranges):
@@ -213,25 +262,17 @@ class Cartesian:
             # Track if any conditionals were triggered
             conditional_results: List[Dict[str, Any]] = []
 
-            for dim_name, dim_idx in zip(dim_names, dim_indices):
-                dim_info = self.dimensions[dim_name]
-
+            for position, (dim_info, dim_idx) in enumerate(zip(dim_infos, dim_indices)):
                 # Add base values
                 base_entry = dim_info.base
                 result[base_entry.name] = base_entry.iterable[dim_idx]
 
                 # Add parallel values
-                for para in self.dimensions[dim_name].parallels:
+                for para in dim_info.parallels:
                     result[para.name] = para.iterable[dim_idx]
 
-                # Check for conditional values
-                triggered_conditionals: List[DimensionEntry] = []
-                for cond_entry in dim_info.conditionals:
-                    condition = cond_entry.condition
-                    if condition is not None and str(dim_idx) == str(condition):
-                        triggered_conditionals.append(cond_entry)
-
                 # If conditionals are triggered, generate combinations
+                triggered_conditionals = self._triggers[position][dim_idx]
                 if triggered_conditionals:
                     if not conditional_results:
                         conditional_results = [{}]
@@ -267,6 +308,25 @@ class Cartesian:
                 )
                 global_idx += 1
 
+    def _check_combined_indices(self, return_combined_indices: Optional[List[Tuple[str, ...]]]) -> None:
+        """Validate combined index requests."""
+        if return_combined_indices:
+            for dim_combo in return_combined_indices:
+                if not all(dim in self.dimensions for dim in dim_combo):
+                    raise ValueError(f"Unknown dimensions in combination: {dim_combo}")
+
+    def _strides(self, dim_combo: Tuple[str, ...]) -> List[Tuple[str, int]]:
+        """Cached (dimension, multiplier) pairs of a combined index, last dimension fastest."""
+        strides = self._combo_strides.get(dim_combo)
+        if strides is None:
+            strides = []
+            multiplier = 1
+            for dim in reversed(dim_combo):
+                strides.append((dim, multiplier))
+                multiplier *= self.dimension_sizes[dim]
+            self._combo_strides[dim_combo] = strides
+        return strides
+
     def _create_result(self,
                        result: Dict[str, Any],
                        global_idx: int,
@@ -278,16 +338,8 @@ class Cartesian:
         if return_combined_indices:
             combined_indices = {}
             for dim_combo in return_combined_indices:
-                # Calculate combined index
-                combined_idx = 0
-                multiplier = 1
-
-                # Process dimensions in reverse order for proper indexing
-                for dim in reversed(dim_combo):
-                    combined_idx += dim_index_map[dim] * multiplier
-                    multiplier *= self.dimension_sizes[dim]
-
-                combined_indices[dim_combo] = combined_idx
+                combined_indices[dim_combo] = sum(dim_index_map[dim] * multiplier
+                                                  for dim, multiplier in self._strides(dim_combo))
 
         # Always create result with index information
         return CartesianResult(
@@ -312,32 +364,270 @@ class Cartesian:
             raise ValueError(f"Unknown dimensions: {dimension_combo}")
 
         combined_idx = 0
-        multiplier = 1
-
-        for dim in reversed(dimension_combo):
-            dim_info = self.dimensions[dim]
-            base_entry = dim_info.base
+        for dim, multiplier in self._strides(tuple(dimension_combo)):
+            base_entry = self.dimensions[dim].base
+            value_index = self._value_index[self._dim_names.index(dim)]
 
             # Find index of value in dimension
             try:
-                dim_idx = list(base_entry.iterable).index(value_dict[base_entry.name])
-            except (ValueError, KeyError):
+                value = value_dict[base_entry.name]
+                dim_idx = value_index[value] if value_index else list(base_entry.iterable).index(value)
+            except (ValueError, KeyError, TypeError):
                 raise ValueError(f"Value not found for dimension {dim}")
 
             combined_idx += dim_idx * multiplier
-            multiplier *= self.dimension_sizes[dim]
 
         return combined_idx
 
+    def map(self, func: Callable[[CartesianResult], Any], workers: Optional[int] = None, backend: str = 'process',
+            ledger: Optional[Union[str, Path]] = None, chunksize: Optional[int] = None,
+            return_combined_indices: Optional[List[Tuple[str, ...]]] = None) -> ColTable:
+        """
+        Run func on every result of the sweep in parallel and collect the outputs in one table.
+
+        func gets the CartesianResult and returns a dict of {column: value} or a single value
+        for the 'result' column. Combinations that raise give empty cells, np.nan in numeric
+        columns, and the message in the 'error' column.
+
+        With a ledger, every finished combination is appended to that JSON-lines file keyed by
+        its {name: value} pairs, and combinations already in the ledger are not run again. An
+        interrupted or extended sweep resumes by calling map again with the same ledger. Failed
+        combinations are not recorded so they are retried. Outputs should be JSON serializable,
+        other objects are stored as their str.
+
+        Args:
+            func: Function of one CartesianResult. The process backend needs a module level function.
+            workers: Number of workers, defaults to None for os.cpu_count(). 1 runs in this process.
+            backend: 'process' for CPU bound Python work, 'thread' for functions waiting on subprocesses or files
+            ledger: JSON-lines file of finished combinations, created if missing
+            chunksize: Combinations sent to a worker at once, and recorded together
+            return_combined_indices: List of dimension name tuples for combined indexing
+
+        Returns:
+            ColTable with one row per combination in generation order, the {name: value}
+            columns first, then the outputs of func and 'error'. Outputs named like a
+            parameter or 'error' are prefixed with 'out_'.
+
+        Example:
+            >>> cart = Cartesian({'temp': [300, 400], 'rate': [1e8, 1e9]})
+            >>> table = cart.map(run_simulation, workers=4, ledger='sweep.jsonl')
+            >>> table['modulus']
+        """
+        if backend not in ['process', 'thread']:
+            raise ValueError(f"Unknown backend '{backend}', use 'process' or 'thread'")
+        results = self.generate_list(return_combined_indices=return_combined_indices)
+        keys = [_sweep_key(result) for result in results]
+
+        done: Dict[str, Dict[str, Any]] = {}
+        line = '\n'
+        if ledger is not None and os.path.exists(ledger):
+            with open(ledger, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:  # partly written line of an interrupted run
+                        continue
+                    done[record['key']] = record['row']
+
+        outputs: List[Optional[Dict[str, Any]]] = [done.get(key) for key in keys]
+        errors = [''] * len(results)
+        pending = [global_idx for global_idx, output in enumerate(outputs) if output is None]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending) or 1))
+        if chunksize is None:
+            chunksize = max(1, min(64, len(pending) // (4 * workers)))
+        batches = [pending[start:start + chunksize] for start in range(0, len(pending), chunksize)]
+
+        f_ledger = open(ledger, 'a') if ledger is not None else None
+        if f_ledger is not None and not line.endswith('\n'):
+            f_ledger.write('\n')  # keep new records off the partial line
+        try:
+            def record(batch: List[int], rows: List[Tuple[Optional[Dict[str, Any]], str]]) -> None:
+                for global_idx, (row, error) in zip(batch, rows):
+                    outputs[global_idx], errors[global_idx] = row, error
+                    if f_ledger is not None and row is not None:
+                        f_ledger.write(json.dumps({'key': keys[global_idx], 'row': row}, default=str) + '\n')
+                if f_ledger is not None:
+                    f_ledger.flush()
+
+            if workers == 1:
+                for batch in batches:
+                    record(batch, _sweep_batch(func, [results[global_idx] for global_idx in batch]))
+            else:
+                pool = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+                with pool(max_workers=workers) as executor:
+                    futures = {executor.submit(_sweep_batch, func, [results[global_idx] for global_idx in batch]): batch
+                               for batch in batches}
+                    for future in as_completed(futures):
+                        record(futures[future], future.result())
+        finally:
+            if f_ledger is not None:
+                f_ledger.close()
+
+        out = ColTable()
+        names: Dict[str, None] = {}  # ordered set, conditional names only appear in some results
+        for result in results:
+            names.update(dict.fromkeys(result))
+        for name in names:
+            out[name] = _sweep_column([result.get(name) for result in results])
+        columns: Dict[str, None] = {}
+        for output in outputs:
+            if output is not None:
+                columns.update(dict.fromkeys(output))
+        taken = set(names) | {'error'}
+        for name in columns:
+            label = name
+            while label in taken:  # keep the parameter and error columns, prefix the output
+                label = 'out_' + label
+            taken.add(label)
+            out[label] = _sweep_column([None if output is None else output.get(name) for output in outputs])
+        out['error'] = errors
+        return out
+
     def generate_list(self, **kwargs) -> List[CartesianResult]:
         """Generate full list of permutations (convenience method)."""
         return list(self.generate(**kwargs))
 
     def __len__(self) -> int:
-        """Compute Length By generating all results"""
-        return len(self.generate_list())
+        """Number of results, counted from the dimension tables without generating them."""
+        return self._length
+
+    def __getitem__(self, key: Union[int, slice, range]) -> Union[CartesianResult, List[CartesianResult]]:
+        """
+        Random access to results in generation order.
+
+        Args:
+            key: Global index (negative counts from the end), slice or range of indices
+
+        Returns:
+            CartesianResult for an int, or a list of them for a slice or range
+        """
+        if isinstance(key, slice):
+            key = range(*key.indices(self._length))
+        if isinstance(key, range):
+            return [self.get(global_idx) for global_idx in key]
+        return self.get(key)
+
+    def get(self, global_idx: int,
+            return_combined_indices: Optional[List[Tuple[str, ...]]] = None) -> CartesianResult:
+        """
+        Decode a single result from its global index, identical to the result generate() yields there.
+
+        Args:
+            global_idx: Global permutation index, negative counts from the end
+            return_combined_indices: List of dimension name tuples for combined indexing
+
+        Returns:
+            CartesianResult containing {name: value} pairs with index attributes populated
+        """
+        self._check_combined_indices(return_combined_indices)
+        global_idx = int(global_idx)
+        if global_idx < 0:
+            global_idx += self._length
+        if not 0 <= global_idx < self._length:
+            raise IndexError(f"Index {global_idx} out of range for {self._length} results")
+
+        # Pick each dimension index from the cumulative weights, outer dimension first
+        remainder = global_idx
+        scale = 1
+        dim_indices: List[int] = []
+        for cumulative, span in zip(self._cumulative, self._spans):
+            unit = scale * span
+            dim_idx = bisect_right(cumulative, remainder // unit) - 1
+            remainder -= cumulative[dim_idx] * unit
+            scale *= cumulative[dim_idx + 1] - cumulative[dim_idx]
+            dim_indices.append(dim_idx)
+
+        # The remainder is the position in the conditional expansion, last triggered dimension slowest
+        chosen: List[Tuple[DimensionEntry, Any]] = []
+        for position in reversed(range(len(dim_indices))):
+            triggered = self._triggers[position][dim_indices[position]]
+            if not triggered:
+                continue
+            cumulative = self._cumulative[position]
+            weight = cumulative[dim_indices[position] + 1] - cumulative[dim_indices[position]]
+            scale //= weight  # size of the expansion before this dimension
+            offset = remainder // scale
+            for cond_entry in triggered:
+                length = len(cond_entry.iterable)
+                if offset < length:
+                    break
+                offset -= length
+                remainder -= length * scale
+            # Within an entry, earlier expansions vary slowest and values fastest
+            remainder, value_idx = divmod(remainder, length)
+            chosen.append((cond_entry, cond_entry.iterable[value_idx]))
+
+        result: Dict[str, Any] = {}
+        for dim_name, dim_idx in zip(self._dim_names, dim_indices):
+            dim_info = self.dimensions[dim_name]
+            result[dim_info.base.name] = dim_info.base.iterable[dim_idx]
+            for para in dim_info.parallels:
+                result[para.name] = para.iterable[dim_idx]
+        for cond_entry, cond_value in reversed(chosen):
+            result[cond_entry.name] = cond_value
+
+        return self._create_result(result, global_idx, dict(zip(self._dim_names, dim_indices)),
+                                   return_combined_indices)
+
+    def chunks(self, n_chunks: int) -> List[range]:
+        """
+        Split the global indices into contiguous, near equal ranges for distributing work.
+
+        Args:
+            n_chunks: Number of chunks, e.g. nodes or workers
+
+        Returns:
+            List of n_chunks ranges, index one with cart[chunk] or iterate get() over it
+
+        Example:
+            >>> cart = Cartesian({'a': range(10), 'b': 'xyz'})
+            >>> cart.chunks(4)
+            [range(0, 8), range(8, 16), range(16, 23), range(23, 30)]
+        """
+        if n_chunks < 1:
+            raise ValueError("n_chunks must be at least 1")
+        base, extra = divmod(self._length, n_chunks)
+        bounds = [0]
+        for chunk_idx in range(n_chunks):
+            bounds.append(bounds[-1] + base + (chunk_idx < extra))
+        return [range(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
 
     def __repr__(self) -> str:
         """Get information about parsed dimensions."""
         info = f"Cartesian Product with {self.dimension_sizes} dimension sizes"
         return info
+
+
+def _sweep_key(result: CartesianResult) -> str:
+    """Ledger key of a combination, independent of the dimension order"""
+    return json.dumps(dict(result), sort_keys=True, default=str)
+
+
+def _sweep_batch(func: Callable[[CartesianResult], Any],
+                 results: List[CartesianResult]) -> List[Tuple[Optional[Dict[str, Any]], str]]:
+    """Pool worker, runs func on a batch of combinations and returns (row, error) pairs"""
+    rows = []
+    for result in results:
+        try:
+            output = func(result)
+        except Exception as error:
+            rows.append((None, str(error) or type(error).__name__))
+            continue
+        if not isinstance(output, dict):
+            output = {'result': output}
+        rows.append(({str(name): value.tolist() if hasattr(value, 'tolist') else value
+                      for name, value in output.items()}, ''))
+    return rows
+
+
+def _sweep_column(values: List[Any]) -> Union[np.ndarray, List[Any]]:
+    """int or float array for numeric values with np.nan for missing ones, else the list"""
+    present = [value for value in values if value is not None]
+    if not present or not all(isinstance(value, Number) and not isinstance(value, (bool, complex)) for value in present):
+        return values
+    if len(present) == len(values) and all(isinstance(value, (int, np.integer)) for value in present):
+        return np.array(values, dtype=np.int64)
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
 
+import warnings
 import numpy as np
 from scipy.signal import find_peaks
+from scipy.fft import rfft, irfft, next_fast_len
 
 from numbers import Number
 from typing import Union, Tuple, Optional
@@ -64,10 +66,91 @@ def aggregate_fun(fun_name: str, vector: Array1D) -> Number:
         raise Exception(f'ERROR: fun_name {fun_name} not recognized')
 
 
+def reduce_groups(fun_name: str, vector: Array1D, starts: np.ndarray) -> np.ndarray:
+    """
+    Vectorized aggregate_fun over contiguous groups of a vector, using np.ufunc.reduceat.
+    Groups start at the indexes in starts and end at the next start.
+
+    **Currently supported Operators: fun_name must start with one of these substrings**
+        - sum, avg, std: as in aggregate_fun
+        - min, max: Minimum and maximum
+        - count: Number of values, after the mode rule
+        - first, last: First and last value of each group, modes are not applied
+
+    **Currently supported Modes: if fun_name ends with one of these substrings, the rule is applied**
+        -0: Ignores 0's
+        -None: Ignores nan
+
+    Groups with no values left after the mode rule give np.nan.
+
+    :param fun_name: Selection of Function and Mode.
+    :type fun_name: str
+    :param vector: Values sorted by group
+    :type vector: Array1D
+    :param starts: Index of the first value of each group, increasing and starting at 0
+    :type starts: np.ndarray
+    :return: One value per group
+    :rtype: np.ndarray
+
+    :Example:
+        >>> from mooonpy.tools import reduce_groups
+        >>> reduce_groups('avg', [1, 2, 3, 4, 5], np.array([0, 2]))
+        array([1.5, 4. ])
+    """
+    vector = np.asarray(vector)
+    starts = np.asarray(starts, dtype=np.intp)
+    if len(starts) == 0:
+        return np.empty(0)
+    ends = np.append(starts[1:], len(vector))
+    if fun_name.startswith('first'):
+        return vector[starts]
+    elif fun_name.startswith('last'):
+        return vector[ends - 1]
+
+    if fun_name.endswith('0'):
+        mask = vector != 0
+    elif fun_name.endswith('None'):
+        mask = np.logical_not(np.isnan(vector))
+    else:
+        mask = None
+    if mask is None:
+        counts = (ends - starts).astype(float)
+        values = vector
+    else:
+        counts = np.add.reduceat(mask.astype(float), starts)
+        values = np.where(mask, vector, 0)
+
+    if fun_name.startswith('count'):
+        return counts.astype(np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if fun_name.startswith('sum'):
+            out = np.add.reduceat(values, starts)
+            if mask is not None:
+                out = np.where(counts > 0, out, np.nan)
+            return out
+        elif fun_name.startswith('avg'):
+            return np.add.reduceat(values, starts, dtype=float) / counts
+        elif fun_name.startswith('std'):
+            mean = np.add.reduceat(values, starts, dtype=float) / counts
+            deviation = (vector - np.repeat(mean, ends - starts)) ** 2
+            if mask is not None:
+                deviation = np.where(mask, deviation, 0)
+            return np.sqrt(np.add.reduceat(deviation, starts) / counts)
+        elif fun_name.startswith('min') or fun_name.startswith('max'):
+            ufunc = np.minimum if fun_name.startswith('min') else np.maximum
+            if mask is None:
+                return ufunc.reduceat(vector, starts)
+            fill = np.inf if ufunc is np.minimum else -np.inf
+            out = ufunc.reduceat(np.where(mask, vector, fill), starts)
+            return np.where(counts > 0, out, np.nan)
+    raise Exception(f'ERROR: fun_name {fun_name} not recognized')
+
+
 def find_peaks_and_valleys(xdata: Array1D, ydata: Array1D, prominence: Optional[Number] = None) -> Tuple[
     np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     Compute the peaks and valleys of a curve using a specified prominence for cutoff.
+    Valleys are the first minimum between each pair of neighboring peaks.
 
     :param xdata: Array of x values. Must be increasing monotonically.
     :type xdata: Array1D
@@ -79,28 +162,94 @@ def find_peaks_and_valleys(xdata: Array1D, ydata: Array1D, prominence: Optional[
     :return: X peaks, Y peaks, X valleys, Y valleys
     :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
 
+    .. seealso:: :func:`find_peaks_and_valleys_many` for many curves at once
+
     .. TODO::
         make an example image
     """
-    # Find peaks
-    peaks, properties = find_peaks(ydata, prominence=prominence)
-    xpeaks = xdata[peaks]
-    ypeaks = ydata[peaks]
-
-    # Find valleys
-    xvalleys, yvalleys = [], []
-    if len(xpeaks) >= 2 and len(ypeaks) >= 2:
-        for i in range(len(peaks) - 1):
-            lo = peaks[i]
-            hi = peaks[i + 1]
-            between_peaksx = xdata[lo:hi]
-            between_peaksy = ydata[lo:hi]
-            minimum_index = np.min(np.where(between_peaksy == between_peaksy.min())[0])
-            xvalleys.append(between_peaksx[minimum_index])
-            yvalleys.append(between_peaksy[minimum_index])
-    xvalleys = np.array(xvalleys)
-    yvalleys = np.array(yvalleys)
-    return xpeaks, ypeaks, xvalleys, yvalleys
+    xdata = np.asarray(xdata)
+    ydata = np.asarray(ydata)
+    peaks, peak_starts, valleys, valley_starts = find_peaks_and_valleys_many(ydata, np.array([0]),
+                                                                             prominence=prominence)
+    if len(valleys) == 0:
+        return xdata[peaks], ydata[peaks], np.array([]), np.array([])
+    return xdata[peaks], ydata[peaks], xdata[valleys], ydata[valleys]
+
+
+def find_peaks_and_valleys_many(ydata: Array1D, starts: Optional[np.ndarray] = None,
+                                prominence: Union[Number, np.ndarray, None] = None,
+                                scale: Optional[Number] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Peaks and valleys of many curves with one call to scipy.signal.find_peaks, as find_peaks_and_valleys.
+
+    Curves are rows of a 2D array, or ragged curves stored one after another in a 1D array with
+    the index of the first value of each curve in starts (as in reduce_groups). They are joined with
+    +inf between them, which ends the prominence search like the end of a curve, so each curve
+    gives the same peaks as on its own.
+
+    Results are indexes into each curve, grouped by curve, with the position of the first result
+    of each curve in peak_starts and valley_starts. The results of curve i are peaks[peak_starts[i]:peak_starts[i + 1]].
+
+    :param ydata: 2D array with one curve per row, or 1D array of curves one after another
+    :type ydata: Array1D
+    :param starts: Index of the first value of each curve in 1D ydata, increasing and starting at 0
+    :type starts: np.ndarray
+    :param prominence: Prominence for cutoff, one value or one per curve
+    :type prominence: Number or np.ndarray or None
+    :param scale: Use scale times the standard deviation of each curve as its prominence, such as 1/3
+    :type scale: Number
+    :return: peaks, peak_starts, valleys, valley_starts
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+    :Example:
+        >>> curves = np.stack([np.sin(np.linspace(0, 20, 500) * k) for k in [1, 2, 3]])
+        >>> peaks, peak_starts, valleys, valley_starts = find_peaks_and_valleys_many(curves, scale=1/3)
+        >>> np.diff(np.append(peak_starts, len(peaks)))  # peaks per curve
+        array([ 3,  6, 10])
+    """
+    ydata = np.asarray(ydata, dtype=float)
+    if starts is None:
+        if ydata.ndim != 2:
+            raise Exception('ERROR: find_peaks_and_valleys_many needs 2D ydata or starts of the curves in 1D ydata')
+        starts = np.arange(ydata.shape[0]) * ydata.shape[1]
+        ydata = ydata.ravel()
+    starts = np.asarray(starts, dtype=np.int64)
+    n_curves = len(starts)
+    lengths = np.diff(np.append(starts, len(ydata)))
+    curve = np.repeat(np.arange(n_curves), lengths)
+
+    # one +inf after each curve
+    joined = np.full(len(ydata) + n_curves, np.inf)
+    joined[np.arange(len(ydata)) + curve] = ydata
+
+    if scale is not None:
+        prominence = scale * reduce_groups('std', ydata, starts)
+    if prominence is not None and np.ndim(prominence) > 0:
+        prominence = np.repeat(np.asarray(prominence, dtype=float), lengths + 1)  # per sample of joined
+    peaks, properties = find_peaks(joined, prominence=prominence)
+    peaks = peaks[~np.isin(peaks, starts + np.arange(n_curves) + lengths)]  # drop the separators
+
+    peak_curve = np.searchsorted(starts + np.arange(n_curves), peaks, side='right') - 1
+    peak_index = peaks - peak_curve  # index in ydata
+
+    # valleys between neighboring peaks of the same curve, the first minimum as np.where(y == y.min())
+    pairs = np.flatnonzero(peak_curve[:-1] == peak_curve[1:])
+    if len(pairs):
+        lows = np.minimum.reduceat(ydata, peak_index)[pairs]
+        lo, hi = peak_index[pairs], peak_index[pairs + 1]
+        counts = hi - lo
+        ## every index from lo to hi of each pair, in order
+        span = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(np.sum(counts))
+        hits = span[ydata[span] == np.repeat(lows, counts)]
+        valleys = hits[np.searchsorted(hits, lo)]
+        valley_curve = peak_curve[pairs]
+    else:
+        valleys = np.array([], dtype=np.int64)
+        valley_curve = np.array([], dtype=np.int64)
+
+    peak_starts = np.searchsorted(peak_curve, np.arange(n_curves))
+    valley_starts = np.searchsorted(valley_curve, np.arange(n_curves))
+    return peak_index - starts[peak_curve], peak_starts, valleys - starts[valley_curve], valley_starts
 
 
 def compute_derivative(xdata: Array1D, ydata: Array1D) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -108,31 +257,60 @@ def compute_derivative(xdata: Array1D, ydata: Array1D) -> Tuple[np.ndarray, np.n
     Function to compute the 1st and 2nd order central derivatives.
     Edges are not considered, so trimmed x array is returned.
 
+    Uses the three point differences of a non-uniform grid, which reduce to the usual
+    (y[i+1] - y[i-1]) / 2h and (y[i+1] - 2y[i] + y[i-1]) / h^2 when the spacing is uniform.
+    A repeated x on one side uses those central differences over x[i+1] - x[i-1], and derivatives
+    are only set to zero where x[i+1] == x[i-1].
+    Many curves may be differentiated at once by passing ydata with one curve per row (2D),
+    with xdata shared (1D) or one row per curve.
+
     :param xdata: Array of x values.
     :type xdata: Array1D
     :param ydata: Array of y values.
     :type ydata: Array1D
     :return: Trimmed x, 1st derivative, 2nd derivative
-    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+    :Example:
+        >>> x = np.linspace(0, 1, 11)
+        >>> xn, dy1, dy2 = compute_derivative(x, np.stack([x ** 2, x ** 3]))
+        >>> dy2.shape
+        (2, 9)
 
     .. TODO::
         make an example image
     """
-    dxn = xdata[1:-1]  # ignore first and last point
-    dy1 = np.zeros_like(dxn)
-    dy2 = np.zeros_like(dxn)
-    if len(xdata) == len(ydata):
-        for i in range(1, len(xdata) - 1):
-            dx = (xdata[i + 1] - xdata[i - 1]) / 2
-            if dx == 0:
-                print(
-                    'WARNING finite difference dx was zero at x={}. Derivative was set to zero to avoid infinite derivative.'.format(
-                        xdata[i]))
-            else:
-                dy1[i - 1] = (ydata[i + 1] - ydata[i - 1]) / (2 * dx)
-                dy2[i - 1] = (ydata[i + 1] - 2 * ydata[i] + ydata[i - 1]) / (dx * dx)
-    else:
-        print('ERROR (compute_derivative) inconsistent number of data points between X and Y arrays')
+    xdata = np.asarray(xdata, dtype=float)
+    ydata = np.asarray(ydata, dtype=float)
+    if xdata.shape[-1] != ydata.shape[-1]:
+        raise Exception(f'ERROR (compute_derivative) inconsistent number of data points between X and Y arrays, '
+                        f'{xdata.shape[-1]} and {ydata.shape[-1]}')
+    dxn = xdata[..., 1:-1]  # ignore first and last point
+    h1 = xdata[..., 1:-1] - xdata[..., :-2]
+    h2 = xdata[..., 2:] - xdata[..., 1:-1]
+    y0, y1, y2 = ydata[..., :-2], ydata[..., 1:-1], ydata[..., 2:]
+
+    span = h1 + h2
+    denominator = h1 * span * h2
+    repeated = denominator == 0  # a repeated x on one side, or both
+    if not np.any(repeated):
+        dy1 = (h1 * h1 * y2 - h2 * h2 * y0 + (h2 * h2 - h1 * h1) * y1) / denominator
+        dy2 = 2 * (h1 * y2 - span * y1 + h2 * y0) / denominator
+        return dxn, dy1, dy2
+
+    ## repeated x on one side falls back to the central difference over the span
+    zero = span == 0
+    if np.any(zero):
+        warnings.warn(f'finite difference dx was zero at {np.count_nonzero(zero)} points. '
+                      f'Derivatives were set to zero to avoid infinite derivatives.')
+    safe_denominator = np.where(repeated, 1.0, denominator)
+    safe_span = np.where(zero, 1.0, span)
+    dy1 = np.where(repeated, (y2 - y0) / safe_span,
+                   (h1 * h1 * y2 - h2 * h2 * y0 + (h2 * h2 - h1 * h1) * y1) / safe_denominator)
+    dy2 = np.where(repeated, 4 * (y2 - 2 * y1 + y0) / (safe_span * safe_span),
+                   2 * (h1 * y2 - span * y1 + h2 * y0) / safe_denominator)
+    dy1 = np.where(zero, 0.0, dy1)
+    dy2 = np.where(zero, 0.0, dy2)
     return dxn, dy1, dy2
 
 
@@ -159,72 +337,46 @@ def compute_fringe_slope(strain: np.ndarray, stress: np.ndarray, min_strain: Opt
     :return: Fringe slope X and Y
     :rtype: Tuple[np.ndarray, np.ndarray]
     """
-    # Set direction
+    # Set direction, inputs are not modified so views are enough
+    strain = np.asarray(strain, dtype=float)
+    stress = np.asarray(stress, dtype=float)
     if direction == 'forward':
-        strain = strain.copy()
-        stress = stress.copy()
+        pass
     elif direction == 'reverse':
-        strain = np.flip(strain.copy())
-        stress = np.flip(stress.copy())
+        strain = np.flip(strain)
+        stress = np.flip(stress)
     else:
         raise Exception(
             f'ERROR direction={direction} is not supported. Supported directions are "forward" or "reverse"')
 
     # Set defaults if min_strain or max_strain are None
-    if min_strain is None: min_strain = min(strain)
-    if max_strain is None: max_strain = max(strain)
-
-    ## Vectorized is much quicker but there's an off by 1 error
-    #
-    # n = np.arange(0, len(strain))
-    # slice_ = (min_strain <= strain) & (strain <= max_strain) & (n >= 4)
-    #
-    # sum_xi = np.cumsum(strain)
-    # sum_yi = np.cumsum(stress)
-    # sum_xi_2 = np.cumsum(strain*strain)
-    # sum_yi_2 = np.cumsum(stress*stress)
-    # sum_xi_yi = np.cumsum(strain*stress)
-    #
-    # sum_xi = sum_xi[slice_]
-    # sum_yi = sum_yi[slice_]
-    # sum_xi_2 = sum_xi_2[slice_]
-    # sum_yi_2 = sum_yi_2[slice_]
-    # sum_xi_yi = sum_xi_yi[slice_]
-    # n = n[slice_]
-    # fringe = strain[slice_]
-    #
-    # SSxy = sum_xi_yi - (sum_xi * sum_yi / n)
-    # SSxx = sum_xi_2 - (sum_xi * sum_xi / n)
-    # slopes = SSxy / SSxx
-    #
-    # return fringe, slopes
-
-    ## Original non-vectorized
-    # Start the walked linear regression method
-    slopes, fringe = [], []
-    sum_xi, sum_yi, sum_xi_2, sum_yi_2, sum_xi_yi, n = 0, 0, 0, 0, 0, 0
-    for x, y in zip(strain, stress):
-        # Compute cumulative linear regression parameters
-        sum_xi += x
-        sum_yi += y
-        n += 1
-        sum_xi_2 += x * x
-        sum_yi_2 += y * y
-        sum_xi_yi += x * y
-
-        # Need at least 2 points to perform linear regression
-        if n <= 3: continue
-
-        # Only compute outputs if x is in the desired range
-        if min_strain <= x <= max_strain:
-            SSxy = sum_xi_yi - (sum_xi * sum_yi / n)
-            SSxx = sum_xi_2 - (sum_xi * sum_xi / n)
-            b1 = SSxy / SSxx
-
-            slopes.append(b1)
-            fringe.append(x)
-
-    return np.array(fringe), np.array(slopes)
+    if min_strain is None: min_strain = np.min(strain)
+    if max_strain is None: max_strain = np.max(strain)
+
+    # Walked linear regression from cumulative sums, the slope of points 0 to i at every i.
+    # Shifting by the means does not change the slopes but keeps the sums small, so
+    # the differences of large sums in SSxy and SSxx do not lose precision for long curves.
+    n = np.arange(1, len(strain) + 1)
+    # Need at least 2 points to perform linear regression, the first 3 are skipped as before
+    # Only compute outputs if x is in the desired range
+    slice_ = (n > 3) & (min_strain <= strain) & (strain <= max_strain)
+    if not np.any(slice_):
+        return np.array([]), np.array([])
+    stop = np.flatnonzero(slice_)[-1] + 1  # sums past the last output are not needed
+    x = strain[:stop] - np.mean(strain[:stop])
+    y = stress[:stop] - np.mean(stress[:stop])
+
+    sum_xi = np.cumsum(x)[slice_[:stop]]
+    sum_yi = np.cumsum(y)[slice_[:stop]]
+    sum_xi_2 = np.cumsum(x * x)[slice_[:stop]]
+    sum_xi_yi = np.cumsum(x * y)[slice_[:stop]]
+    n = n[slice_]
+
+    SSxy = sum_xi_yi - (sum_xi * sum_yi / n)
+    SSxx = sum_xi_2 - (sum_xi * sum_xi / n)
+    with np.errstate(divide='ignore', invalid='ignore'):  # repeated strain values, as in the walked loop
+        slopes = SSxy / SSxx
+    return strain[slice_], slopes
 
 
 def first_value_cross(xdata: Array1D, ydata: Array1D, cross: Optional[Number] = None):
@@ -245,6 +397,112 @@ def first_value_cross(xdata: Array1D, ydata: Array1D, cross: Optional[Number] =
     x_cross = xdata[np.min(np.where(ydata < cross)[0])]
     return x_cross
 
+def autocorrelation(vector: Array1D, max_lag: Optional[int] = None) -> np.ndarray:
+    """
+    Normalized autocorrelation function of a time series, computed with zero padded FFTs.
+    Each lag is averaged over the n - lag available pairs, and C(0) = 1.
+
+    2D input is a batch of series along the last axis, which are transformed together.
+
+    :param vector: Time series, or 2D array of series in rows
+    :type vector: Array1D
+    :param max_lag: Largest lag returned, defaults to None for n - 1
+    :type max_lag: int
+    :return: C(t) for t = 0 ... max_lag, constant series give np.nan after lag 0
+    :rtype: np.ndarray
+
+    :Example:
+        >>> from mooonpy.tools import autocorrelation
+        >>> acf = autocorrelation(MyLog['Temp'], max_lag=100)
+    """
+    data = np.asarray(vector, dtype=float)
+    n = data.shape[-1]
+    if max_lag is None:
+        max_lag = n - 1
+    delta = data - data.mean(axis=-1, keepdims=True)
+    n_fft = next_fast_len(2 * n, real=True)  # padding removes the circular wrap around
+    spectrum = rfft(delta, n=n_fft, axis=-1)
+    acov = irfft(spectrum * np.conj(spectrum), n=n_fft, axis=-1)[..., :max_lag + 1]
+    acov /= n - np.arange(max_lag + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = acov / acov[..., :1]
+    out[..., 0] = 1.0
+    return out
+
+
+def statistical_inefficiency(vector: Array1D, min_lag: int = 3) -> Union[float, np.ndarray]:
+    """
+    Statistical inefficiency g of a correlated time series, the number of samples per independent sample.
+
+    g = 1 + 2 sum_t (1 - t/n) C(t), summed until the autocorrelation first drops to zero after min_lag,
+    so the standard error of the mean is std * sqrt(g / n). The integrated autocorrelation time is (g - 1) / 2.
+
+    :param vector: Time series, or 2D array of series in rows
+    :type vector: Array1D
+    :param min_lag: Lags always included before the zero crossing cut off
+    :type min_lag: int
+    :return: g >= 1, one per series for 2D input
+    :rtype: Union[float, np.ndarray]
+    """
+    data = np.asarray(vector, dtype=float)
+    n = data.shape[-1]
+    if n < 2:
+        return np.ones(data.shape[:-1]) if data.ndim > 1 else 1.0
+    acf = autocorrelation(data)
+    lags = np.arange(n)
+    crossed = (acf <= 0) & (lags > min_lag)
+    cutoff = np.where(crossed.any(axis=-1), np.argmax(crossed, axis=-1), n)
+    terms = np.where(lags < cutoff[..., None], acf * (1 - lags / n), 0)[..., 1:]
+    g = 1 + 2 * np.nansum(terms, axis=-1)
+    g = np.maximum(g, 1.0)
+    return g if data.ndim > 1 else float(g)
+
+
+def block_average(vector: Array1D) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flyvbjerg-Petersen block averaging of a correlated time series.
+
+    Neighboring values are averaged in pairs at each level, so block sizes are 1, 2, 4 ...,
+    and the standard error of the mean is estimated from the variance of the block means.
+    The optimal level is the first with B^3 > 2 n (sem_B / sem_1)^4 (Lee et al. 2011),
+    where the estimates reach a plateau. -1 is given if no level passes, meaning the series is too short.
+
+    :param vector: Time series, or 2D array of series in rows
+    :type vector: Array1D
+    :return: block sizes, standard error per level, error of the standard error per level, optimal level index
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+    :Example:
+        >>> from mooonpy.tools import block_average
+        >>> sizes, sem, sem_error, best = block_average(MyLog['Temp'])
+        >>> print(sem[best], sizes[best])
+    """
+    data = np.asarray(vector, dtype=float)
+    n = data.shape[-1]
+    sizes, sems, errors = [], [], []
+    size = 1
+    while data.shape[-1] >= 2:
+        n_blocks = data.shape[-1]
+        sem = np.sqrt(data.var(axis=-1) / (n_blocks - 1))
+        sizes.append(size)
+        sems.append(sem)
+        errors.append(sem / np.sqrt(2 * (n_blocks - 1)))
+        half = n_blocks // 2
+        data = 0.5 * (data[..., 0:2 * half:2] + data[..., 1:2 * half:2])
+        size *= 2
+
+    sizes = np.array(sizes, dtype=int)
+    sems = np.stack(sems, axis=-1) if sems else np.empty(data.shape[:-1] + (0,))
+    errors = np.stack(errors, axis=-1) if errors else np.empty(data.shape[:-1] + (0,))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = sems / sems[..., :1]
+        passed = sizes.astype(float) ** 3 > 2 * n * ratio ** 4
+    passed &= np.logical_not(np.isnan(ratio))
+    passed |= (sems == 0) & (sems[..., :1] == 0)  # constant series, any level
+    optimal = np.where(passed.any(axis=-1), np.argmax(passed, axis=-1), -1)
+    return sizes, sems, errors, optimal
+
+
 class MixingRule():
     def __init__(self, style='add'):
         """
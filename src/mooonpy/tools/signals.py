@@ -1,14 +1,17 @@
+from functools import lru_cache
 from numbers import Number
 from typing import Tuple, Union, Optional
 
 import numpy as np
 import scipy as sp
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, next_fast_len
 from .math_utils import first_value_cross
 
 Array1D = Union[np.ndarray, list]
 
 
-def compute_PSD(xdata: Array1D, ydata: Array1D) -> Tuple[Array1D, Array1D]:
+def compute_PSD(xdata: Array1D, ydata: Array1D, pad: bool = False) -> Tuple[Array1D, Array1D]:
     """
     Compute the Power Spectral Density (PSD) with the X-values being the normalized frequencies.
 
@@ -18,8 +21,12 @@ def compute_PSD(xdata: Array1D, ydata: Array1D) -> Tuple[Array1D, Array1D]:
     :type xdata: Array1D
     :param ydata: Array of y values.
     :type ydata: Array1D
+    :param pad: Zero pad to a fast FFT length, for long signals with large prime factors. default False
+    :type pad: bool
     :return: wn's, PDS's
     :rtype: Tuple(Array1D, Array1D)
+
+    .. seealso:: :func:`compute_PSD_welch` for segment averaged estimates of long signals
     """
     # Define sampling rate and number of data points
     dx = np.mean(np.abs(np.diff(xdata)))
@@ -29,10 +36,11 @@ def compute_PSD(xdata: Array1D, ydata: Array1D) -> Tuple[Array1D, Array1D]:
         fs = xdata.shape[0] / (np.max(xdata) - np.min(xdata))
     N = xdata.shape[0]  # number of data points
     d = 1 / fs  # sampling space
+    n_fft = next_fast_len(N, real=True) if pad else N
 
     # Perform one sided FFT
-    fft_response = np.fft.rfft(ydata, axis=0, norm='backward')
-    x_fft = np.fft.rfftfreq(N, d=d)
+    fft_response = np.fft.rfft(ydata, n=n_fft, axis=0, norm='backward')
+    x_fft = np.fft.rfftfreq(n_fft, d=d)
     y_fft = fft_response
 
     # Compute the final PSD and normalized cutoff frequencies
@@ -41,6 +49,122 @@ def compute_PSD(xdata: Array1D, ydata: Array1D) -> Tuple[Array1D, Array1D]:
     return wns, psd
 
 
+def compute_PSD_welch(xdata: Optional[Array1D], ydata: Array1D, segment: Optional[int] = None,
+                      overlap: float = 0.5, window: str = 'hann', detrend: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Power Spectral Density averaged over overlapping windowed segments (Welch's method).
+    Much less noisy than :func:`compute_PSD` for long signals, and only a few segments are transformed at a time.
+
+    Frequencies are normalized to the Nyquist frequency as in compute_PSD, so they do not depend on xdata,
+    and the PSD has the same scale (the variance for white noise).
+
+    :param xdata: Array of x values, unused and kept for the same call as compute_PSD. May be None.
+    :type xdata: Array1D
+    :param ydata: Array of y values, or 2D array with one signal per row
+    :type ydata: Array1D
+    :param segment: Samples per segment, defaults to None for 1/8 of the signal (at least 256).
+        Sets the frequency resolution, 2 / segment.
+    :type segment: int
+    :param overlap: Fraction of each segment shared with the next, defaults to 0.5
+    :type overlap: float
+    :param window: Window name for scipy.signal.get_window, defaults to 'hann'
+    :type window: str
+    :param detrend: Subtract the mean of each segment, defaults to False to keep the DC power as compute_PSD
+    :type detrend: bool
+    :return: wn's, PSD's
+    :rtype: Tuple[np.ndarray, np.ndarray]
+
+    :Example:
+        >>> wns, psd = compute_PSD_welch(MyLog['Step'], MyLog['Press'], segment=2**14)
+        >>> wn = first_value_cross(wns, psd)
+    """
+    ydata = np.asarray(ydata, dtype=float)
+    n = ydata.shape[-1]
+    if segment is None:
+        segment = max(min(n, 256), n // 8)
+    stream = StreamingPSD(segment=min(segment, n), overlap=overlap, window=window, detrend=detrend)
+    return stream.update(ydata).result()
+
+
+class StreamingPSD(object):
+    """
+    Welch Power Spectral Density accumulated from chunks of a signal, such as new rows of a log being followed.
+    Complete segments are transformed as chunks arrive and only the unfinished segment is kept,
+    so memory does not grow with the length of the signal.
+
+    Chunks may be 1D, or 2D with one signal per row and the same number of rows in every chunk.
+    The result of one update with the whole signal equals :func:`compute_PSD_welch`.
+
+    :param segment: Samples per segment. Sets the frequency resolution, 2 / segment
+    :type segment: int
+    :param overlap: Fraction of each segment shared with the next, defaults to 0.5
+    :type overlap: float
+    :param window: Window name for scipy.signal.get_window, defaults to 'hann'
+    :type window: str
+    :param detrend: Subtract the mean of each segment, defaults to False
+    :type detrend: bool
+
+    :Example:
+        >>> follower = mooonpy.Thermospace.follow('log.lammps')
+        >>> stream = StreamingPSD(segment=4096)
+        >>> for chunk in follower.follow(interval=10):
+        ...     stream.update(chunk['Press'])
+        >>> wns, psd = stream.result()
+    """
+
+    def __init__(self, segment: int, overlap: float = 0.5, window: str = 'hann', detrend: bool = False):
+        if segment < 2:
+            raise Exception(f'ERROR: StreamingPSD segment must be at least 2 samples, not {segment}')
+        self.segment = int(segment)
+        self.hop = max(1, int(round(self.segment * (1 - overlap))))
+        self.n_fft = next_fast_len(self.segment, real=True)  # zero padded to a fast length
+        self.window = sp.signal.get_window(window, self.segment)
+        self.detrend = detrend
+        self.batch = max(1, 2 ** 22 // self.n_fft)  # segments per FFT call, bounds the memory used
+        self.count = 0  # segments averaged
+        self._sum = None
+        self._buffer = None  # samples not yet in a complete segment, or needed by the next one
+
+    def update(self, chunk: Array1D) -> 'StreamingPSD':
+        """
+        Add samples to the end of the signal.
+
+        :param chunk: New samples, 1D or 2D with one signal per row
+        :type chunk: Array1D
+        :return: self, for chaining
+        :rtype: StreamingPSD
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        buffer = chunk if self._buffer is None else np.concatenate((self._buffer, chunk), axis=-1)
+        n_segments = 0 if buffer.shape[-1] < self.segment else (buffer.shape[-1] - self.segment) // self.hop + 1
+        if n_segments:
+            views = sliding_window_view(buffer, self.segment, axis=-1)[..., ::self.hop, :][..., :n_segments, :]
+            if self._sum is None:
+                self._sum = np.zeros(buffer.shape[:-1] + (self.n_fft // 2 + 1,))
+            for start in range(0, n_segments, self.batch):
+                segments = views[..., start:start + self.batch, :]
+                if self.detrend:
+                    segments = segments - segments.mean(axis=-1, keepdims=True)
+                spectrum = rfft(segments * self.window, n=self.n_fft, axis=-1)
+                self._sum += np.sum(spectrum.real ** 2 + spectrum.imag ** 2, axis=-2)
+            self.count += n_segments
+        self._buffer = buffer[..., n_segments * self.hop:].copy()  # copy releases the consumed samples
+        return self
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalized frequencies and the PSD averaged over the segments so far.
+
+        :return: wn's, PSD's
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        if self.count == 0:
+            raise Exception(f'ERROR: StreamingPSD needs at least {self.segment} samples for one segment')
+        wns = np.fft.rfftfreq(self.n_fft) * 2  # cycles per sample over the Nyquist frequency of 0.5
+        psd = self._sum / (self.count * np.sum(self.window ** 2))
+        return wns, psd
+
+
 def power_to_db(power: Array1D, ref_power: Number = 1) -> np.ndarray:
     """
     Convert power to decibels (dB).
@@ -56,22 +180,92 @@ def power_to_db(power: Array1D, ref_power: Number = 1) -> np.ndarray:
     return power_in_dB
 
 
-def _butter(ydata: Array1D, wn: float, order: Number) -> np.ndarray:
+@lru_cache(maxsize=128)
+def _butter_sos(order: Number, wn: float) -> np.ndarray:
+    """
+    Second order sections of a digital Butterworth low-pass filter, cached since the same design is
+    used for every curve and every mirroring candidate. The array is shared, do not modify it.
+
+    :param order: Order of filter
+    :type order: Number
+    :param wn: Normalized Cutoff frequency
+    :type wn: float
+    """
+    sos = sp.signal.butter(order, wn, btype='low', analog=False, output='sos', fs=None)
+    return sos
+
+
+def _butter(ydata: Array1D, wn: float, order: Number, axis: int = -1) -> np.ndarray:
     """
     Alias for scipy's butterworth low-pass filter.
 
-    :param ydata: Y data
+    :param ydata: Y data, 2D arrays filter each row (or the given axis) at once
     :type ydata: Array1D
     :param wn: Normalized Cutoff frequency, defaults to 'PSD' optimization
     :type wn: Number
     :param order: Order of filter, defaults to 2
     :type order: Number
+    :param axis: Axis of ydata to filter along, defaults to -1
+    :type axis: int
     """
-    sos = sp.signal.butter(order, wn, btype='low', analog=False, output='sos', fs=None)
-    y_filt = sp.signal.sosfiltfilt(sos, ydata, padtype=None)
+    sos = _butter_sos(order, float(wn))
+    y_filt = sp.signal.sosfiltfilt(sos, ydata, axis=axis, padtype=None)
     return y_filt
 
 
+class StreamingLowpass(object):
+    """
+    Causal Butterworth low-pass filter that keeps its state between chunks, for smoothing live signals
+    such as the new rows of a log being followed. Uses the same cached design as butter_lowpass, and
+    each update costs only the new samples.
+
+    Unlike butter_lowpass the output lags the signal (single pass, not zero phase). The filter starts in
+    steady state at the first sample, so there is no startup transient from zero.
+
+    Chunks may be 1D, or 2D with one signal per row and the same number of rows in every chunk.
+    Filtering a signal in chunks gives the same values as filtering it in one update.
+
+    :param wn: Normalized Cutoff frequency, for example from :class:`StreamingPSD` and first_value_cross
+    :type wn: Number
+    :param order: Order of filter, defaults to 2
+    :type order: Number
+
+    :Example:
+        >>> follower = mooonpy.Thermospace.follow('log.lammps')
+        >>> smooth = StreamingLowpass(wn=0.05)
+        >>> for chunk in follower.follow(interval=10):
+        ...     temp = smooth.update(np.stack([chunk['Temp'], chunk['Press']]))
+    """
+
+    def __init__(self, wn: Number, order: Number = 2):
+        self.wn = float(wn)
+        self.order = order
+        self.sos = _butter_sos(order, self.wn)
+        self.zi = None  # filter state, set by the first sample
+
+    def update(self, chunk: Array1D) -> np.ndarray:
+        """
+        Filter new samples, continuing from the end of the previous chunk.
+
+        :param chunk: New samples, 1D or 2D with one signal per row
+        :type chunk: Array1D
+        :return: Filtered samples, same shape as chunk
+        :rtype: np.ndarray
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.shape[-1] == 0:
+            return chunk.copy()
+        if self.zi is None:
+            zi = sp.signal.sosfilt_zi(self.sos)  # (sections, 2) steady state for a unit step
+            self.zi = zi.reshape((zi.shape[0],) + (1,) * (chunk.ndim - 1) + (2,)) * chunk[..., 0, None]
+        y_filt, self.zi = sp.signal.sosfilt(self.sos, chunk, axis=-1, zi=self.zi)
+        return y_filt
+
+    def reset(self):
+        """Forget the filter state, the next update starts a new signal"""
+        self.zi = None
+
+
 def butter_lowpass(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, str] = 'PSD', quadrant: str = 'msr',
                    order: Number = 2) -> Tuple[np.ndarray,Number,str]:
     """
@@ -83,11 +277,17 @@ def butter_lowpass(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, s
     If the quadrant is 'msr' the lowest residual low and high data_extension is used,
     or the quadrants are specified with a comma separated string of '2,3' for left and right extension.
 
+    Several signals with the same x values, such as stress and transverse strains, can be filtered together by
+    passing ydata as a 2D array with one signal per row. The PSD cutoffs come from one FFT of all rows, mirrors
+    are chosen per row, and rows sharing a cutoff are filtered in one call. wn may then also be one value per row,
+    and an array of wn and a list of qm strings are returned.
+
     :param xdata: Array of x values. Only used for PSD optimization
     :type xdata: Array1D
     :param ydata: Y data to filter.
     :type ydata: Array1D
-    :param wn: Normalized Cutoff frequency, defaults to 0.1.
+    :param wn: Normalized Cutoff frequency, or 'PSD' to use the first crossing of the PSD mean,
+        or 'welch' for the same with the segment averaged PSD of long signals. defaults to 'PSD'.
     :type wn: Number
     :param quadrant: Quadrants, defaults to 'msr' optimization.
     :type quadrant: str
@@ -95,7 +295,13 @@ def butter_lowpass(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, s
     :type order: Number
 
     :return: Filtered data, wn used, qm string used
+
+    :Example:
+        >>> y_filt, wn, qm = butter_lowpass(strain, stress)
+        >>> y_filts, wns, qms = butter_lowpass(strain, np.stack([stress, trans_1, trans_2]))
     """
+    if np.ndim(ydata) == 2:
+        return _butter_lowpass_channels(xdata, np.asarray(ydata), wn, quadrant, order)
     # Scrub inputs
     # ------------------------------------
     if xdata is None:
@@ -104,21 +310,13 @@ def butter_lowpass(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, s
         xdata = xdata.copy()
     ydata = ydata.copy()
 
-    if wn == 'PSD':
-        wns, psd = compute_PSD(xdata, ydata)
-        wn = first_value_cross(wns, psd)
-        if wn == 0: wn=wns[1] # use the lowest allowed value
+    if wn in ['PSD', 'welch']:
+        wn = _psd_cutoffs(xdata, ydata[None, :], nonzero=True, welch=wn == 'welch')[0]
 
     if quadrant == 'msr':
         quad_lo, quad_hi = determine_mirroring_locations(xdata, ydata, wn, order)
-    elif len(quadrant) == 3 and ',' in quadrant:
-        splits = quadrant.split(',')
-        quad_lo = int(splits[0])
-        quad_hi = int(splits[1])
-    elif len(quadrant) == 2:
-        quad_lo, quad_hi = int(quadrant[0]), int(quadrant[1])  # works for tuple or string
     else:
-        raise Exception(f'quadrant {quadrant} must be either "msr" or comma-separated quadrants i.e. "1,3"')
+        quad_lo, quad_hi = _parse_quadrant(quadrant)
 
     # do filtering
     # ------------------------------------
@@ -129,15 +327,58 @@ def butter_lowpass(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, s
     return y_filt, wn, f'{quad_lo},{quad_hi}'
 
 
+def _parse_quadrant(quadrant: str) -> Tuple[int, int]:
+    if len(quadrant) == 3 and ',' in quadrant:
+        splits = quadrant.split(',')
+        return int(splits[0]), int(splits[1])
+    elif len(quadrant) == 2:
+        return int(quadrant[0]), int(quadrant[1])  # works for tuple or string
+    raise Exception(f'quadrant {quadrant} must be either "msr" or comma-separated quadrants i.e. "1,3"')
+
+
+def _butter_lowpass_channels(xdata: Optional[Array1D], channels: np.ndarray, wn: Union[Number, str, Array1D],
+                             quadrant: str, order: Number) -> Tuple[np.ndarray, np.ndarray, list]:
+    """butter_lowpass of each row of a 2D array, see :func:`butter_lowpass`"""
+    if xdata is None:
+        xdata = np.arange(channels.shape[-1])
+    xdata = np.asarray(xdata)
+
+    if isinstance(wn, str) and wn in ['PSD', 'welch']:
+        wn = _psd_cutoffs(xdata, channels, nonzero=True, welch=wn == 'welch')
+    wns = np.array(np.broadcast_to(np.asarray(wn, dtype=float), channels.shape[:1]))
+
+    if isinstance(quadrant, str) and quadrant == 'msr':
+        quad_lo, quad_hi = determine_mirroring_locations(xdata, channels, wns, order)
+    else:
+        quad_lo, quad_hi = _parse_quadrant(quadrant)
+        quad_lo = np.full(len(channels), quad_lo)
+        quad_hi = np.full(len(channels), quad_hi)
+
+    # do filtering, rows with the same cutoff and extended length in one call
+    # ------------------------------------
+    y_filt = np.empty(channels.shape)
+    groups = {}
+    for row, key in enumerate(zip(wns, quad_lo != 1, quad_hi != 1)):
+        groups.setdefault(key, []).append(row)
+    for (value, lo_extended, hi_extended), rows in groups.items():
+        extended = [data_extension(xdata, channels[row], quad_lo[row], quad_hi[row]) for row in rows]
+        y_butter = _butter(np.stack([y_ext for x_ext, y_ext, lo_trim, hi_trim in extended]), value, order)
+        lo_trim, hi_trim = extended[0][2:]
+        y_filt[rows] = y_butter[:, lo_trim:hi_trim]
+    return y_filt, wns, [f'{lo},{hi}' for lo, hi in zip(quad_lo, quad_hi)]
+
+
 def determine_mirroring_locations(xdata: Optional[Array1D], ydata: Array1D, wn: Union[Number, str] = 'PSD',
                                   order: Number = 2) -> Tuple[int, int]:
     """
     Compare 4 mirror images at both ends of dataset.
     The combination with the lowest residual^2 after filtering is returned.
 
+    2D ydata searches each row separately and returns arrays of quadrants, with wn shared or one per row.
+
     :param xdata: X data
     :type xdata: Array1D
-    :param ydata: Y data
+    :param ydata: Y data, or 2D array with one signal per row
     :type ydata: Array1D
     :param wn: Normalized Cutoff frequency, defaults to 'PSD' optimization.
     :type wn: Number or str
@@ -147,52 +388,76 @@ def determine_mirroring_locations(xdata: Optional[Array1D], ydata: Array1D, wn:
     :return: Lowest residual and Highest residual.
     :rtype: Tuple(int, int)
     """
+    ydata = np.asarray(ydata)
+    channels = np.atleast_2d(ydata)
     if xdata is None:
-        xdata = np.arange(len(ydata))
+        xdata = np.arange(channels.shape[-1])
     # Determine half_data to only check for residuals
     # either from lo-half_data or half_data-hi
     half_data = int(xdata.shape[0] / 2)
 
     # Determine optimal wn with PSD method. Used as constant between all mirrors
-    if wn == 'PSD':
-        wns, psd = compute_PSD(xdata, ydata)
-        wn = first_value_cross(wns, psd, cross=None)  # use mean with default
-
-    # ------------------------------------
-    # First: Optimize the "lo" end
-    lo_quads2test = [1, 2, 3, 4];
-    lo_summed_residuals2 = {}  # {quadrant_mirror:sum-of-residuals-squared}
-    for quad in lo_quads2test:
-        x_quad, y_quad, lo_ind, hi_ind = data_extension(xdata, ydata, quad, 1)
-        y_butter = _butter(y_quad, wn, order)
-        y_filt = y_butter[lo_ind:hi_ind]  # get original slice
-        residuals = ydata - y_filt
-        residuals = residuals[:half_data]  # we only care about the first half fit
-        lo_summed_residuals2[quad] = np.sum(residuals ** 2)
-
-    # Find minimized sum of residuals squared
-    lo = min(lo_summed_residuals2, key=lo_summed_residuals2.get)
-
-    # ------------------------------------
-    # Second: Optimize the "hi" end
-    hi_quads2test = [1, 2, 3, 4];
-    hi_summed_residuals2 = {}  # {quadrant_mirror:sum-of-residuals-squared}
-    for quad in hi_quads2test:
-        x_quad, y_quad, lo_ind, hi_ind = data_extension(xdata, ydata, 1, quad)
-        y_butter = _butter(y_quad, wn, order)
-        y_filt = y_butter[lo_ind:hi_ind]  # get original slice
-        residuals = ydata - y_filt
-        residuals = residuals[half_data:]  # we only care about the last half fit
-        hi_summed_residuals2[quad] = np.mean(residuals ** 2)  # account for 1 being shorter
-
-    # Find minimized sum of residuals squared
-    hi = min(hi_summed_residuals2, key=hi_summed_residuals2.get)
+    if isinstance(wn, str) and wn == 'PSD':
+        wn = _psd_cutoffs(xdata, channels)  # use mean with default
+    wns = np.broadcast_to(np.asarray(wn, dtype=float), channels.shape[:1])
+
+    lo = np.empty(len(channels), dtype=int)
+    hi = np.empty(len(channels), dtype=int)
+    for value in np.unique(wns):  # one filter design per group of rows
+        rows = np.flatnonzero(wns == value)
+        group = channels[rows]
+
+        # ------------------------------------
+        # Filter all candidates at once. Mirrors 2-4 at either end extend the data to the same length,
+        # so they are stacked in one array, and no mirroring (1) is shared by both ends.
+        quads2test = [2, 3, 4]
+        extended = [data_extension(xdata, group, quad, 1) for quad in quads2test] + \
+                   [data_extension(xdata, group, 1, quad) for quad in quads2test]
+        y_butter = _butter(np.stack([y_quad for x_quad, y_quad, lo_ind, hi_ind in extended]), value, order)
+        y_filts = [y_butter[ii, :, lo_ind:hi_ind] for ii, (x_quad, y_quad, lo_ind, hi_ind) in enumerate(extended)]
+        y_plain = _butter(group, value, order)
+
+        # ------------------------------------
+        # First: Optimize the "lo" end
+        # sum-of-residuals-squared for quadrant mirrors 1-4 in rows
+        lo_summed_residuals2 = np.stack([np.sum((group - y_filt)[:, :half_data] ** 2, axis=-1)  # we only care about the first half fit
+                                         for y_filt in [y_plain] + y_filts[:3]])
+
+        # Find minimized sum of residuals squared, first quadrant for ties
+        lo[rows] = np.argmin(lo_summed_residuals2, axis=0) + 1
+
+        # ------------------------------------
+        # Second: Optimize the "hi" end
+        hi_summed_residuals2 = np.stack([np.mean((group - y_filt)[:, half_data:] ** 2, axis=-1)  # account for 1 being shorter
+                                         for y_filt in [y_plain] + y_filts[3:]])
+        hi[rows] = np.argmin(hi_summed_residuals2, axis=0) + 1
 
     # ------------------------------------#
     # return optimal quadrant_mirror
+    if ydata.ndim == 1:
+        return int(lo[0]), int(hi[0])
     return lo, hi
 
 
+def _psd_cutoffs(xdata: Array1D, channels: np.ndarray, nonzero: bool = False, welch: bool = False) -> np.ndarray:
+    """
+    First frequency where the PSD of each row drops below its mean, from one FFT of all rows.
+    With nonzero, a cutoff of 0 is replaced by the lowest allowed value as in butter_lowpass.
+    """
+    if welch:
+        wns, psd = compute_PSD_welch(xdata, channels)
+        psd = psd.T
+    else:
+        wns, psd = compute_PSD(xdata, channels.T)
+    below = psd < np.mean(psd, axis=0)
+    if not np.all(np.any(below, axis=0)):
+        raise Exception('ERROR: PSD cutoff not found, the power spectral density never drops below its mean')
+    cutoffs = wns[np.argmax(below, axis=0)]
+    if nonzero:
+        cutoffs[cutoffs == 0] = wns[1]
+    return cutoffs
+
+
 def data_extension(xdata: Array1D, ydata: Array1D, lo: Number = 1, hi: Number = 1) -> Tuple[
     np.ndarray, np.ndarray, int, int]:
     """
@@ -214,7 +479,7 @@ def data_extension(xdata: Array1D, ydata: Array1D, lo: Number = 1, hi: Number =
 
     :param xdata: X data
     :type xdata: Array1D
-    :param ydata: Y data
+    :param ydata: Y data, or 2D array with one signal per row that are extended the same way
     :type ydata: Array1D
     :param lo: Left side quadrant setting, defaults to 1.
     :type lo: Number
@@ -232,13 +497,13 @@ def data_extension(xdata: Array1D, ydata: Array1D, lo: Number = 1, hi: Number =
     # Perform lo padding operations
     if lo == 2:
         lo_xdata = min(xdata) + xdata[index] - xdata[::-1][index + 1:]
-        lo_ydata = ydata[::-1][index + 1:]
+        lo_ydata = ydata[..., ::-1][..., index + 1:]
     elif lo == 3:
         lo_xdata = min(xdata) + xdata[index] - xdata[::-1][index + 1:]
-        lo_ydata = ydata[index] - ydata[::-1][index + 1:]
+        lo_ydata = ydata[..., index, None] - ydata[..., ::-1][..., index + 1:]
     elif lo == 4:
         lo_xdata = min(xdata) + xdata[index] - xdata[::-1][index + 1:]
-        lo_ydata = ydata[index + 1:] - (ydata[-(index + 1)] - ydata[index])
+        lo_ydata = ydata[..., index + 1:] - (ydata[..., -(index + 1), None] - ydata[..., index, None])
     else:
         lo_xdata = np.array([])
         lo_ydata = np.array([])
@@ -246,13 +511,13 @@ def data_extension(xdata: Array1D, ydata: Array1D, lo: Number = 1, hi: Number =
     # Perform hi padding operations
     if hi == 2:
         hi_xdata = -min(xdata) + max(xdata) + xdata[index + 1:]
-        hi_ydata = ydata[::-1][index + 1:]
+        hi_ydata = ydata[..., ::-1][..., index + 1:]
     elif hi == 3:
         hi_xdata = -min(xdata) + max(xdata) + xdata[index + 1:]
-        hi_ydata = ydata[index] - ydata[::-1][index + 1:] + 2 * ydata[-(index + 1)] + ydata[index]
+        hi_ydata = ydata[..., index, None] - ydata[..., ::-1][..., index + 1:] + 2 * ydata[..., -(index + 1), None] + ydata[..., index, None]
     elif hi == 4:
         hi_xdata = -min(xdata) + max(xdata) + xdata[index + 1:]
-        hi_ydata = ydata[-(index + 1)] + ydata[index + 1:]
+        hi_ydata = ydata[..., -(index + 1), None] + ydata[..., index + 1:]
     else:
         hi_xdata = np.array([])
         hi_ydata = np.array([])
@@ -260,17 +525,17 @@ def data_extension(xdata: Array1D, ydata: Array1D, lo: Number = 1, hi: Number =
     # Assemble data
     if lo in [2, 3, 4] and hi in [2, 3, 4]:
         xdata = np.concatenate((lo_xdata, xdata, hi_xdata), axis=0)
-        ydata = np.concatenate((lo_ydata, ydata, hi_ydata), axis=0)
+        ydata = np.concatenate((lo_ydata, ydata, hi_ydata), axis=-1)
         lo_trim = ndata
         hi_trim = -ndata
     elif lo in [2, 3, 4] and hi == 1:
         xdata = np.concatenate((lo_xdata, xdata), axis=0)
-        ydata = np.concatenate((lo_ydata, ydata), axis=0)
+        ydata = np.concatenate((lo_ydata, ydata), axis=-1)
         lo_trim = ndata
         hi_trim = xdata.shape[0]
     elif lo == 1 and hi in [2, 3, 4]:
         xdata = np.concatenate((xdata, hi_xdata), axis=0)
-        ydata = np.concatenate((ydata, hi_ydata), axis=0)
+        ydata = np.concatenate((ydata, hi_ydata), axis=-1)
         lo_trim = 0
         hi_trim = -ndata
     else:
@@ -2,11 +2,109 @@
 import numpy as np
 from copy import deepcopy
 import matplotlib.pyplot as plt
-from typing import Optional, Tuple, List, Dict
+from collections.abc import ItemsView, ValuesView
+from typing import Optional, Tuple, List, Dict, Callable, Iterable, Union
 
 from .string_utils import _col_convert, string2digit
-from .math_utils import aggregate_fun
-from .file_utils import Path
+from .math_utils import aggregate_fun, reduce_groups
+from .file_utils import Path, smart_open
+from ._files_io.columnar import write_columns, read_columns, read_meta, read_column
+from ._files_io.text_writer import write_table
+from ._files_io.csv_reader import read_csv_cells, infer_column
+
+
+class _Pending(object):
+    def __repr__(self):
+        return '<lazy>'
+
+
+_PENDING = _Pending()
+
+
+class _Labels(list):
+    """
+    Row label list that counts its in-place edits, so cached label indexes can tell
+    when they are stale without comparing every label.
+    """
+    version = 0
+
+    def _edited(self):
+        self.version += 1
+
+
+def _counted(name):
+    method = getattr(list, name)
+
+    def edit(self, *args):
+        out = method(self, *args)
+        self._edited()
+        return out
+    edit.__name__ = name
+    return edit
+
+
+for _name in ['__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop',
+              'remove', 'clear', 'sort', 'reverse']:
+    setattr(_Labels, _name, _counted(_name))
+
+
+class LazyGrid(dict):
+    """
+    Column dict for ColTable.grid where each column is built by a loader function on first access and cached.
+    Lets tables share or defer large columns, such as views of a concatenation of sections,
+    while still behaving like the plain dict grid everywhere else.
+
+    :param keys: Column labels
+    :type keys: Iterable
+    :param loader: Function of a column label that returns the column
+    :type loader: Callable
+    :param n_rows: Length of every column, so ColTable.shape does not load columns. None if unknown.
+    :type n_rows: int
+
+    :Example:
+        >>> grid = LazyGrid(['a', 'b'], lambda key: np.zeros(3), n_rows=3)
+        >>> table = ColTable()
+        >>> table.grid = grid
+        >>> grid.loaded('a')
+        False
+    """
+
+    def __init__(self, keys: Iterable, loader: Callable, n_rows: Optional[int] = None):
+        super(LazyGrid, self).__init__(dict.fromkeys(keys, _PENDING))
+        self.loader = loader
+        self.n_rows = n_rows
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value is _PENDING:
+            value = self.loader(key)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __iter__(self):  # not the dict fast path, so dict(grid) and ** use __getitem__
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def loaded(self, key) -> bool:
+        """True if the column has been built"""
+        return dict.__getitem__(self, key) is not _PENDING
 
 
 class Table(object):
@@ -52,6 +150,8 @@ class Table(object):
     """
 
     def __init__(self, title=None, cornerlabel=None, default=...):
+        self._cache = {}  # shape, row label and column key indexes, cleared by invalidate
+        self._rows = None
         self.title = title
         self.cornerlabel = cornerlabel
         if default is not ...:  # most likely default is 0 or None so Ellipsis is used to skip the attribute creation
@@ -68,6 +168,62 @@ class Table(object):
 
         self.x_column = None  # used for .plot() method
 
+    @property
+    def grid(self):
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        self._grid = grid
+        self.invalidate()
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows):
+        ## labels are kept as a list that tracks in-place edits for the label index, tuples cannot change
+        if isinstance(rows, np.ndarray):
+            rows = _Labels(rows.tolist())
+        elif rows is not None and not isinstance(rows, (_Labels, tuple)):
+            rows = _Labels(rows)
+        self._rows = rows
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Clear the cached shape and label indexes. Assigning grid or rows, and editing through the table
+        methods does this automatically, call it after editing grid or rows in place.
+        """
+        self._cache = {}
+
+    def _row_position(self, row_key) -> int:
+        """
+        Position of a row label with a cached hash index, or int(row_key) if it is not a label.
+        The first row is used for repeated labels.
+        """
+        rows = self._rows
+        if rows is None:
+            return int(row_key)
+        check = (id(rows), rows.version if isinstance(rows, _Labels) else None)
+        cached = self._cache.get('rows')
+        if cached is None or cached[0] != check:
+            lookup = {}
+            try:
+                for index, label in enumerate(rows):
+                    lookup.setdefault(label, index)
+            except TypeError:  # unhashable labels
+                lookup = None
+            cached = self._cache['rows'] = (check, lookup)
+        lookup = cached[1]
+        try:
+            if lookup is None:
+                return list(rows).index(row_key)
+            return lookup[row_key]
+        except (KeyError, TypeError, ValueError):
+            return int(row_key)
+
     def col_fun(self, fun_name: str) -> Dict | List:
         """
         Compute aggregate functions on each column.
@@ -117,17 +273,44 @@ class Table(object):
         """
         Write table to csv file
         """
-        file = Path(file)
         self.delim = ','  # override
         self.spacer = None
+        self.txt(file, append=append, skip_header=skip_header)
+
+    def txt(self, file: Path | str, append=False, skip_header=False, chunk=65536):
+        """
+        Write table to a text file with the current delim, spacer and cell formats.
+
+        Gives the same lines as :meth:`yield_line`, but rows are formatted with one template per row
+        and written in chunks, which is much faster for large tables.
+        Compressed files are written for .gz, .bz2 and .xz extensions through smart_open.
+
+        :param file: Output file
+        :type file: Path | str
+        :param append: Append to an existing file
+        :type append: bool
+        :param skip_header: Skip the first line
+        :type skip_header: bool
+        :param chunk: Rows per write
+        :type chunk: int
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> MyLog.csv('log.csv.gz')
+        """
+        file = Path(file)
         if file and append:
             mode = 'a'
         else:
             mode = 'w'
-        with open(file, mode) as out_file:
-            for line in self.yield_line():
-                if skip_header: skip_header = False; continue
-                out_file.write(line + '\n')
+        with smart_open(file, mode) as out_file:
+            write_table(self, out_file, chunk=chunk, skip_header=skip_header)
+
+    def _text_columns(self) -> list:
+        """Columns in header order for the text writer, subclasses return arrays without per cell lookups"""
+        n_rows, n_cols = self.shape()
+        return [[self.rowcol(row_index, col_index) for row_index in range(n_rows)] for col_index in range(n_cols)]
 
     def plot(self, **kwargs):
         self.__dict__.update(kwargs)  # update with formatting kwargs
@@ -155,24 +338,21 @@ class Table(object):
             axs.title.set_text(self.title)
         return fig, axs
 
-    def yield_line(self):
-        """
-        Create one line of a table with a specified format
-        Will probably only work for rectangular tables
-        """
+    def _head_lines(self) -> Tuple[List[str], str]:
+        """Lines before the first row of :meth:`yield_line`, and the spacer line"""
         left_flag = bool(self.rowlabels())  # skip for None or empty
         top_flag = bool(self.headers()) and self.header
         shape = self.shape()
-        cell = self.cell  # keep self if changes outside?
-        float_cell = self.float_cell
+        cell = self.cell
         delim = self.delim
+        lines = []
         if self.spacer is not None:
             if left_flag:
                 width = shape[1] + 1
             else:
                 width = shape[1]
             space_line = self.spacer * width
-            yield space_line  # 1st line
+            lines.append(space_line)  # 1st line
         else:
             space_line = ''
 
@@ -190,14 +370,29 @@ class Table(object):
         if top_flag:
             for key in self.headers():
                 line += cell.format(key) + delim
-            yield line
+            lines.append(line)
 
-        if space_line: yield space_line
+        if space_line: lines.append(space_line)
+        return lines, space_line
+
+    def yield_line(self):
+        """
+        Create one line of a table with a specified format
+        Will probably only work for rectangular tables
+        """
+        left_flag = bool(self.rowlabels())  # skip for None or empty
+        shape = self.shape()
+        cell = self.cell  # keep self if changes outside?
+        float_cell = self.float_cell
+        delim = self.delim
+        head, space_line = self._head_lines()
+        yield from head
+        labels = self.rowlabels()
 
         for row_index in range(shape[0]):
             line = ''
             if left_flag:
-                line += cell.format(self.rowlabels()[row_index]) + delim
+                line += cell.format(labels[row_index]) + delim
             for col_index in range(shape[1]):
                 value = self.rowcol(row_index, col_index)
                 if value is None:
@@ -268,11 +463,7 @@ class ArrayTable(Table):
 
     def row(self, row_key):
         try:
-            if self.rows is not None and row_key in self.rows:
-                index = list(self.rows).index(row_key)
-                return self.grid[:, index]
-            else:
-                return self.grid[:, int(row_key)]
+            return self.grid[:, self._row_position(row_key)]
         except:
             if hasattr(self, 'default'):
                 return np.full(self.shape()[1], self.default)  # return array of default values
@@ -280,12 +471,7 @@ class ArrayTable(Table):
                 raise Exception(f'ERROR: ColTable does not have {row_key} as a row label, index or a default attribute')
 
     def rowcol(self, row_key, key):
-        if self.rows is None:
-            row_index = int(row_key)
-        elif row_key in self.rows:
-            row_index = self.rows.index(row_key)
-        else:
-            row_index = int(row_key)
+        row_index = self._row_position(row_key)
 
         if self.keywords is None:
             col_index = int(key)
@@ -302,6 +488,11 @@ class ArrayTable(Table):
                 return self.default
         raise Exception(f'ERROR: ArrayTable row {row_key} and col {key} could not find a match or default')
 
+    def _text_columns(self) -> list:
+        if self.grid.ndim != 2:
+            return super(ArrayTable, self)._text_columns()
+        return [self.grid[:, col_index] for col_index in range(self.grid.shape[1])]
+
 
 class ListListTable(Table):
     def __init__(self, from_listlist=None, shape=None, collabels=None, rows=None, title=None, cornerlabel=None,
@@ -339,8 +530,16 @@ class ListListTable(Table):
     def append(self, row):
         """Append to ehd of grid"""
         self.grid.append(row)
+        self._cache.pop('shape', None)
 
     def shape(self) -> Tuple[Optional[int], Optional[int]]:
+        check = (len(self.grid), None if self.keywords is None else len(self.keywords))
+        cached = self._cache.get('shape')
+        if cached is None or cached[0] != check:
+            cached = self._cache['shape'] = (check, self._shape())
+        return cached[1]
+
+    def _shape(self) -> Tuple[Optional[int], Optional[int]]:
         n_rows = len(self.grid)
         set_col = set([len(row) for row in self.grid])
         if len(set_col) == 0:
@@ -382,11 +581,7 @@ class ListListTable(Table):
 
     def row(self, row_key):
         try:
-            if self.rows is not None and row_key in self.rows:
-                index = list(self.rows).index(row_key)
-                return self.grid[index]
-            else:
-                return self.grid[int(row_key)]
+            return self.grid[self._row_position(row_key)]
         except:
             if hasattr(self, 'default'):
                 return [self.default] * self.shape()[1]  # return list of default values
@@ -395,12 +590,7 @@ class ListListTable(Table):
                     f'ERROR: ListListTable does not have {row_key} as a row label, index or a default attribute')
 
     def rowcol(self, row_key, key):
-        if self.rows is None:
-            row_index = int(row_key)
-        elif row_key in self.rows:
-            row_index = self.rows.index(row_key)
-        else:
-            row_index = int(row_key)
+        row_index = self._row_position(row_key)
 
         if self.keywords is None:
             col_index = int(key)
@@ -417,49 +607,37 @@ class ListListTable(Table):
                 return self.default
         raise Exception(f'ERROR: ListListTable row {row_key} and col {key} could not find a match or default')
 
+    def _text_columns(self) -> list:
+        n_rows, n_cols = self.shape()
+        if n_cols is None or any(len(row) != n_cols for row in self.grid):
+            return super(ListListTable, self)._text_columns()
+        return [list(column) for column in zip(*self.grid)]
+
     @classmethod
-    def read_csv(cls, file: Path | str, header=True, rowlabels=False):
+    def read_csv(cls, file: Path | str, header=True, rowlabels=False, usecols=None, nrows=None):
         """
-        Read csv file into columns
+        Read csv file into rows, each cell is converted with string2digit
+
+        :param file: csv file, .gz, .bz2 and .xz files are decompressed
+        :type file: Path | str
+        :param header: First line has column labels
+        :type header: bool
+        :param rowlabels: First cell of each row is a row label
+        :type rowlabels: bool
+        :param usecols: Labels or indexes of columns to keep, in file order. None keeps all columns.
+        :type usecols: list
+        :param nrows: Maximum number of rows to read
+        :type nrows: int
+        :return: Table of rows
+        :rtype: ListListTable
         """
         file = Path(file)
-        file_obj = file.open(mode='r')
-        row_list = []
-        columns = None
-        corner = None
-        rows = []
-
-        try:
-            for ii, line in enumerate(file_obj):
-                line = line.strip()
-                splits = line.split(',')
-
-                if ii == 0:
-                    if header:
-                        if rowlabels:
-                            corner = splits[0].strip()
-                            columns = [key.strip() for key in splits[1:]]
-                            rows = []
-                            if columns[-1] == '':
-                                columns.pop(-1)  # remove trailing comma
-                        else:
-                            rows = None
-                        continue # no data
-
-                this_row = []
-                if rowlabels:
-                    rows.append(splits[0].strip())
-
-                    for value in splits[1:]:
-                        this_row.append(string2digit(value.strip()))
-                else:
-                    for value in splits:
-                        this_row.append(string2digit(value.strip()))
-                row_list.append(this_row)
-        except:
-            raise Exception(f'ERROR: CSV line {ii} :{line} could not read from {file}')
-
-        return ListListTable(from_listlist=row_list, cornerlabel=corner, rows=rows,collabels=columns)
+        keys, corner, rows, cells = read_csv_cells(file, header=header, rowlabels=rowlabels,
+                                                   usecols=usecols, nrows=nrows)
+        row_list = [[string2digit(value.strip()) for value in row] for row in zip(*cells)]
+        if not header:
+            keys = None
+        return ListListTable(from_listlist=row_list, cornerlabel=corner, rows=rows, collabels=keys)
 
 class ColTable(Table):
     def __init__(self, from_dict=None, rows=None, title=None, cornerlabel=None, default=...):
@@ -471,6 +649,9 @@ class ColTable(Table):
         self.rows = rows
 
     def __setitem__(self, key, value):
+        if key not in self.grid:
+            self._cache.pop('keys', None)
+        self._cache.pop('shape', None)
         self.grid[key] = value
 
     def __getitem__(self, key):  # alias
@@ -478,16 +659,33 @@ class ColTable(Table):
 
     def __delitem__(self, key):
         del self.grid[key]
+        self.invalidate()
 
     def __contains__(self, key):
         return key in self.grid
 
     def shape(self) -> Tuple[Optional[int], Optional[int]]:
+        grid = self.grid
+        if isinstance(grid, LazyGrid):
+            return self._shape()
+        ## cheap check for columns edited without the table methods, first column length and column count
+        check = (len(grid), len(next(iter(grid.values()))) if grid else None,
+                 None if self.rows is None else len(self.rows))
+        cached = self._cache.get('shape')
+        if cached is None or cached[0] != check:
+            cached = self._cache['shape'] = (check, self._shape())
+        return cached[1]
+
+    def _shape(self) -> Tuple[Optional[int], Optional[int]]:
         n_cols = len(self.grid)  # will always exist >= 0
         if self.rows is not None:
             n_rows = len(self.rows)  # compare to rowlabel
         else:
             n_rows = None  # temporary
+        if isinstance(self.grid, LazyGrid) and self.grid.n_rows is not None:
+            if n_rows is None or n_rows == self.grid.n_rows:
+                return tuple((self.grid.n_rows, n_cols))  # without loading columns
+            return tuple((None, n_cols))
         for key, col in self.grid.items():
             if n_rows is None:
                 n_rows = len(col)  # 1st col is used for compare
@@ -508,13 +706,7 @@ class ColTable(Table):
 
     def row(self, row_key):
         try:
-            if self.rows is None:
-                index = int(row_key)  # if lookup not defined, use index in columns
-            elif row_key in self.rows:
-                row_list = list(self.rows)  # might be numpy
-                index = row_list.index(row_key)
-            else:
-                index = int(row_key)
+            index = self._row_position(row_key)  # if lookup not defined, use index in columns
             out_row = []
             for key, col in self.grid.items():
                 out_row.append(col[index])
@@ -524,6 +716,13 @@ class ColTable(Table):
                 return self.default
         raise Exception(f'ERROR: ColTable row {row_key} could not find a match or default')
 
+    def _keys(self) -> list:
+        """Cached list of column labels for positional lookups"""
+        cached = self._cache.get('keys')
+        if cached is None or len(cached) != len(self.grid):
+            cached = self._cache['keys'] = list(self.grid.keys())
+        return cached
+
     def col(self, key):
         try:
             if key in self.grid:
@@ -538,72 +737,269 @@ class ColTable(Table):
 
         try:
             if key not in self.grid:
-                key = list(self.grid.keys())[key]  # use as index
-            if self.rows is None:
-                value = self.grid[key][int(row_key)]  # assume int index
-            elif row_key in self.rows:
-                index = self.rows.index(row_key)
-                value = self.grid[key][index]
-            else:
-                value = self.grid[key][int(row_key)]  # try int, or it will crash
+                key = self._keys()[key]  # use as index
+            value = self.grid[key][self._row_position(row_key)]  # try int, or it will crash
             return value
         except:
             if hasattr(self, 'default'):
                 return self.default
         raise Exception(f'ERROR: ColTable row {row_key} and col {key} could not find a match or default')
 
+    def _text_columns(self) -> list:
+        return list(self.grid.values())
+
+    def save(self, file: Path | str) -> None:
+        """
+        Write columns and table attributes to a binary file, much faster than csv for large tables.
+        The format is set by the extension: '.npz', '.parquet' or '.feather' (with pyarrow),
+        or no extension for a directory of .npy files that can be memory-mapped by :meth:`load`.
+
+        :param file: Output file or directory
+        :type file: Path | str
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> MyLog.save('log.npz')
+            >>> MyLog = mooonpy.Thermospace.load('log.npz')
+        """
+        write_columns(Path(file), self.grid, self._meta())
+
+    @classmethod
+    def load(cls, file: Path | str, mmap: bool = False, lazy: bool = False):
+        """
+        Read a table written by :meth:`save`.
+
+        :param file: Input file or directory
+        :type file: Path | str
+        :param mmap: Memory-map columns of .npy directories and Feather files instead of reading them
+        :type mmap: bool
+        :param lazy: Only read the attributes, each column is read the first time it is used (a :class:`LazyGrid`)
+        :type lazy: bool
+        :return: Table of the calling class
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.load('log_columns', mmap=True, lazy=True)
+            >>> MyLog['Temp']  # only this column is opened
+        """
+        file = Path(file)
+        out = cls()
+        if lazy:
+            meta = read_meta(file)
+            out.grid = LazyGrid(meta['columns'], lambda key: read_column(file, meta, key, mmap=mmap),
+                                n_rows=meta.get('n_rows'))
+        else:
+            columns, meta = read_columns(file, mmap=mmap)
+            out.grid = columns
+        out._set_meta(meta)
+        return out
+
+    def _meta(self) -> dict:
+        """JSON compatible attributes for :meth:`save`"""
+        rows = self.rows
+        if rows is not None:
+            rows = list(rows)
+        return {'class': self.__class__.__name__, 'title': self.title, 'cornerlabel': self.cornerlabel,
+                'x_column': self.x_column, 'rows': rows}
+
+    def _set_meta(self, meta: dict):
+        self.title = meta.get('title')
+        self.cornerlabel = meta.get('cornerlabel')
+        self.x_column = meta.get('x_column')
+        self.rows = meta.get('rows')
+
+    def groupby(self, by: Union[str, List[str]], bins=None, width=None) -> 'GroupBy':
+        """
+        Group rows by the values of one or more columns, optionally binned, for aggregation with GroupBy.agg.
+
+        :param by: Column label or list of labels
+        :type by: Union[str, List[str]]
+        :param bins: Bin values before grouping, an int number of equal bins or an array of bin edges.
+            A dict of {label: bins} bins only some columns.
+        :type bins: Union[int, np.ndarray, dict]
+        :param width: Bin values into windows of this width, aligned to multiples of width, such as
+            Step windows for block averages. A dict of {label: width} bins only some columns.
+        :type width: Union[Number, dict]
+        :return: Grouped rows
+        :rtype: GroupBy
+
+        :Example:
+            >>> import mooonpy
+            >>> MyLog = mooonpy.Thermospace.read('log.lammps')
+            >>> blocks = MyLog.groupby('Step', width=10000).agg('avg')
+            >>> stats = MyLog.groupby('section').agg({'Temp': ['avg', 'std'], 'Step': 'count'})
+        """
+        if isinstance(by, str) or not isinstance(by, (list, tuple)):
+            by = [by]
+        keys = {}
+        valid = None
+        for key in by:
+            values, key_valid = self._group_key(key)
+            key_bins = bins.get(key) if isinstance(bins, dict) else bins
+            key_width = width.get(key) if isinstance(width, dict) else width
+            keys[key] = _bin_values(values, key_bins, key_width)
+            if key_valid is not None:
+                valid = key_valid if valid is None else valid & key_valid
+        return GroupBy(self, keys, valid=valid)
+
+    def _group_key(self, key) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Values of a groupby key for each row, and a mask of rows to keep (None for all)"""
+        return np.asarray(self.col(key)), None
+
     @classmethod
-    def read_csv(cls, file: Path | str, header=True, rowlabels=False, keep_list=None):
+    def read_csv(cls, file: Path | str, header=True, rowlabels=False, keep_list=None, usecols=None, nrows=None):
         """
         Read csv file into columns
+
+        Rows are split with the csv module, so quoted cells may contain commas, and each kept column
+        is converted with one numpy call: int if every value is a whole number, float if numeric
+        with np.nan for empty cells, otherwise a list of strings.
+
+        :param file: csv file, .gz, .bz2 and .xz files are decompressed
+        :type file: Path | str
+        :param header: First line has column labels, otherwise columns are labelled 0, 1, ...
+        :type header: bool
+        :param rowlabels: First cell of each row is a row label
+        :type rowlabels: bool
+        :param keep_list: Labels or indexes of columns to keep as strings
+        :type keep_list: list
+        :param usecols: Labels or indexes of columns to read, in file order. None reads all columns.
+        :type usecols: list
+        :param nrows: Maximum number of rows to read
+        :type nrows: int
+        :return: Table of columns
+        :rtype: ColTable
+
+        :Example:
+            >>> from mooonpy.tools import ColTable
+            >>> table = ColTable.read_csv('thermo.csv.gz', usecols=['Step', 'Temp'], nrows=1000)
         """
         file = Path(file)
-        file_obj = file.open(mode='r')
-        columns = {}
-        corner = None
-        rows = None
         if keep_list is None: keep_list = []
+        keys, corner, rows, cells = read_csv_cells(file, header=header, rowlabels=rowlabels,
+                                                   usecols=usecols, nrows=nrows)
+        columns = {}
+        for ii, (key, vector) in enumerate(zip(keys, cells)):
+            if ii in keep_list or key in keep_list:
+                columns[key] = [value.strip() for value in vector]
+            else:
+                columns[key] = infer_column(vector)
+        return ColTable(from_dict=columns, cornerlabel=corner, rows=rows)
 
-        try:
-            for ii, line in enumerate(file_obj):
-                line = line.strip()
-                splits = line.split(',')
-
-                if ii == 0:
-                    if header:
-                        if rowlabels:
-                            corner = splits[0].strip()
-                            keys = [key.strip() for key in splits[1:]]
-                            rows = []
-                        else:
-                            keys = [key.strip() for key in splits]
-                    else:
-                        if rowlabels:
-                            keys = list(range(len(splits) - 1))
-                            rows = []
-                        else:
-                            keys = list(range(len(splits)))
-                    if keys[-1] == '': keys.pop(-1) # remove trailing comma
-                    columns = {key: list() for key in keys}
-                else:
-                    if rowlabels:
-                        rows.append(splits[0].strip())
-                        for key, value in zip(keys, splits[1:]):
-                            columns[key].append(value.strip())
-                    else:
-                        for key, value in zip(keys, splits):
-                            columns[key].append(value.strip())
-        except:
-            raise Exception(f'ERROR: CSV line {ii} :{line} could not read from {file}')
 
-        for ii, (key, vector) in enumerate(columns.items()):
-            if ii in keep_list or key in keep_list: continue
-            try:
-                columns[key] = _col_convert(vector)  # string to float converter
-            except:
-                pass  # keep as list of strings
+def _bin_values(values: np.ndarray, bins=None, width=None) -> np.ndarray:
+    """Left bin edge of each value, np.nan outside of bins given as edges"""
+    if width is not None:
+        if values.dtype.kind in 'iu' and float(width).is_integer():
+            return values // int(width) * int(width)  # keep int steps
+        return np.floor(values / width) * width
+    elif bins is None:
+        return values
+    if np.ndim(bins) == 0:
+        edges = np.linspace(np.nanmin(values), np.nanmax(values), int(bins) + 1)
+    else:
+        edges = np.asarray(bins, dtype=float)
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = len(edges) - 2  # last edge is inclusive
+    out = np.full(len(values), np.nan)
+    inside = (index >= 0) & (index < len(edges) - 1)
+    out[inside] = edges[index[inside]]
+    return out
+
+
+class GroupBy(object):
+    """
+    Rows of a ColTable sorted into groups by key values, made by ColTable.groupby.
+    Rows are sorted by group once, with a stable sort that is skipped when the groups are already in order,
+    and each aggregation is one np.ufunc.reduceat call per column. Rows with a nan key are left out.
+
+    :param table: Table to group
+    :type table: ColTable
+    :param keys: {label: key value of each row}
+    :type keys: Dict[str, np.ndarray]
+    :param valid: Mask of rows to keep, None for all
+    :type valid: np.ndarray
+    """
 
-        return ColTable(from_dict=columns, cornerlabel=corner, rows=rows)
+    def __init__(self, table: ColTable, keys: Dict[str, np.ndarray], valid: Optional[np.ndarray] = None):
+        self.table = table
+        n_rows = table.shape()[0] or 0
+        valid = np.ones(n_rows, dtype=bool) if valid is None else np.array(valid, dtype=bool)
+        inverses, uniques = [], []
+        for key, values in keys.items():
+            if values.dtype.kind == 'f':
+                valid &= np.logical_not(np.isnan(values))
+        self.rows = None if valid.all() else np.flatnonzero(valid)  # rows kept, None for all
+
+        for key, values in keys.items():
+            if self.rows is not None:
+                values = values[self.rows]
+            unique, inverse = np.unique(values, return_inverse=True)
+            uniques.append(unique)
+            inverses.append(inverse.ravel())
+        if len(inverses) == 1:
+            codes = inverses[0]
+        else:
+            codes = np.ravel_multi_index(inverses, [len(unique) for unique in uniques])
+
+        if len(codes) and np.any(codes[1:] < codes[:-1]):
+            self.order = np.argsort(codes, kind='stable')
+            codes = codes[self.order]
+        else:
+            self.order = None  # already sorted, columns are used without a copy
+        if len(codes):
+            self.starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+        else:
+            self.starts = np.empty(0, dtype=np.intp)
+
+        first = self.starts if self.order is None else self.order[self.starts]  # in kept rows
+        self.labels = {key: unique[inverse[first]] for key, unique, inverse in zip(keys, uniques, inverses)}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def sorted(self, key) -> np.ndarray:
+        """Column values sorted by group"""
+        column = np.asarray(self.table.col(key))
+        if self.rows is not None:
+            column = column[self.rows]
+        if self.order is not None:
+            column = column[self.order]
+        return column
+
+    def agg(self, funs: Union[str, Dict[str, Union[str, Callable, List]]]) -> ColTable:
+        """
+        Aggregate columns in each group.
+
+        :param funs: Function name from math_utils.reduce_groups ('sum', 'avg', 'std', 'min', 'max', 'count',
+            'first', 'last', with '0' or 'None' modes) applied to every other column, or {label: functions}.
+            Functions may be names or callables of a vector, and a list of functions gives one column per function.
+        :type funs: Union[str, Dict[str, Union[str, Callable, List]]]
+        :return: Table with the key columns, then one column per aggregate, labelled by the column for
+            single functions or 'label function' for lists
+        :rtype: ColTable
+        """
+        if isinstance(funs, str) or callable(funs):
+            funs = {key: funs for key in self.table.headers() if key not in self.labels}
+        out = ColTable(title=self.table.title)
+        for key, values in self.labels.items():
+            out[key] = values
+        for key, fun_list in funs.items():
+            single = not isinstance(fun_list, (list, tuple))
+            if single:
+                fun_list = [fun_list]
+            column = self.sorted(key)
+            for fun in fun_list:
+                if callable(fun):
+                    name = getattr(fun, '__name__', 'fun')
+                    ends = np.append(self.starts[1:], len(column))
+                    value = np.array([fun(column[start:end]) for start, end in zip(self.starts, ends)])
+                else:
+                    name = fun
+                    value = reduce_groups(fun, column, self.starts)
+                out[key if single else f'{key} {name}'] = value
+        return out
 
 
 # %%
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+import math
+import numpy as np
+from typing import Optional, Tuple, List
+
+from ..tools.tables import ColTable
+from ..molspace.periodic_table import Elements
+
+Array1D = np.ndarray
+
+
+class Xrdspace(ColTable):
+    """
+    Class to hold structure factor and powder X-ray diffraction data computed from a Molspace.
+    Data is organized into the columns
+
+        - q: scattering vector magnitude in 1/angstrom
+        - 2theta: diffraction angle in degrees for the wavelength used, nan if q is unreachable
+        - intensity: X-ray intensity per atom in electrons^2
+        - S(q): Faber-Ziman total structure factor, tends to 1 at high q
+
+    This class can be called via:
+      * Full namespace syntax    : ``mooonpy.xrdspace.xrdspace.Xrdspace()``
+      * Aliased namespace syntax : ``mooonpy.Xrdspace()``
+
+    :Example:
+        >>> import mooonpy
+        >>> system = mooonpy.Molspace('cured_epon.data')
+        >>> system.atoms.wrap()
+        >>> xrd = mooonpy.Xrdspace.debye(system, cutoff=12)
+        >>> xrd.csv('cured_epon_xrd.csv')
+        >>> big = mooonpy.Xrdspace.fft(system, spacing=0.2)
+    """
+
+    def __init__(self, **kwargs):
+        super(Xrdspace, self).__init__(**kwargs)
+        self.x_column = 'q'
+        self.wavelength = 1.5406  # Cu K-alpha in angstroms
+
+    @classmethod
+    def debye(cls, molspace, q: Optional[Array1D] = None, cutoff: float = 10.0, dr: float = 0.01,
+              wavelength: float = 1.5406, damping: Optional[str] = 'lorch',
+              periodicity: str = 'ppp') -> 'Xrdspace':
+        """
+        Compute S(q) and powder XRD with the Debye equation over binned pair-distance histograms.
+        See :func:`debye_intensity`.
+        """
+        q = _default_q(q)
+        elements, _ = atom_elements(molspace)
+        intensity = debye_intensity(molspace, q, cutoff=cutoff, dr=dr, damping=damping,
+                                    periodicity=periodicity, elements=elements)
+        return _assemble(cls, q, intensity, elements, wavelength, f'Debye: {molspace.filename}')
+
+    @classmethod
+    def fft(cls, molspace, q: Optional[Array1D] = None, spacing: float = 0.25,
+            wavelength: float = 1.5406) -> 'Xrdspace':
+        """
+        Compute S(q) and powder XRD from FFTs of per-element densities on a grid.
+        See :func:`fft_intensity`.
+        """
+        q = _default_q(q)
+        elements, positions = atom_elements(molspace)
+        intensity = fft_intensity(molspace, q, spacing=spacing, elements=elements, positions=positions)
+        return _assemble(cls, q, intensity, elements, wavelength, f'FFT: {molspace.filename}')
+
+
+def _default_q(q: Optional[Array1D]) -> np.ndarray:
+    if q is None:
+        return np.linspace(0.5, 10.0, 951)  # 0.01 1/angstrom steps
+    return np.asarray(q, dtype=float)
+
+
+def _assemble(cls, q, intensity, elements, wavelength, title) -> 'Xrdspace':
+    pt = Elements()
+    f_avg, f2_avg = _form_factor_averages(pt, elements, q)
+    out = cls()
+    out.title = title
+    out.wavelength = wavelength
+    with np.errstate(invalid='ignore'):
+        out['q'] = q
+        out['2theta'] = np.degrees(2 * np.arcsin(q * wavelength / (4 * np.pi)))  # nan if unreachable
+        out['intensity'] = intensity
+        out['S(q)'] = 1 + (intensity - f2_avg) / (f_avg * f_avg)
+    return out
+
+
+def _form_factor_averages(pt: Elements, elements: List[str], q: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Composition averaged <f> and <f^2> at each q"""
+    symbols, counts = np.unique(elements, return_counts=True)
+    fractions = counts / counts.sum()
+    f_avg = np.zeros_like(q)
+    f2_avg = np.zeros_like(q)
+    for symbol, fraction in zip(symbols, fractions):
+        f = pt.element2form_factor(symbol, q)
+        f_avg += fraction * f
+        f2_avg += fraction * f * f
+    return f_avg, f2_avg
+
+
+def atom_elements(molspace) -> Tuple[List[str], np.ndarray]:
+    """
+    Element symbols and an Nx3 position array for all atoms in a Molspace, in atom ID order.
+    The atom 'element' attribute is used if set, otherwise the element is looked up from the type mass.
+
+    :param molspace: Molspace to read atoms from
+    :type molspace: Molspace
+    :return: element symbols, positions
+    :rtype: Tuple[List[str], np.ndarray]
+    """
+    pt = Elements()
+    type2element = {}
+    elements = []
+    positions = np.empty((len(molspace.atoms), 3))
+    for n, (id_, atom) in enumerate(sorted(molspace.atoms.items())):
+        element = getattr(atom, 'element', '')
+        if not element:
+            if atom.type not in type2element:
+                type2element[atom.type] = pt.mass2element(molspace.ff.masses[atom.type].coeffs[0])
+            element = type2element[atom.type]
+        elements.append(element)
+        positions[n] = atom.x, atom.y, atom.z
+    return elements, positions
+
+
+def pair_histograms(molspace, cutoff: float, dr: float, elements: Optional[List[str]] = None,
+                    periodicity: str = 'ppp') -> Tuple[np.ndarray, dict]:
+    """
+    Histogram pair distances within a cutoff for every element pair, using Molspace.compute_pairs,
+    which costs O(N*neighbours).
+
+    :param molspace: Molspace with wrapped atoms
+    :type molspace: Molspace
+    :param cutoff: Largest pair distance in angstroms
+    :type cutoff: float
+    :param dr: Bin width in angstroms
+    :type dr: float
+    :param elements: Element symbols in atom ID order, defaults to None to look up with atom_elements
+    :type elements: List[str]
+    :param periodicity: Periodicity flags passed to compute_pairs
+    :type periodicity: str
+    :return: bin centers, {(element_a, element_b): counts} with element_a <= element_b and each pair counted once
+    :rtype: Tuple[np.ndarray, dict]
+    """
+    if elements is None:
+        elements, positions = atom_elements(molspace)
+    ids = sorted(molspace.atoms.keys())
+    symbols = sorted(set(elements))
+    codes = {id_: symbols.index(element) for id_, element in zip(ids, elements)}
+
+    domains, pairs = molspace.compute_pairs(cutoff, periodicity=periodicity)
+    n_pairs = len(pairs)
+    code_a = np.empty(n_pairs, dtype=int)
+    code_b = np.empty(n_pairs, dtype=int)
+    distances = np.empty(n_pairs)
+    for n, (key, pair) in enumerate(pairs.items()):
+        code_a[n] = codes[key[0]]
+        code_b[n] = codes[key[1]]
+        distances[n] = pair.distance
+
+    n_bins = int(math.ceil(cutoff / dr))
+    bins = np.minimum((distances / dr).astype(int), n_bins - 1)
+    lo = np.minimum(code_a, code_b)
+    hi = np.maximum(code_a, code_b)
+    n_sym = len(symbols)
+    flat = np.bincount((lo * n_sym + hi) * n_bins + bins, minlength=n_sym * n_sym * n_bins)
+    flat = flat.reshape(n_sym, n_sym, n_bins)
+
+    histograms = {}
+    for a in range(n_sym):
+        for b in range(a, n_sym):
+            histograms[(symbols[a], symbols[b])] = flat[a, b]
+    centers = (np.arange(n_bins) + 0.5) * dr
+    return centers, histograms
+
+
+def debye_intensity(molspace, q: Array1D, cutoff: float = 10.0, dr: float = 0.01, damping: Optional[str] = 'lorch',
+                    periodicity: str = 'ppp', elements: Optional[List[str]] = None) -> np.ndarray:
+    """
+    X-ray intensity per atom from the Debye scattering equation evaluated over binned pair distances.
+
+    >>> I(q) = sum_i f_i^2 + sum_r W(r) sinc(q r) [sum_ab 2 f_a f_b h_ab(r) - rho_f^2 V 4 pi r^2 dr]
+
+    Pairs are binned per element pair, so the cost of the sum over q is set by the number of bins and not the
+    number of pairs. The uniform density term is removed for periodic systems, so only the structure within the
+    cutoff contributes, and the window W(r) damps truncation ripples.
+
+    :param molspace: Molspace with wrapped atoms
+    :type molspace: Molspace
+    :param q: Scattering vector magnitudes in 1/angstrom
+    :type q: Array1D
+    :param cutoff: Largest pair distance in angstroms, must allow 3 domains per periodic direction
+    :type cutoff: float
+    :param dr: Bin width in angstroms
+    :type dr: float
+    :param damping: 'lorch' for the Lorch window or None for no damping
+    :type damping: str
+    :param periodicity: Periodicity flags passed to compute_pairs, the density term is only removed if 'ppp'
+    :type periodicity: str
+    :param elements: Element symbols in atom ID order, defaults to None to look up with atom_elements
+    :type elements: List[str]
+    :return: Intensity per atom at each q
+    :rtype: np.ndarray
+
+    .. seealso:: :func:`fft_intensity` for large cells
+    """
+    q = np.asarray(q, dtype=float)
+    if elements is None:
+        elements, _ = atom_elements(molspace)
+    pt = Elements()
+    n_atoms = len(elements)
+    centers, histograms = pair_histograms(molspace, cutoff, dr, elements, periodicity)
+
+    symbols, counts = np.unique(elements, return_counts=True)
+    form_factors = {symbol: pt.element2form_factor(symbol, q) for symbol in symbols}
+
+    # q x r kernel, np.sinc is sin(pi x)/(pi x)
+    kernel = np.sinc(np.outer(q, centers) / np.pi)
+    if damping == 'lorch':
+        kernel *= np.sinc(centers / cutoff)
+    elif damping is not None:
+        raise ValueError(f'damping {damping} must be "lorch" or None')
+
+    intensity = np.zeros_like(q)
+    for symbol, count in zip(symbols, counts):
+        intensity += count * form_factors[symbol] ** 2  # self scattering
+    for (a, b), histogram in histograms.items():
+        intensity += 2 * form_factors[a] * form_factors[b] * (kernel @ histogram)
+
+    if periodicity == 'ppp':
+        lx, ly, lz = molspace.atoms.box.get_lengths()
+        volume = lx * ly * lz
+        f_sum = np.zeros_like(q)
+        for symbol, count in zip(symbols, counts):
+            f_sum += count * form_factors[symbol]
+        shells = 4 * np.pi * centers * centers * dr
+        intensity -= f_sum * f_sum / volume * (kernel @ shells)
+    return intensity / n_atoms
+
+
+def fft_intensity(molspace, q: Array1D, spacing: float = 0.25, elements: Optional[List[str]] = None,
+                  positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    X-ray intensity per atom from FFTs of per-element number densities on a periodic grid.
+
+    Atoms are deposited on a fractional grid with cloud-in-cell weights, each element grid is transformed
+    once, and the form factor weighted amplitudes are summed and spherically averaged into q bins.
+    The cost is O(N + M log M) for M grid points, so it suits cells too large for pair histograms.
+    Only reciprocal lattice vectors of the cell are sampled, so q bins narrower than 2*pi/L may be empty (nan).
+
+    :param molspace: Molspace with atoms inside the box
+    :type molspace: Molspace
+    :param q: Scattering vector magnitudes in 1/angstrom, used as bin centers
+    :type q: Array1D
+    :param spacing: Target grid spacing in angstroms, q above pi/spacing is not resolved
+    :type spacing: float
+    :param elements: Element symbols in atom ID order, defaults to None to look up with atom_elements
+    :type elements: List[str]
+    :param positions: Nx3 positions in atom ID order, defaults to None to look up with atom_elements
+    :type positions: np.ndarray
+    :return: Intensity per atom at each q
+    :rtype: np.ndarray
+
+    .. seealso:: :func:`debye_intensity`
+    """
+    q = np.asarray(q, dtype=float)
+    if elements is None or positions is None:
+        elements, positions = atom_elements(molspace)
+    pt = Elements()
+    box = molspace.atoms.box
+    h, h_inv, boxlo, boxhi = box.get_transformation_matrix()
+    ux, uy, uz = box.pos2frac(positions[:, 0], positions[:, 1], positions[:, 2], h_inv, boxlo)
+    fractionals = np.column_stack((ux, uy, uz)) % 1.0
+
+    lengths = box.get_lengths()
+    shape = tuple(max(2, int(math.ceil(length / spacing))) for length in lengths)
+
+    # Reciprocal lattice vectors G = 2 pi H^-T m for the rfftn index grid
+    matrix = np.array([[h[0], h[5], h[4]],
+                       [0.0, h[1], h[3]],
+                       [0.0, 0.0, h[2]]])
+    recip = 2 * np.pi * np.linalg.inv(matrix).T
+    m0 = np.fft.fftfreq(shape[0], 1 / shape[0])
+    m1 = np.fft.fftfreq(shape[1], 1 / shape[1])
+    m2 = np.fft.rfftfreq(shape[2], 1 / shape[2])
+    M0, M1, M2 = np.meshgrid(m0, m1, m2, indexing='ij')
+    G = (recip[:, 0, None, None, None] * M0 + recip[:, 1, None, None, None] * M1 +
+         recip[:, 2, None, None, None] * M2)
+    g_mag = np.sqrt(np.sum(G * G, axis=0))
+    window = (np.sinc(M0 / shape[0]) * np.sinc(M1 / shape[1]) * np.sinc(M2 / shape[2])) ** 2  # CIC
+
+    # rfft stores half of the modes, interior kz planes stand in for their mirror image
+    weights = np.full(g_mag.shape, 2.0)
+    weights[:, :, 0] = 1.0
+    if shape[2] % 2 == 0:
+        weights[:, :, -1] = 1.0
+
+    amplitude = np.zeros(g_mag.shape, dtype=complex)
+    elements = np.asarray(elements)
+    for symbol in np.unique(elements):
+        density = _cic_deposit(fractionals[elements == symbol], shape)
+        amplitude += pt.element2form_factor(symbol, g_mag) * np.fft.rfftn(density)
+    intensity_g = np.abs(amplitude / window) ** 2
+
+    # Spherical average into q bins, skipping G = 0
+    edges = np.concatenate(([q[0] - (q[1] - q[0]) / 2], (q[1:] + q[:-1]) / 2, [q[-1] + (q[-1] - q[-2]) / 2]))
+    which = np.digitize(g_mag.ravel(), edges) - 1
+    valid = (which >= 0) & (which < len(q)) & (g_mag.ravel() > 0)
+    sums = np.bincount(which[valid], weights=(weights * intensity_g).ravel()[valid], minlength=len(q))
+    norms = np.bincount(which[valid], weights=weights.ravel()[valid], minlength=len(q))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        intensity = sums / norms
+    intensity[norms == 0] = np.nan
+    return intensity / len(elements)
+
+
+def _cic_deposit(fractionals: np.ndarray, shape: Tuple[int, int, int]) -> np.ndarray:
+    """Cloud-in-cell deposit of fractional positions onto a periodic grid"""
+    n = np.array(shape)
+    scaled = fractionals * n
+    base = np.floor(scaled).astype(int)
+    frac = scaled - base
+    grid = np.zeros(int(np.prod(n)))
+    for corner in range(8):
+        offset = np.array([(corner >> 2) & 1, (corner >> 1) & 1, corner & 1])
+        weight = np.prod(np.where(offset, frac, 1 - frac), axis=1)
+        index = (base + offset) % n
+        flat = (index[:, 0] * n[1] + index[:, 1]) * n[2] + index[:, 2]
+        grid += np.bincount(flat, weights=weight, minlength=grid.size)
+    return grid.reshape(shape)
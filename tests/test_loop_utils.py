@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import pytest
+import numpy as np
+
+from mooonpy.tools.loop_utils import Cartesian
+
+
+def _simulate(result):
+    """Stand in for a simulation run, module level for the process pool"""
+    if result['temp'] == 500:
+        raise ValueError('unstable')
+    return {'energy': result['temp'] * result['size'], 'phase': 'solid' if result['temp'] < 400 else 'liquid'}
+
+
+@pytest.fixture
+def cart():
+    """Sweep with parallel entries and conditionals on two dimensions"""
+    return Cartesian({
+        'material': ['steel', 'aluminum', 'copper'],
+        'material.ele': ['Fe', 'Al', 'Cu'],
+        'material.1.alloy': ['6061', '7075'],
+        'material.1.temper': ['T6'],
+        'temp': [300, 400],
+        'temp.0.ramp': [1, 2, 3],
+        'size': range(10, 31, 10),
+    })
+
+
+class TestIndexing:
+    """Pytest tests for counting and random access without generating the product"""
+
+    def test_matches_generate(self, cart):
+        """Test every index decodes to the generated result, including conditional expansions"""
+        combos = [('material', 'temp'), ('size', 'material')]
+        results = cart.generate_list(return_combined_indices=combos)
+        assert len(cart) == len(results) == (1 + 3 + 1) * 3 * (3 + 1)
+        for global_idx, result in enumerate(results):
+            decoded = cart.get(global_idx, combos)
+            assert list(decoded.items()) == list(result.items())
+            assert decoded.global_idx == result.global_idx == global_idx
+            assert decoded.dimension_indices == result.dimension_indices
+            assert decoded.combined_indices == result.combined_indices
+            assert cart.get_combined_index(('size', 'material'), result) == result.combined_indices[('size', 'material')]
+
+    def test_slices(self, cart):
+        """Test negative indices, slices and chunks cover the sweep in order"""
+        results = cart.generate_list()
+        assert dict(cart[-1]) == dict(results[-1])
+        assert [dict(result) for result in cart[5:40:7]] == [dict(result) for result in results[5:40:7]]
+        with pytest.raises(IndexError):
+            cart[len(cart)]
+
+        chunks = cart.chunks(4)
+        assert [len(chunk) for chunk in chunks] == [15, 15, 15, 15]
+        assert [result.global_idx for chunk in chunks for result in cart[chunk]] == list(range(len(cart)))
+        assert Cartesian({'a': range(3)}).chunks(5)[-1] == range(3, 3)
+
+    def test_large(self):
+        """Test a million point sweep is counted and indexed without generating it"""
+        cart = Cartesian({'a': range(100), 'b': range(100), 'c': range(100), 'c.5.d': ['x', 'y']})
+        assert len(cart) == 1010000
+        assert dict(cart[-1]) == {'a': 99, 'b': 99, 'c': 99}
+        assert dict(cart[6]) == {'a': 0, 'b': 0, 'c': 5, 'd': 'y'}
+
+    def test_empty_conditional(self):
+        """Test an empty conditional entry is rejected"""
+        with pytest.raises(ValueError):
+            Cartesian({'a': range(3), 'a.1.b': []})
+
+
+def _clashing(result):
+    """Outputs reusing the parameter and error column names"""
+    return {'temp': result['temp'] * 2, 'error': 1.5, 'out_temp': 0}
+
+
+class TestMap:
+    """Pytest tests for running sweeps with a resumable ledger"""
+
+    @pytest.fixture
+    def ledger(self, tmp_path):
+        return str(tmp_path / 'sweep.jsonl')
+
+    def test_backends(self):
+        """Test process, thread and in process runs give the same table in generation order"""
+        cart = Cartesian({'temp': [300, 400, 500], 'size': [1, 2], 'size.1.scale': [0.5, 2.0]})
+        table = cart.map(_simulate, workers=1)
+        assert table.headers() == ['size', 'temp', 'scale', 'energy', 'phase', 'error']
+        assert table['energy'][0] == 300 and table['energy'][4] == 600 and np.isnan(table['energy'][2])
+        assert table['error'][2] == 'unstable' and table['phase'][2] is None
+        assert np.isnan(table['scale'][0]) and table['scale'][3] == 0.5
+        for backend in ['process', 'thread']:
+            parallel = cart.map(_simulate, workers=3, backend=backend, chunksize=2)
+            assert np.array_equal(parallel['energy'], table['energy'], equal_nan=True)
+            assert parallel['error'] == table['error']
+
+    def test_resume(self, ledger):
+        """Test finished combinations are read from the ledger and failures are retried"""
+        calls = []
+        lock = threading.Lock()
+
+        def counted(result):
+            with lock:
+                calls.append(dict(result))
+            return result['a'] * 10
+
+        first = Cartesian({'a': [1, 2, 3]}).map(counted, workers=2, backend='thread', ledger=ledger)
+        assert len(calls) == 3 and first['result'].tolist() == [10, 20, 30]
+        with open(ledger, 'a') as f:
+            f.write('{"key": "partial')  # interrupted write
+
+        calls.clear()
+        extended = Cartesian({'a': [0, 1, 2, 3, 4]}).map(counted, workers=1, ledger=ledger)
+        assert calls == [{'a': 0}, {'a': 4}]
+        assert extended['result'].tolist() == [0, 10, 20, 30, 40]
+
+        calls.clear()
+        failing = Cartesian({'temp': [300, 500], 'size': [1]})
+        assert failing.map(_simulate, workers=1, ledger=ledger)['error'] == ['', 'unstable']
+        with open(ledger) as f:
+            keys = [json.loads(line)['key'] for line in f if line.startswith('{"key": "{')]
+        assert len(keys) == 6
+
+    def test_name_clash(self):
+        """Test outputs named like a parameter or error are prefixed instead of overwriting"""
+        table = Cartesian({'temp': [300, 400]}).map(_clashing, workers=1)
+        assert table.headers() == ['temp', 'out_temp', 'out_error', 'out_out_temp', 'error']
+        assert table['temp'].tolist() == [300, 400] and table['out_temp'].tolist() == [600, 800]
+        assert table['out_error'].tolist() == [1.5, 1.5] and table['out_out_temp'].tolist() == [0, 0]
+        assert table['error'] == ['', '']
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import warnings
+import numpy as np
+
+from scipy.signal import lfilter
+
+from mooonpy.tools.math_utils import aggregate_fun, reduce_groups, autocorrelation, statistical_inefficiency, \
+    block_average, compute_fringe_slope, compute_derivative, find_peaks_and_valleys, find_peaks_and_valleys_many
+from scipy.signal import find_peaks
+
+
+class TestReduceGroups:
+    """Pytest tests for grouped aggregates"""
+
+    @pytest.mark.parametrize('fun_name', ['sum', 'avg', 'std', 'avg0', 'sumNone', 'stdNone'])
+    def test_matches_aggregate_fun(self, fun_name):
+        """Test each group matches aggregate_fun on its slice"""
+        rng = np.random.default_rng(0)
+        vector = rng.integers(0, 4, 50).astype(float)
+        vector[[3, 17, 30]] = np.nan if fun_name.endswith('None') else 0
+        starts = np.array([0, 7, 20, 21, 40])
+        expected = [aggregate_fun(fun_name, vector[start:end]) for start, end in zip(starts, [7, 20, 21, 40, 50])]
+        assert np.allclose(reduce_groups(fun_name, vector, starts), expected)
+
+    def test_other_functions(self):
+        """Test min, max, count, first and last, and empty groups after a mode"""
+        vector = np.array([3, 1, 2, 0, 0, 5])
+        starts = np.array([0, 3, 5])
+        assert np.array_equal(reduce_groups('min', vector, starts), [1, 0, 5])
+        assert np.array_equal(reduce_groups('max', vector, starts), [3, 0, 5])
+        assert np.array_equal(reduce_groups('count0', vector, starts), [3, 0, 1])
+        assert np.array_equal(reduce_groups('first', vector, starts), [3, 0, 5])
+        assert np.array_equal(reduce_groups('last', vector, starts), [2, 0, 5])
+        assert np.isnan(reduce_groups('avg0', vector, starts)[1])
+
+
+class TestErrorAnalysis:
+    """Pytest tests for autocorrelation, statistical inefficiency and block averaging"""
+
+    @pytest.fixture
+    def series(self):
+        """AR(1) series with g = (1 + phi) / (1 - phi) = 9, and white noise"""
+        rng = np.random.default_rng(1)
+        noise = rng.normal(size=100000)
+        return np.stack([lfilter([1], [1, -0.8], noise), noise])
+
+    def test_autocorrelation(self, series):
+        """Test the FFT result matches a direct sum"""
+        x = series[0][:500]
+        direct = [np.mean((x[:len(x) - t] - x.mean()) * (x[t:] - x.mean())) for t in range(10)]
+        assert np.allclose(autocorrelation(x, max_lag=9), np.array(direct) / direct[0])
+        assert autocorrelation(series, max_lag=5).shape == (2, 6)
+
+    def test_inefficiency(self, series):
+        """Test g of a batch against the AR(1) value"""
+        g = statistical_inefficiency(series)
+        assert abs(g[0] - 9) < 1
+        assert g[1] < 1.2
+        assert statistical_inefficiency(np.ones(10)) == 1
+
+    def test_block_average(self, series):
+        """Test the plateau standard error agrees with the autocorrelation estimate"""
+        sizes, sems, errors, optimal = block_average(series)
+        assert np.array_equal(sizes[:4], [1, 2, 4, 8])
+        assert np.all(optimal >= 0)
+        expected = series.std(axis=1) * np.sqrt(statistical_inefficiency(series) / series.shape[1])
+        best = sems[np.arange(2), optimal]
+        assert np.allclose(best, expected, rtol=0.15)
+
+
+def _walked_fringe_slope(strain, stress, min_strain=None, max_strain=None):
+    """Original loop version of compute_fringe_slope, forward direction"""
+    if min_strain is None: min_strain = min(strain)
+    if max_strain is None: max_strain = max(strain)
+    slopes, fringe = [], []
+    sum_xi, sum_yi, sum_xi_2, sum_xi_yi, n = 0, 0, 0, 0, 0
+    for x, y in zip(strain, stress):
+        sum_xi += x
+        sum_yi += y
+        n += 1
+        sum_xi_2 += x * x
+        sum_xi_yi += x * y
+        if n <= 3: continue
+        if min_strain <= x <= max_strain:
+            slopes.append((sum_xi_yi - sum_xi * sum_yi / n) / (sum_xi_2 - sum_xi * sum_xi / n))
+            fringe.append(x)
+    return np.array(fringe), np.array(slopes)
+
+
+class TestFringeSlope:
+    """Pytest tests for the cumulative sum fringe slope"""
+
+    @pytest.fixture
+    def curve(self):
+        rng = np.random.default_rng(2)
+        strain = np.linspace(0, 0.2, 500)
+        stress = 3000 * strain - 8000 * np.clip(strain - 0.05, 0, None) ** 2 + rng.normal(0, 2, 500)
+        return strain, stress
+
+    @pytest.mark.parametrize('window', [(None, None), (0.05, None), (None, 0.1), (0.02, 0.03), (1, 2)])
+    def test_matches_loop(self, curve, window):
+        """Test fringe and slopes equal the walked loop, including the warm up and strain window"""
+        strain, stress = curve
+        fringe, slopes = compute_fringe_slope(strain, stress, *window)
+        loop_fringe, loop_slopes = _walked_fringe_slope(strain, stress, *window)
+        assert np.array_equal(fringe, loop_fringe)
+        assert np.allclose(slopes, loop_slopes, rtol=1e-9)
+
+    def test_reverse(self, curve):
+        """Test reverse walks from the end without changing the inputs"""
+        strain, stress = curve
+        copy = stress.copy()
+        fringe, slopes = compute_fringe_slope(strain, stress, max_strain=0.15, direction='reverse')
+        loop_fringe, loop_slopes = _walked_fringe_slope(strain[::-1], stress[::-1], max_strain=0.15)
+        assert np.array_equal(fringe, loop_fringe)
+        assert np.allclose(slopes, loop_slopes, rtol=1e-9)
+        assert np.array_equal(stress, copy)
+
+    def test_offset(self, curve):
+        """Test precision for a large strain offset where raw sums cancel"""
+        strain, stress = curve
+        fringe, slopes = compute_fringe_slope(strain + 1e4, stress)
+        assert np.allclose(slopes, compute_fringe_slope(strain, stress)[1], rtol=1e-6)
+
+
+class TestDerivative:
+    """Pytest tests for three point derivatives"""
+
+    def test_uniform(self):
+        """Test uniform spacing gives the central differences"""
+        x = np.linspace(0, 2, 41)
+        y = np.sin(3 * x)
+        xn, dy1, dy2 = compute_derivative(x, y)
+        h = x[1] - x[0]
+        assert np.array_equal(xn, x[1:-1])
+        assert np.allclose(dy1, (y[2:] - y[:-2]) / (2 * h))
+        assert np.allclose(dy2, (y[2:] - 2 * y[1:-1] + y[:-2]) / h ** 2)
+
+    def test_non_uniform(self):
+        """Test quadratics are exact on a random grid"""
+        x = np.sort(np.random.default_rng(3).uniform(0, 1, 50))
+        xn, dy1, dy2 = compute_derivative(x, 2 * x ** 2 - x + 1)
+        assert np.allclose(dy1, 4 * xn - 1)
+        assert np.allclose(dy2, 4)
+
+    def test_batched(self):
+        """Test rows of a 2D array match one curve at a time, with shared and per row x"""
+        rng = np.random.default_rng(4)
+        x = np.cumsum(rng.uniform(0.5, 1.5, (3, 20)), axis=1)
+        y = rng.normal(size=(3, 20))
+        for xs in [x[0], x]:
+            xn, dy1, dy2 = compute_derivative(xs, y)
+            for row in range(3):
+                single = compute_derivative(xs if xs.ndim == 1 else xs[row], y[row])
+                assert np.allclose(dy1[row], single[1]) and np.allclose(dy2[row], single[2])
+
+    def test_errors(self):
+        """Test a length mismatch raises and zero span gives zero derivatives"""
+        with pytest.raises(Exception):
+            compute_derivative(np.arange(5), np.arange(4))
+        with pytest.warns(UserWarning):
+            xn, dy1, dy2 = compute_derivative([0, 1, 1, 1, 2], [0, 1, 2, 3, 4])
+        assert dy1[1] == 0 and dy2[1] == 0
+        assert dy1[0] == 2 and dy1[2] == 2
+
+    def test_duplicated_x(self):
+        """Test one repeated x uses the central difference over both neighbours, without warning"""
+        x, y = np.array([0, 1, 1, 2, 3.0]), np.array([0, 1, 2, 4, 9.0])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            xn, dy1, dy2 = compute_derivative(x, y)
+        assert np.allclose(dy1, [2, 3, 3.5])
+        span = x[2:] - x[:-2]
+        assert np.allclose(dy2[:2], 4 * (y[2:4] - 2 * y[1:3] + y[:2]) / span[:2] ** 2)
+        assert np.allclose(dy2[2], y[4] - 2 * y[3] + y[2])
+
+
+def _looped_peaks(ydata, prominence):
+    """Peaks and first minimum valleys of one curve, as the original loop"""
+    peaks, properties = find_peaks(ydata, prominence=prominence)
+    valleys = []
+    for lo, hi in zip(peaks[:-1], peaks[1:]):
+        between = ydata[lo:hi]
+        valleys.append(lo + np.min(np.where(between == between.min())[0]))
+    return peaks, np.array(valleys, dtype=int)
+
+
+class TestPeaks:
+    """Pytest tests for batched peak and valley detection"""
+
+    @staticmethod
+    def _split(values, value_starts, n_curves):
+        bounds = np.append(value_starts, len(values))
+        return [values[bounds[ii]:bounds[ii + 1]] for ii in range(n_curves)]
+
+    def test_rows(self):
+        """Test rows of a 2D array match single curves with scaled prominence"""
+        rng = np.random.default_rng(7)
+        x = np.linspace(0, 1, 400)
+        curves = np.sin(x * rng.uniform(10, 60, (20, 1))) + rng.normal(0, 0.3, (20, 400))
+        curves[3] = 1.0  # flat curve, no peaks
+        peaks, peak_starts, valleys, valley_starts = find_peaks_and_valleys_many(curves, scale=1 / 3)
+        for curve, curve_peaks, curve_valleys in zip(curves, self._split(peaks, peak_starts, 20),
+                                                     self._split(valleys, valley_starts, 20)):
+            expected_peaks, expected_valleys = _looped_peaks(curve, np.std(curve) / 3)
+            assert np.array_equal(curve_peaks, expected_peaks)
+            assert np.array_equal(curve_valleys, expected_valleys)
+
+    @pytest.mark.parametrize('prominence', [None, 0.5])
+    def test_ragged(self, prominence):
+        """Test ragged curves, including empty and short ones, match single curves"""
+        rng = np.random.default_rng(8)
+        lengths = np.array([50, 0, 2, 120, 7, 300])
+        starts = np.append(0, np.cumsum(lengths)[:-1])
+        ydata = rng.normal(size=lengths.sum())
+        peaks, peak_starts, valleys, valley_starts = find_peaks_and_valleys_many(ydata, starts, prominence=prominence)
+        for ii, (start, length) in enumerate(zip(starts, lengths)):
+            expected_peaks, expected_valleys = _looped_peaks(ydata[start:start + length], prominence)
+            assert np.array_equal(self._split(peaks, peak_starts, 6)[ii], expected_peaks)
+            assert np.array_equal(self._split(valleys, valley_starts, 6)[ii], expected_valleys)
+
+    def test_single(self):
+        """Test the single curve wrapper returns x and y values"""
+        x = np.linspace(0, 4 * np.pi, 400)
+        xpeaks, ypeaks, xvalleys, yvalleys = find_peaks_and_valleys(x, np.sin(x), prominence=0.5)
+        assert np.allclose(xpeaks, [np.pi / 2, 5 * np.pi / 2], atol=0.02)
+        assert np.allclose(xvalleys, [3 * np.pi / 2], atol=0.02) and np.allclose(yvalleys, [-1], atol=1e-3)
+        assert len(find_peaks_and_valleys(x[:100], np.sin(x[:100]))[2]) == 0
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import pytest
-from mooonpy.tools.file_utils import Path, smart_open
+from mooonpy.tools.file_utils import Path, smart_open, clear_listing_cache
 
 import os
 import tempfile
@@ -142,6 +142,55 @@ class TestPath:
 
         assert result is None
 
+    def test_recursive_matching(self, temp_dir):
+        """Test ** patterns and hidden files match like glob with recursive=True"""
+        import glob
+        temp_dir_path, test_files = temp_dir
+        for sub in ["a/b", "a/.hidden", ".cache"]:
+            os.makedirs(os.path.join(temp_dir_path, sub))
+            with open(os.path.join(temp_dir_path, sub, "deep.txt"), 'w') as f:
+                f.write("deep")
+
+        for pattern in ["**/*.txt", "**", "*/**/*.txt", "**/b/*", ".*", "*/*/deep.txt", "a/b/deep.txt"]:
+            pattern = os.path.join(temp_dir_path, pattern)
+            expected = sorted({os.path.normpath(file) for file in glob.glob(pattern, recursive=True)})
+            assert Path(pattern).matches() == expected
+
+        cwd = os.getcwd()
+        os.chdir(temp_dir_path)
+        try:
+            for pattern in ["**", "**/*.txt"]:  # relative, the current directory is not a match
+                expected = sorted({os.path.normpath(file) for file in glob.glob(pattern, recursive=True)})
+                assert Path(pattern).matches() == expected and '' not in expected
+        finally:
+            os.chdir(cwd)
+
+    def test_listing_cache(self, temp_dir):
+        """Test listings are reused within the ttl until cleared, and rescanned without it"""
+        temp_dir_path, test_files = temp_dir
+        pattern = Path(os.path.join(temp_dir_path, "*.txt"))
+        assert len(pattern.matches(ttl=60)) == 2
+
+        with open(os.path.join(temp_dir_path, "file3.txt"), 'w') as f:
+            f.write("new")
+        assert len(pattern.matches(ttl=60)) == 2
+        assert len(pattern.matches()) == 3
+        assert len(pattern.matches(ttl=60)) == 2  # scans without a ttl are not cached
+        clear_listing_cache()
+        assert len(pattern.matches(ttl=60)) == 3
+        clear_listing_cache()
+
+    def test_recent_ties(self, temp_dir):
+        """Test equal modification times keep every file and pick the first sorted match"""
+        temp_dir_path, test_files = temp_dir
+        for file in test_files:
+            os.utime(file, (1e9, 1e9))
+        os.utime(test_files[2], (2e9, 2e9))
+
+        pattern = Path(os.path.join(temp_dir_path, "*"))
+        assert pattern.recent() == test_files[2]
+        assert pattern.recent(oldest=True) == sorted(test_files[:2] + test_files[3:])[0]
+
 
 class TestSmartOpen:
     """Pytest tests for smart_open function"""
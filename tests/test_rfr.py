@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from mooonpy.programs.regression_fringe_response import RFR_tensile_analysis, RFR_tensile_analysis_many
+
+
+def _curve(seed=0, modulus=3000.0):
+    """Linear region up to 5% strain, then softening, with noise"""
+    rng = np.random.default_rng(seed)
+    strain = np.linspace(0, 0.2, 2000)
+    yield_stress = modulus * 0.05
+    stress = np.where(strain < 0.05, modulus * strain,
+                      yield_stress + 500 * (strain - 0.05) * np.exp(-(strain - 0.05) * 10))
+    return strain, stress + rng.normal(0, 3, len(strain))
+
+
+class TestMany:
+    """Pytest tests for batched RFR tensile analysis"""
+
+    def test_matches_single(self):
+        """Test rows match single curve runs in and out of process, without changing the inputs"""
+        curves = {f'run_{n}': _curve(n, modulus=3000 + 100 * n) for n in range(3)}
+        raw = {label: stress.copy() for label, (strain, stress) in curves.items()}
+        table = RFR_tensile_analysis_many(curves, workers=1)
+        parallel = RFR_tensile_analysis_many(list(curves.values()), workers=2)
+        assert table.rowlabels() == ['run_0', 'run_1', 'run_2']
+        for ii, (label, (strain, stress)) in enumerate(curves.items()):
+            assert np.array_equal(stress, raw[label])
+            single = RFR_tensile_analysis(strain, stress.copy(), plots=None)
+            assert table['youngs_modulus'][ii] == pytest.approx(single.youngs_modulus)
+            assert table['yield_index'][ii] == single.yield_index
+            assert table['stress_qm'][ii] == single.stress_qm
+            assert table['midy'][ii] == pytest.approx(single.midy)
+        assert np.array_equal(parallel['youngs_modulus'], table['youngs_modulus'])
+        assert np.all(np.isnan(table['trans_1_poi']))
+        assert table['error'] == ['', '', '']
+
+    def test_failure(self):
+        """Test a bad curve gives an error row instead of stopping the batch"""
+        strain, stress = _curve()
+        table = RFR_tensile_analysis_many([(strain, stress), (strain[:3], stress[:3])], workers=1, wn='off')
+        assert not np.isnan(table['youngs_modulus'][0])
+        assert np.isnan(table['youngs_modulus'][1]) and table['hi_index'][1] == -1
+        assert table['error'][0] == '' and table['error'][1] != ''
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+import scipy as sp
+
+from mooonpy.tools.signals import _butter, _butter_sos, butter_lowpass, data_extension, determine_mirroring_locations, \
+    compute_PSD, compute_PSD_welch, StreamingPSD, StreamingLowpass
+
+
+@pytest.fixture
+def curve():
+    """Noisy bilinear stress-strain curve"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 0.2, 1001)
+    y = np.where(x < 0.05, 3000 * x, 150 + 200 * (x - 0.05)) + rng.normal(0, 3, len(x))
+    return x, y
+
+
+class TestButter:
+    """Pytest tests for the cached filter design and mirroring search"""
+
+    def test_cache(self, curve):
+        """Test designs are reused and rows filter like single curves"""
+        x, y = curve
+        assert _butter_sos(2, 0.01) is _butter_sos(2, 0.01)
+        stack = np.stack([y, y[::-1]])
+        assert np.allclose(_butter(stack, 0.01, 2)[1], _butter(y[::-1], 0.01, 2))
+        reference = sp.signal.sosfiltfilt(sp.signal.butter(2, 0.01, output='sos'), y, padtype=None)
+        assert np.allclose(_butter(y, 0.01, 2), reference)
+
+    def test_mirroring(self, curve):
+        """Test the batched search picks the mirrors with the lowest residuals, one candidate at a time"""
+        x, y = curve
+        half = len(y) // 2
+        lo_residuals, hi_residuals = [], []
+        for quad in [1, 2, 3, 4]:
+            x_quad, y_quad, lo_ind, hi_ind = data_extension(x, y, quad, 1)
+            lo_residuals.append(np.sum((y - _butter(y_quad, 0.01, 2)[lo_ind:hi_ind])[:half] ** 2))
+            x_quad, y_quad, lo_ind, hi_ind = data_extension(x, y, 1, quad)
+            hi_residuals.append(np.mean((y - _butter(y_quad, 0.01, 2)[lo_ind:hi_ind])[half:] ** 2))
+        lo, hi = determine_mirroring_locations(x, y, 0.01, 2)
+        assert (lo, hi) == (np.argmin(lo_residuals) + 1, np.argmin(hi_residuals) + 1)
+
+        y_filt, wn, quadrant = butter_lowpass(x, y, wn=0.01)
+        assert quadrant == f'{lo},{hi}' and len(y_filt) == len(y)
+
+    def test_channels(self, curve):
+        """Test each row of a 2D array is filtered like a single signal"""
+        x, y = curve
+        rng = np.random.default_rng(1)
+        channels = np.stack([y, -0.35 * x + rng.normal(0, 1e-3, len(x)), y[::-1]])
+        for wn, quadrant in [('PSD', 'msr'), (0.02, 'msr'), ('PSD', '3,2')]:
+            y_filts, wns, qms = butter_lowpass(x, channels, wn=wn, quadrant=quadrant)
+            assert y_filts.shape == channels.shape and len(wns) == len(qms) == 3
+            for row, channel in enumerate(channels):
+                y_filt, single_wn, qm = butter_lowpass(x, channel, wn=wn, quadrant=quadrant)
+                assert np.allclose(y_filts[row], y_filt)
+                assert (wns[row], qms[row]) == (single_wn, qm)
+
+
+class TestPSD:
+    """Pytest tests for segment averaged and streaming PSD"""
+
+    @pytest.fixture
+    def signal(self):
+        """Sine at 0.1 of the Nyquist frequency with white noise of variance 1"""
+        rng = np.random.default_rng(5)
+        n = np.arange(100003)  # prime length
+        return np.sin(np.pi * 0.1 * n) * 3 + rng.normal(0, 1, len(n))
+
+    def test_welch(self, signal):
+        """Test the peak location and the white noise level"""
+        wns, psd = compute_PSD_welch(None, signal, segment=1000)
+        assert wns[0] == 0 and wns[-1] == pytest.approx(1, abs=0.01)
+        assert wns[np.argmax(psd)] == pytest.approx(0.1, abs=2 / 1000)
+        assert np.median(psd) == pytest.approx(1, rel=0.1)
+
+    def test_streaming(self, signal):
+        """Test uneven chunks and stacked rows give the single update result"""
+        wns, psd = compute_PSD_welch(None, signal, segment=999, overlap=0.3)
+        stream = StreamingPSD(segment=999, overlap=0.3)
+        for start in range(0, len(signal), 7777):
+            stream.update(signal[start:start + 7777])
+        assert np.allclose(stream.result()[1], psd)
+        assert stream.n_fft == 1000
+
+        stack = StreamingPSD(segment=999, overlap=0.3).update(np.stack([signal, 2 * signal])).result()[1]
+        assert np.allclose(stack[0], psd) and np.allclose(stack[1], 4 * psd)
+        with pytest.raises(Exception):
+            StreamingPSD(segment=10).update(np.ones(5)).result()
+
+    def test_pad(self, signal):
+        """Test padding keeps the frequency scale"""
+        x = np.arange(len(signal)) * 0.5
+        wns, psd = compute_PSD(x, signal, pad=True)
+        assert len(wns) == len(psd) and len(wns) > len(signal) // 2 + 1
+        assert wns[np.argmax(psd)] == pytest.approx(0.1, abs=1e-4)
+
+    def test_welch_cutoff(self, curve):
+        """Test butter_lowpass accepts the welch cutoff for one or many signals"""
+        x, y = curve
+        y_filt, wn, qm = butter_lowpass(x, y, wn='welch')
+        assert 0 < wn < 1
+        y_filts, wns, qms = butter_lowpass(x, np.stack([y, y]), wn='welch')
+        assert np.allclose(y_filts[1], y_filt) and wns[1] == wn
+
+
+class TestStreamingLowpass:
+    """Pytest tests for the causal streaming filter"""
+
+    def test_chunks(self, curve):
+        """Test chunks give the one update result, for single and stacked signals"""
+        x, y = curve
+        whole = StreamingLowpass(0.05).update(y)
+        stream = StreamingLowpass(0.05)
+        chunks = [stream.update(y[start:start + 97]) for start in range(0, len(y), 97)]
+        assert np.allclose(np.concatenate(chunks), whole)
+        assert stream.update([]).shape == (0,)
+
+        stack = StreamingLowpass(0.05)
+        rows = np.concatenate([stack.update(np.stack([y, -y])[:, start:start + 50]) for start in range(0, len(y), 50)], axis=1)
+        assert np.allclose(rows[0], whole) and np.allclose(rows[1], -whole)
+
+    def test_steady_state(self):
+        """Test a constant signal passes unchanged and noise is smoothed"""
+        smooth = StreamingLowpass(0.05, order=4)
+        assert np.allclose(smooth.update(np.full(100, 300.0)), 300)
+        smooth.reset()
+        noise = np.random.default_rng(6).normal(0, 1, 5000)
+        assert np.std(smooth.update(noise)[100:]) < 0.4
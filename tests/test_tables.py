@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import tempfile
+import shutil
+
+from mooonpy import Path
+from mooonpy.tools.file_utils import smart_open
+from mooonpy.tools.tables import ColTable, ArrayTable, ListListTable
+from mooonpy.tools._files_io.text_writer import percent_format
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory for tests"""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def table():
+    """Small table with int, float and string columns"""
+    table = ColTable(title='test', rows=['a', 'b', 'c'], cornerlabel='row')
+    table['Step'] = np.array([0, 10, 20])
+    table['c_rxn[1]'] = np.array([1.5, np.nan, -2.25])
+    table['name'] = np.array(['x', 'y', 'z'])
+    table.x_column = 'Step'
+    return table
+
+
+class TestBinary:
+    """Pytest tests for binary save and load"""
+
+    @pytest.mark.parametrize('name', ['table.npz', 'table', 'table.parquet', 'table.feather'])
+    def test_round_trip(self, temp_dir, table, name):
+        """Test columns, dtypes and attributes survive each format"""
+        if name.endswith(('.parquet', '.feather')):
+            pytest.importorskip('pyarrow')
+        table.save(temp_dir / name)
+        loaded = ColTable.load(temp_dir / name)
+        assert loaded.headers() == table.headers()
+        for key in table.headers():
+            assert np.array_equal(loaded[key], table[key], equal_nan=key != 'name')
+            assert loaded[key].dtype.kind == table[key].dtype.kind
+        assert (loaded.title, loaded.rows, loaded.cornerlabel, loaded.x_column) == ('test', ['a', 'b', 'c'], 'row', 'Step')
+
+    def test_mmap(self, temp_dir, table):
+        """Test a column directory loads as read-only memory maps"""
+        table.save(temp_dir / 'table')
+        loaded = ColTable.load(temp_dir / 'table', mmap=True)
+        assert isinstance(loaded['Step'], np.memmap)
+        assert not loaded['Step'].flags.writeable
+
+    @pytest.mark.parametrize('name', ['table.npz', 'table', 'table.parquet', 'table.feather'])
+    def test_lazy(self, temp_dir, table, name):
+        """Test lazy loads read each column on first access"""
+        if name.endswith(('.parquet', '.feather')):
+            pytest.importorskip('pyarrow')
+        table.save(temp_dir / name)
+        loaded = ColTable.load(temp_dir / name, lazy=True)
+        assert loaded.shape() == table.shape()
+        assert not loaded.grid.loaded('Step')
+        assert np.array_equal(loaded['Step'], table['Step'])
+        assert not loaded.grid.loaded('name')
+        assert loaded.rows == ['a', 'b', 'c']
+
+    def test_bad_extension(self, temp_dir, table):
+        """Test unknown extensions raise"""
+        with pytest.raises(Exception):
+            table.save(temp_dir / 'table.csv')
+
+    @pytest.mark.parametrize('name', ['table.npz', 'table'])
+    @pytest.mark.parametrize('label', [1, ('Step', 'ave')])
+    def test_non_str_labels(self, temp_dir, table, name, label):
+        """Test labels that would not load back as the same key raise"""
+        table[label] = np.zeros(3)
+        with pytest.raises(Exception, match='only str labels'):
+            table.save(temp_dir / name)
+
+
+class TestText:
+    """Pytest tests for the bulk text writer"""
+
+    @pytest.mark.parametrize('cell, float_cell', [('{:<8}', '{:< 8.3f}'), ('{:>10}', '{:+.4e}'),
+                                                  ('{:^8}', '{:^9.3f}'), ('[{}]', '{:08.3f}')])
+    def test_matches_yield_line(self, temp_dir, table, cell, float_cell):
+        """Test csv lines match yield_line for translated and per cell formats"""
+        table['mixed'] = [1, 2.5, None]
+        tables = [table, ArrayTable(np.arange(6.0).reshape(3, 2), collabels=['x', 'y']),
+                  ListListTable([[1, 2.0, 'a'], [3, 4.5, 'b']], collabels=['p', 'q', 'r'], rows=['r1', 'r2'])]
+        for other in tables:
+            other.cell, other.float_cell = cell, float_cell
+            other.csv(temp_dir / 'table.csv')
+            with open(temp_dir / 'table.csv') as f:
+                assert f.read().splitlines() == list(other.yield_line())
+
+    def test_compressed(self, temp_dir, table):
+        """Test .gz files are written through smart_open"""
+        table.csv(temp_dir / 'table.csv.gz')
+        with smart_open(temp_dir / 'table.csv.gz') as f:
+            assert f.read().splitlines() == list(table.yield_line())
+
+    def test_percent_format(self):
+        """Test format translation and the cases without an exact equivalent"""
+        assert percent_format('{:< 8.3f}', 'f') == '%- 8.3f'
+        assert percent_format('{:<8}', 'U') == '%-8s'
+        assert percent_format('{:8}', 'i') == '%8d'
+        assert percent_format('{:^8}', 'f') is None
+        assert percent_format('{:8.3}', 'f') is None
+
+
+class TestReadCsv:
+    """Pytest tests for the csv readers"""
+
+    def test_round_trip(self, temp_dir, table):
+        """Test csv output reads back with the same dtypes"""
+        table.csv(temp_dir / 'table.csv.gz')
+        loaded = ColTable.read_csv(temp_dir / 'table.csv.gz', rowlabels=True)
+        assert loaded.headers() == table.headers()
+        assert loaded.rows == ['a', 'b', 'c'] and loaded.cornerlabel == 'row'
+        assert loaded['Step'].dtype.kind == 'i'
+        assert np.allclose(loaded['c_rxn[1]'], table['c_rxn[1]'], equal_nan=True)
+        assert loaded['name'] == ['x', 'y', 'z']
+
+    def test_usecols_nrows(self, temp_dir):
+        """Test column selection, row limit, quoting and empty cells"""
+        with open(temp_dir / 'table.csv', 'w') as f:
+            f.write('a,b,c\n1,"x, y",2.5\n\n3,z,\n5,w,1\n')
+        table = ColTable.read_csv(temp_dir / 'table.csv', usecols=['c', 0], nrows=2)
+        assert table.headers() == ['a', 'c']
+        assert np.array_equal(table['a'], [1, 3])
+        assert np.array_equal(table['c'], [2.5, np.nan], equal_nan=True)
+        assert ColTable.read_csv(temp_dir / 'table.csv')['b'] == ['x, y', 'z', 'w']
+        rows = ListListTable.read_csv(temp_dir / 'table.csv', usecols=['b', 'c'])
+        assert rows.headers() == ['b', 'c']
+        assert rows.grid == [['x, y', 2.5], ['z', ''], ['w', 1]]
+
+
+class TestLookups:
+    """Pytest tests for cached row label indexes and shapes"""
+
+    def test_row_labels(self, table):
+        """Test label and int lookups, and rebuilding after rows change"""
+        assert table.row('b')[0] == 10
+        assert table.rowcol('c', 'Step') == 20
+        assert table.rowcol(1, 0) == 10
+        table.rows = ['c', 'b', 'a']
+        assert table.row('a')[0] == 20
+        rows = ListListTable([[1, 2], [3, 4]], rows=['x', 'y'])
+        assert rows.row('y') == [3, 4] and rows.rowcol('x', 1) == 2
+
+    def test_row_labels_in_place(self, table):
+        """Test the label index follows same length edits of the rows list"""
+        assert table._row_position('a') == 0
+        table.rows[0] = 'z'
+        assert table._row_position('z') == 0
+        with pytest.raises(ValueError):
+            table._row_position('a')
+        table.rows.reverse()
+        assert table._row_position('z') == 2 and table.row('z')[0] == 20
+        assert table.rows == ['c', 'b', 'z']
+
+        table.rows = np.array(['p', 'q', 'r'])  # arrays become tracked lists
+        assert table.rows == ['p', 'q', 'r'] and type(table.rows[0]) is str
+        table.rows[1] = 's'
+        assert table._row_position('s') == 1 and table._row_position('r') == 2
+        table.rows = ('x', 'y', 'z')
+        assert table._row_position('z') == 2
+
+    def test_shape_cache(self, table):
+        """Test the cached shape follows column edits"""
+        assert table.shape() == (3, 3)
+        table['new'] = np.zeros(3)
+        assert table.shape() == (3, 4)
+        del table['new']
+        table.rows = None
+        table.grid['Step'] = np.arange(5)  # edited in place, first column length changes
+        assert table.shape() == (None, 3)
+        for key in table.headers():
+            table.grid[key] = np.arange(5)
+        table.invalidate()
+        assert table.shape() == (5, 3)
+        rows = ListListTable([[1, 2]])
+        rows.append([3, 4])
+        assert rows.shape() == (2, 2)
+
+
+class TestGroupBy:
+    """Pytest tests for grouped aggregation"""
+
+    @pytest.fixture
+    def steps(self):
+        table = ColTable()
+        table['Step'] = np.arange(10) * 100
+        table['Temp'] = np.arange(10.0)
+        table['group'] = np.array([1, 0] * 5)
+        return table
+
+    def test_values(self, steps):
+        """Test grouping by column values with several functions"""
+        out = steps.groupby('group').agg({'Temp': ['avg', 'count', np.median], 'Step': 'max'})
+        assert out.headers() == ['group', 'Temp avg', 'Temp count', 'Temp median', 'Step']
+        assert np.array_equal(out['group'], [0, 1])
+        assert np.array_equal(out['Temp avg'], [5, 4])
+        assert np.array_equal(out['Temp count'], [5, 5])
+        assert np.array_equal(out['Step'], [900, 800])
+
+    def test_bins(self, steps):
+        """Test Step windows, bin edges and multiple keys"""
+        out = steps.groupby('Step', width=300).agg('avg')
+        assert np.array_equal(out['Step'], [0, 300, 600, 900]) and out['Step'].dtype.kind == 'i'
+        assert np.array_equal(out['Temp'], [1, 4, 7, 9])
+        out = steps.groupby('Temp', bins=[0, 2, 5]).agg({'Temp': 'sum'})  # values past the last edge are left out
+        assert np.array_equal(out['Temp'], [1, 14])
+        out = steps.groupby(['group', 'Step'], width={'Step': 500}).agg({'Temp': 'sum'})
+        assert np.array_equal(out['group'], [0, 0, 1, 1])
+        assert np.array_equal(out['Temp'], [4, 21, 6, 14])
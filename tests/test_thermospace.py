@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import os
+import tempfile
+import shutil
+
+from mooonpy import Thermospace, Path
+
+EXAMPLE_LOG = Path(__file__).dir() / '../examples/EPON_862/lmp_REACTER/outputs/small_epon.log.lammps'
+
+LOG_TEXT = """LAMMPS (2 Aug 2023)
+units real
+variable        T equal 300  # temperature
+run             20
+Per MPI rank memory allocation (min/avg/max) = 44.81 | 44.99 | 45.50 Mbytes
+   Step          Temp          Press
+         0   300            1.5
+        10   301.25        -2.5
+        20   302           -3.25
+Loop time of 55.2372 on 8 procs for 20 steps with 1170 atoms
+
+thermo_style custom step temp press lx
+variable        T equal 350
+run             20 upto
+Per MPI rank memory allocation (min/avg/max) = 44.81 | 44.99 | 45.50 Mbytes
+   Step          Temp          Press          Lx
+        20   302           -3.25           40.5
+-----
+XRD pause output 1 2 3
+-----
+WARNING: Bond/angle/dihedral extent > half of periodic box length
+        30   303.5          4              40.25
+        40   304            5.5            40
+Loop time of 10.0 on 8 procs for 20 steps with 1170 atoms
+
+Performance: 39.104 ns/day, 0.614 hours/ns, 905.186 timesteps/s
+99.8% CPU use with 8 MPI tasks x 2 OpenMP threads
+
+MPI task timing breakdown:
+Section |  min time  |  avg time  |  max time  |%varavg| %total
+---------------------------------------------------------------
+Pair    | 1.0581     | 5.0952     | 9.9032     | 114.7 |  9.22
+Kspace  | 12.11      | 27.307     | 42.524     | 165.1 | 49.43
+Other   |            | 0.1832     |            |       |  0.33
+
+Nlocal:        146.250 ave         252 max          54 min
+Histogram: 2 0 2 0 0 1 0 1 1 1
+
+Total # of neighbors = 39549
+Ave neighs/atom = 33.802564
+Neighbor list builds = 1205
+Dangerous builds = 0
+Total wall time: 0:01:05
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory for tests"""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def log_file(temp_dir):
+    """Small log with a thermo_style change, XRD pause and warning line"""
+    file = temp_dir / 'log.lammps'
+    with open(file, 'w') as f:
+        f.write(LOG_TEXT)
+    return file
+
+
+class TestRead:
+    """Pytest tests for the block based log reader"""
+
+    def test_matches_basic_read(self):
+        """Test read gives the same columns as basic_read on an example log"""
+        basic = Thermospace.basic_read(EXAMPLE_LOG)
+        fast = Thermospace.read(EXAMPLE_LOG)
+        assert fast.headers() == basic.headers()
+        for key in basic.headers():
+            assert np.array_equal(fast[key], basic[key])
+            assert fast[key].dtype == basic[key].dtype
+        assert fast.sections == {1: range(0, 26)}
+
+    def test_style_change(self, log_file):
+        """Test padding, int conversion, pauses and warnings"""
+        log = Thermospace.read(log_file)
+        assert log.headers() == ['Step', 'Temp', 'Press', 'Lx']
+        assert log.sections == {1: range(0, 3), 2: range(3, 6)}
+        assert log['Step'].dtype.kind == 'i'
+        assert log['Temp'].dtype.kind == 'f'
+        assert np.array_equal(log['Step'], [0, 10, 20, 20, 30, 40])
+        assert np.all(np.isnan(log['Lx'][:3]))
+        assert np.array_equal(log['Lx'][3:], [40.5, 40.25, 40])
+
+    def test_metadata(self, log_file):
+        """Test run metadata is stored on each section"""
+        log = Thermospace.read(log_file)
+        first, second = log.sections[1], log.sections[2]
+        assert log.info == {'version': '2 Aug 2023', 'wall time': '0:01:05'}
+        assert first.command == 'run 20' and second.command == 'run 20 upto'
+        assert first.variables == {'T': 'equal 300'} and second.variables == {'T': 'equal 350'}
+        assert first.memory == (44.81, 44.99, 45.5)
+        assert (second.loop_time, second.procs, second.steps, second.atoms) == (10.0, 8, 20, 1170)
+        assert second.performance['ns/day'] == 39.104
+        assert (second.cpu_use, second.mpi_tasks, second.omp_threads) == (99.8, 8, 2)
+        assert second.timing.rowlabels() == ['Pair', 'Kspace', 'Other']
+        assert np.isnan(second.timing['min time'][2])
+        assert second.neighbors['Nlocal'] == {'ave': 146.25, 'max': 252, 'min': 54}
+        assert second.stats['Neighbor list builds'] == 1205
+        assert first.performance == {} and first.timing is None
+
+        performance = log.performance()
+        assert performance.rowlabels() == [1, 2]
+        assert performance['%Kspace'][1] == 49.43
+        assert np.isnan(performance['%Kspace'][0])
+
+    def test_truncated(self, temp_dir):
+        """Test a log cut mid-line keeps the complete rows"""
+        file = temp_dir / 'cut.lammps'
+        with open(file, 'w') as f:
+            f.write(LOG_TEXT[:LOG_TEXT.index('302           -3.25') + 3])  # cut inside the last row of section 1
+        log = Thermospace.read(file, silence_error_line=True)
+        assert np.array_equal(log['Step'], [0, 10])
+        assert log.sections == {1: range(0, 2)}
+
+    def test_error_line(self, temp_dir):
+        """Test reading stops at an ERROR line"""
+        file = temp_dir / 'error.lammps'
+        with open(file, 'w') as f:
+            f.write(LOG_TEXT.replace('thermo_style', 'ERROR: Lost atoms\nthermo_style'))
+        log = Thermospace.read(file, silence_error_line=True)
+        assert len(log) == 3
+        assert list(log.sections) == [1]
+
+
+class TestColumns:
+    """Pytest tests for column filtering and lazy column stores"""
+
+    def test_filter(self, log_file):
+        """Test only the wanted keywords are kept, metadata is unchanged"""
+        log = Thermospace.read(log_file, columns=['Step', 'Lx'])
+        full = Thermospace.read(log_file)
+        assert log.headers() == ['Step', 'Lx']
+        assert log.sections == full.sections
+        assert log.sections[2].keywords == ['Step', 'Temp', 'Press', 'Lx']
+        assert np.array_equal(log['Lx'], full['Lx'], equal_nan=True)
+        assert log['Step'].dtype.kind == 'i'
+
+    def test_filter_truncated(self, temp_dir):
+        """Test a cut last line is still dropped when its columns are not converted"""
+        file = temp_dir / 'cut.lammps'
+        with open(file, 'w') as f:
+            f.write(LOG_TEXT[:LOG_TEXT.index('302           -3.25') + 3])
+        log = Thermospace.read(file, silence_error_line=True, columns=['Step'])
+        assert np.array_equal(log['Step'], [0, 10])
+
+    def test_lazy(self, log_file, temp_dir):
+        """Test the store is written, loaded per column and reused"""
+        store = temp_dir / 'store'
+        log = Thermospace.read(log_file, columns=['Step', 'Temp', 'Lx'], lazy=store)
+        assert log.shape() == (6, 3)
+        assert not log.grid.loaded('Temp')
+        assert np.array_equal(log['Temp'], [300, 301.25, 302, 302, 303.5, 304])
+        assert isinstance(log['Temp'], np.memmap)
+        assert log.grid.loaded('Temp') and not log.grid.loaded('Lx')
+        assert log.sections[2].command == 'run 20 upto' and log.info['version'] == '2 Aug 2023'
+
+        mtime = os.path.getmtime(store / 'meta.json')
+        again = Thermospace.read(log_file, columns=['Step', 'Temp', 'Lx'], lazy=store)
+        assert os.path.getmtime(store / 'meta.json') == mtime
+        assert np.array_equal(again['Lx'], log['Lx'], equal_nan=True)
+        assert Thermospace.read(log_file, lazy=store).headers() == ['Step', 'Temp', 'Press', 'Lx']
+
+    def test_lazy_default_store(self, log_file, temp_dir):
+        """Test lazy=True stores next to the log"""
+        log = Thermospace.read(log_file, lazy=True)
+        assert os.path.isdir(temp_dir / 'log_lammps_columns')
+        assert np.array_equal(log['Step'], [0, 10, 20, 20, 30, 40])
+
+
+class TestSave:
+    """Pytest tests for binary Thermospace files"""
+
+    def test_round_trip(self, log_file, temp_dir):
+        """Test sections, metadata and title are kept"""
+        log = Thermospace.read(log_file)
+        log.save(temp_dir / 'log.npz')
+        loaded = Thermospace.load(temp_dir / 'log.npz')
+        assert loaded.title == log_file and isinstance(loaded.title, Path)
+        assert loaded.sections == log.sections
+        assert loaded.sections[2].breakdown['Pair'] == log.sections[2].breakdown['Pair']
+        assert loaded.sections[1].memory == (44.81, 44.99, 45.5)
+        assert loaded.info == log.info
+        for key in log.headers():
+            assert np.array_equal(loaded[key], log[key], equal_nan=True)
+
+
+class TestSect:
+    """Pytest tests for section selection"""
+
+    @pytest.fixture
+    def log(self, log_file):
+        return Thermospace.read(log_file)
+
+    def test_view(self, log):
+        """Test a single section is a view of the columns"""
+        table = log.sect(2)
+        assert np.array_equal(table['Step'], [20, 30, 40])
+        assert np.shares_memory(table['Step'], log['Step'])
+        assert np.shares_memory(log.sect('1-2')['Temp'], log['Temp'])  # neighbors merge into one block
+
+    def test_selectors(self, log):
+        """Test ints, negative ints, strings, ranges, lists and slices give the same rows"""
+        for selector in [-1, '2', '-1', slice(1, None), '1:', [2], range(2, 3)]:
+            assert np.array_equal(log.sect(selector)['Step'], [20, 30, 40])
+        for selector in ['1-2', '1,2', slice(None), range(1, 3), ':']:
+            assert np.array_equal(log.sect(selector)['Step'], log['Step'])
+        with pytest.raises(Exception):
+            log.sect(3)
+
+    def test_lazy_concat(self, log):
+        """Test out of order selections concatenate on first access"""
+        table = log.sect([2, 1])
+        assert table.shape() == (6, 4)
+        assert not table.grid.loaded('Step')
+        assert np.array_equal(table['Step'], [20, 30, 40, 0, 10, 20])
+        assert table.grid.loaded('Step') and not table.grid.loaded('Temp')
+        assert dict(table.grid)['Temp'][0] == 302
+
+
+class TestGroupBy:
+    """Pytest tests for grouping by section"""
+
+    def test_sections(self, log_file):
+        """Test section IDs group rows without a section column"""
+        log = Thermospace.read(log_file)
+        out = log.groupby('section').agg({'Temp': 'avg', 'Step': ['first', 'last']})
+        assert np.array_equal(out['section'], [1, 2])
+        assert np.allclose(out['Temp'], [np.mean([300, 301.25, 302]), np.mean([302, 303.5, 304])])
+        assert np.array_equal(out['Step last'], [20, 40])
+
+
+class TestErrorAnalysis:
+    """Pytest tests for Thermospace error analysis"""
+
+    def test_columns(self):
+        """Test float columns are analysed and rows are labelled by column"""
+        log = Thermospace.read(EXAMPLE_LOG)
+        errors = log.error_analysis()
+        assert 'Step' not in errors.rows and 'Temp' in errors.rows
+        assert errors.rowcol('Temp', 'mean') == pytest.approx(np.mean(log['Temp']))
+        assert errors.rowcol('Temp', 'sem') >= np.std(log['Temp'], ddof=1) / np.sqrt(len(log)) - 1e-12
+
+    def test_sections(self, log_file):
+        """Test per section rows and nan padding is dropped"""
+        errors = Thermospace.read(log_file).error_analysis(['Temp', 'Lx'], by_section=True)
+        assert np.array_equal(errors['section'], [1, 1, 2, 2])
+        assert np.array_equal(errors['n'], [3, 0, 3, 3])
+        assert np.isnan(errors['mean'][1])
+        assert errors['mean'][3] == pytest.approx(np.mean([40.5, 40.25, 40]))
+
+
+class TestMerge:
+    """Pytest tests for stitching restarted logs"""
+
+    @pytest.fixture
+    def restarts(self, log_file, temp_dir):
+        """The second log restarts from step 10 and adds an extra column"""
+        file = temp_dir / 'restart.lammps'
+        with open(file, 'w') as f:
+            f.write(LOG_TEXT[LOG_TEXT.index('thermo_style'):].replace(
+                '        20   302           -3.25           40.5',
+                '        10   301           -3             40.75\n'
+                '        20   302.5         -3.5           40.5'))
+        return Thermospace.read(log_file), Thermospace.read(file)
+
+    def test_drop_repeats(self, log_file):
+        """Test the repeated step at the section boundary is removed from the chosen side"""
+        log = Thermospace.read(log_file)
+        last = log.drop_repeats('Step')
+        assert np.array_equal(last['Step'], [0, 10, 20, 30, 40])
+        assert last.sections == {1: range(0, 2), 2: range(2, 5)}
+        assert last.sections[2].command == 'run 20 upto'
+        first = log.drop_repeats('Step', keep='first')
+        assert first.sections == {1: range(0, 3), 2: range(3, 5)}
+        assert np.isnan(first['Lx'][2])
+
+    def test_merge(self, restarts):
+        """Test overlapping restarts are stitched in step order with padding"""
+        log, restart = restarts
+        merged = log.merge(restart)
+        assert np.array_equal(merged['Step'], [0, 10, 20, 30, 40])
+        assert np.array_equal(merged['Temp'], [300, 301, 302.5, 303.5, 304])
+        assert np.isnan(merged['Lx'][0]) and merged['Lx'][1] == 40.75
+        assert merged.sections == {1: range(0, 1), 2: range(1, 1), 3: range(1, 5)}
+        assert merged.info == log.info
+        assert np.array_equal(restart.merge([log])['Temp'], merged['Temp'])  # sorted by first step
+        first = log.merge(restart, keep='first', key='file')
+        assert np.array_equal(first['Temp'], [300, 301.25, 302, 303.5, 304])
+        assert np.array_equal(first['file'], [0, 0, 0, 0, 0])
+        assert np.array_equal(log.merge(restart, sort=False, key='file')['file'], [0, 1, 1, 1, 1])
+
+
+class TestFollow:
+    """Pytest tests for following a growing log"""
+
+    def test_refresh_matches_read(self, temp_dir):
+        """Test a log written in pieces gives the same table as a full read"""
+        file = temp_dir / 'live.lammps'
+        open(file, 'w').close()
+        follower = Thermospace.follow(file)
+        new_rows = 0
+        for start in range(0, len(LOG_TEXT), 37):  # cuts lines in the middle
+            with open(file, 'a') as f:
+                f.write(LOG_TEXT[start:start + 37])
+            new_rows += follower.refresh()
+
+        full = Thermospace.read(file)
+        assert new_rows == len(full) == 6
+        assert follower.thermo.sections == full.sections
+        for key in full.headers():
+            assert np.array_equal(follower.thermo[key], full[key], equal_nan=True)
+            assert follower.thermo[key].dtype == full[key].dtype
+
+    def test_follow_generator(self, log_file):
+        """Test the generator yields new rows then stops on timeout"""
+        follower = Thermospace.follow(log_file)
+        chunks = list(follower.follow(interval=0.01, timeout=0.05))
+        assert len(chunks) == 1
+        assert np.array_equal(chunks[0]['Step'], [0, 10, 20, 20, 30, 40])
+
+    def test_follow_finished(self, temp_dir):
+        """Test following stops at the end of a finished run without a timeout"""
+        file = temp_dir / 'finished.lammps'
+        with open(file, 'w') as f:
+            f.write(LOG_TEXT[:LOG_TEXT.index('Total wall time')])
+        follower = Thermospace.follow(file)
+        assert follower.refresh() == 6 and not follower.parser.done
+
+        with open(file, 'a') as f:
+            f.write(LOG_TEXT[LOG_TEXT.index('Total wall time'):])
+        assert list(follower.follow(interval=0.01)) == []
+        assert follower.parser.done and follower.parser.info['wall time'] == '0:01:05'
+
+
+class TestReadMany:
+    """Pytest tests for reading many logs"""
+
+    @pytest.fixture
+    def sweep(self, temp_dir):
+        """Three logs, one of them without the Lx column"""
+        for n in range(3):
+            os.makedirs(temp_dir / f'run_{n}')
+            with open(temp_dir / f'run_{n}' / 'log.lammps', 'w') as f:
+                if n == 1:
+                    f.write(LOG_TEXT[:LOG_TEXT.index('thermo_style')])
+                else:
+                    f.write(LOG_TEXT)
+        return temp_dir
+
+    def test_mapping(self, sweep):
+        """Test a wildcard gives one Thermospace per file"""
+        logs = Thermospace.read_many(sweep / 'run_*' / 'log.lammps', workers=2)
+        assert list(logs.keys()) == sorted(logs.keys())
+        assert [len(log) for log in logs.values()] == [6, 3, 6]
+        assert logs[sweep / 'run_1' / 'log.lammps'].headers() == ['Step', 'Temp', 'Press']
+
+    def test_concat(self, sweep):
+        """Test the concatenated table is keyed by file and padded"""
+        table = Thermospace.read_many(sweep / 'run_*' / 'log.lammps', workers=1, concat=True)
+        assert len(table) == 15
+        assert np.array_equal(table['file'], [0] * 6 + [1] * 3 + [2] * 6)
+        assert table['Step'].dtype.kind == 'i'
+        assert np.all(np.isnan(table['Lx'][6:9]))
+        assert table.sections == {1: range(0, 3), 2: range(3, 6), 3: range(6, 9), 4: range(9, 12), 5: range(12, 15)}
+        assert len(table.files) == 3
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import mooonpy
+from mooonpy.xrdspace.xrdspace import Xrdspace, pair_histograms
+
+
+def _lattice(a=3.0, n=8, sigma=0.05, seed=0, gas=False):
+    """Simple cubic carbon lattice with small thermal noise, or an ideal gas with the same density"""
+    rng = np.random.default_rng(seed)
+    mol = mooonpy.Molspace()
+    box = mol.atoms.box
+    box.xlo = box.ylo = box.zlo = 0.0
+    box.xhi = box.yhi = box.zhi = a * n
+    id_ = 1
+    for i in range(n):
+        for j in range(n):
+            for k in range(n):
+                atom = mol.atoms.styles.atom_factory()
+                atom.id, atom.type, atom.element = id_, 1, 'C'
+                if gas:
+                    atom.x, atom.y, atom.z = rng.uniform(0, a * n, 3)
+                else:
+                    atom.x, atom.y, atom.z = (np.array([i, j, k]) + 0.5) * a + rng.normal(0, sigma, 3)
+                mol.atoms[id_] = atom
+                id_ += 1
+    return mol
+
+
+class TestXrdspace:
+    """Pytest tests for Debye and FFT structure factors"""
+
+    q = np.linspace(0.5, 6, 200)
+
+    def test_columns(self):
+        """Test output table layout"""
+        xrd = Xrdspace.debye(_lattice(), q=self.q, cutoff=7.5)
+        assert xrd.headers() == ['q', '2theta', 'intensity', 'S(q)']
+        assert xrd.shape() == (200, 4)
+        assert xrd.x_column == 'q'
+
+    def test_pair_histograms(self):
+        """Test every pair within the cutoff is binned once"""
+        mol = _lattice(n=4, sigma=0.0)
+        centers, histograms = pair_histograms(mol, cutoff=3.5, dr=0.1)
+        assert list(histograms.keys()) == [('C', 'C')]
+        assert histograms[('C', 'C')].sum() == 3 * 64  # 6 neighbours per atom, counted once per pair
+
+    def test_ideal_gas(self):
+        """Test S(q) of uncorrelated atoms is close to 1 for both methods"""
+        mol = _lattice(gas=True)
+        assert abs(np.nanmean(Xrdspace.debye(mol, q=self.q, cutoff=7.5)['S(q)']) - 1) < 0.05
+        assert abs(np.nanmean(Xrdspace.fft(mol, q=self.q, spacing=0.2)['S(q)']) - 1) < 0.05
+
+    def test_fft_bragg_peak(self):
+        """Test the (100) reflection of a simple cubic lattice is found at 2pi/a"""
+        xrd = Xrdspace.fft(_lattice(), q=self.q, spacing=0.2)
+        index = np.argmin(np.abs(self.q - 2 * np.pi / 3.0))
+        assert np.nanmax(xrd['S(q)'][index - 1:index + 2]) > 10